@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""
+How many concurrent tool calls one event loop sustains compared with running the
+synchronous tools on threads.
+
+Every WebSearchTool call goes to a local stand-in for Serper that answers after a fixed
+latency, so the numbers measure the tool's own overhead and concurrency rather than the
+network. Three strategies run the same calls:
+
+- async:       all calls awaited with `arun` on one event loop
+- threads:     one thread per in-flight call running the synchronous tool
+- executor:    the synchronous tool on the event loop's default executor, which is what
+               CrewAI does for tools without native async support
+
+Usage: python benchmarks/tool_concurrency.py [--tool web|csv] [--calls 10,100,500] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from crew_automation_content_editor_launcher.tools.csv_search_tool import CSVSearchTool
+from crew_automation_content_editor_launcher.tools.web_search_tool import WebSearchTool
+from crew_automation_content_editor_launcher.utils.csv_manager import CSVManager
+from crew_automation_content_editor_launcher.utils.logger import logger
+from crew_automation_content_editor_launcher.utils.rate_limiter import RateLimiter
+from crew_automation_content_editor_launcher.utils.resilience import CircuitBreaker, LatencyHistogram
+
+
+class FakeSerper:
+    """Minimal HTTP server on its own event loop that answers every search after a fixed latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+        started = threading.Event()
+        threading.Thread(target=self._serve, args=(started,), daemon=True).start()
+        started.wait()
+
+    def _serve(self, started: threading.Event):
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=4096))
+        self.port = server.sockets[0].getsockname()[1]
+        started.set()
+        self.loop.run_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            headers = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").lower()
+            length = int(headers.split("content-length:")[1].split("\r\n")[0])
+            query = json.loads(await reader.readexactly(length))["q"]
+            await asyncio.sleep(self.latency)
+            body = json.dumps({"organic": [{"title": f"{query} result {i}", "link": f"https://example.com/{i}",
+                                            "snippet": f"About {query}"} for i in range(1, 6)]}).encode("utf-8")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nConnection: close\r\n"
+                         b"Content-Length: " + str(len(body)).encode("ascii") + b"\r\n\r\n" + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+class ThreadSampler:
+    """Samples the number of live threads while a strategy runs."""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(0.01):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def web_search_tool(work_dir: str, base_url: str) -> WebSearchTool:
+    return WebSearchTool(api_key="benchmark", base_url=base_url, hedge_delay=0, use_corpus=False,
+                         cache_dir=os.path.join(work_dir, "search"),
+                         rate_limiter=RateLimiter("benchmark", rate=1e6, burst=1e6,
+                                                  db_path=os.path.join(work_dir, "limits.sqlite")),
+                         circuit_breaker=CircuitBreaker("benchmark"), latency=LatencyHistogram("benchmark"))
+
+
+def csv_search_tool(work_dir: str) -> CSVSearchTool:
+    manager = CSVManager(work_dir)
+    with open(manager.rag3_path, "w", encoding="utf-8") as f:
+        f.write("sector,FINANCE\n")
+        f.writelines(f"rule_{i},Disclosure requirement {i} for fund marketing\n" for i in range(5000))
+    tool = CSVSearchTool()
+    tool.csv_manager = manager
+    return tool
+
+
+def measure(strategy: str, tool, calls) -> dict:
+    # Distinct arguments, so that the single-flight layer does not coalesce the calls
+    async def on_event_loop():
+        return await asyncio.gather(*(tool.arun(*arguments) for arguments in calls))
+
+    async def on_default_executor():
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(*(loop.run_in_executor(None, tool._run, *arguments) for arguments in calls))
+
+    with ThreadSampler() as sampler:
+        started = time.perf_counter()
+        if strategy == "async":
+            results = asyncio.run(on_event_loop())
+        elif strategy == "threads":
+            with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+                results = list(executor.map(lambda arguments: tool._run(*arguments), calls))
+        else:
+            results = asyncio.run(on_default_executor())
+        seconds = time.perf_counter() - started
+    failed = sum(1 for result in results if result.startswith(("ERROR", "Error")))
+    return {"strategy": strategy, "calls": len(calls), "seconds": round(seconds, 3),
+            "calls_per_second": round(len(calls) / seconds, 1), "peak_threads": sampler.peak, "failed": failed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tool", choices=("web", "csv"), default="web")
+    parser.add_argument("--calls", default="10,100,500", help="Comma-separated numbers of concurrent calls")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds the fake Serper takes per search")
+    args = parser.parse_args()
+    logger.logger.setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        if args.tool == "web":
+            server = FakeSerper(args.latency)
+            tool = web_search_tool(work_dir, f"http://127.0.0.1:{server.port}")
+        else:
+            tool = csv_search_tool(work_dir)
+
+        print(f"{'strategy':<10} {'calls':>6} {'seconds':>8} {'calls/s':>9} {'threads':>8} {'failed':>7}")
+        for count in (int(value) for value in args.calls.split(",")):
+            for strategy in ("async", "threads", "executor"):
+                if args.tool == "web":
+                    calls = [(f"{strategy} query {i}", 5) for i in range(count)]
+                else:
+                    calls = [("compliance_info", f"requirement {strategy}{i}") for i in range(count)]
+                row = measure(strategy, tool, calls)
+                print(f"{row['strategy']:<10} {row['calls']:>6} {row['seconds']:>8} {row['calls_per_second']:>9} "
+                      f"{row['peak_threads']:>8} {row['failed']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,300 @@
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+import os
+import json
+import sqlite3
+from datetime import datetime
+from types import SimpleNamespace
+from crewai.project import CrewBase, agent, crew, task, before_kickoff, after_kickoff
+from crewai.tasks.conditional_task import ConditionalTask
+from crewai.tasks.task_output import TaskOutput
 from .tools.web_search_tool import WebSearchTool
+from .tools.page_fetch_tool import PageFetchTool
 from .tools.csv_search_tool import CSVSearchTool
+from .tools.content_formatter import ContentFormatterTool, OUTPUT_FORMATS
 from crew_automation_content_editor_launcher.utils.logger import logger
+from crew_automation_content_editor_launcher.utils.csv_manager import CSVManager
+from crew_automation_content_editor_launcher.utils.compliance_checker import ComplianceChecker, split_list
+from crew_automation_content_editor_launcher.utils.quality_gate import QualityGate, QualityReport
+from crew_automation_content_editor_launcher.utils.section_revision import plan_revision
+from crew_automation_content_editor_launcher.utils.format_fanout import FormatFanout, parse_variants
+from crew_automation_content_editor_launcher.utils.resilience import resilience_registry
+from crew_automation_content_editor_launcher.utils.run_budget import run_budget
+from crew_automation_content_editor_launcher.utils.single_flight import single_flight
+from crew_automation_content_editor_launcher.utils.prompt_layout import (
+    PromptLayout, install_prompt_layout, prompt_cache_llm, prompt_cache_report,
+)
+from crew_automation_content_editor_launcher.utils.content_archive import ArchivedPiece, content_archive
+from crew_automation_content_editor_launcher.utils.cassette import active_cassette
 
 @CrewBase
 class CrewAutomationContentEditorLauncherCrew():
     """CrewAutomationContentEditorLauncher crew"""
 
+    inputs: dict = None
+    compliance_checker: ComplianceChecker = None
+    quality_gate: QualityGate = None
+    draft_report: QualityReport = None
+    revision_report: QualityReport = None
+    revision_plans: dict = None
+    variant_report: dict = None
+    prompt_layout: PromptLayout = None
+    _scoped_tasks: dict = None
+
+    @before_kickoff
+    def prepare_quality_gate(self, inputs):
+        """Compile the deterministic compliance automaton and quality gate for this run's inputs."""
+        self.inputs = inputs
+        try:
+            compliance_info = CSVManager().load_compliance_info()
+        except Exception as e:
+            logger.log_warning(f"Compliance CSV unavailable, scanning with input rules only: {str(e)}")
+            compliance_info = {}
+        self.compliance_checker = ComplianceChecker.from_inputs(inputs, compliance_info)
+        self.quality_gate = QualityGate.from_inputs(inputs, self.compliance_checker)
+        self.draft_report = None
+        self.revision_report = None
+        self.revision_plans = {}
+        self.variant_report = None
+        # Tool-call and iteration budgets per agent (agents.yaml) with optional per-task overrides (tasks.yaml)
+        run_budget.install()
+        run_budget.reset(
+            agent_limits={config['role']: config.get('max_tool_calls') for config in self.agents_config.values()},
+            task_limits={name: config.get('max_tool_calls') for name, config in self.tasks_config.items()},
+            task_max_iter={name: config.get('max_iter') for name, config in self.tasks_config.items()},
+        )
+        # Undo any section scoping left over from a previous kickoff
+        for task_name, (context, expected_output) in (self._scoped_tasks or {}).items():
+            task = getattr(self, task_name)()
+            task.context = context
+            task.expected_output = expected_output
+        self._scoped_tasks = {}
+        return self._apply_prompt_layout(inputs)
+
+    def _apply_prompt_layout(self, inputs):
+        """Lead every agent prompt with the cached brand block and hand the request details to the tasks."""
+        try:
+            brand_info = CSVManager().load_brand_info()
+        except Exception as e:
+            logger.log_warning(f"Brand info CSV unavailable, brand block built from inputs only: {str(e)}")
+            brand_info = {}
+        self.prompt_layout = PromptLayout(inputs, brand_info)
+        install_prompt_layout()
+        return self.prompt_layout.apply(inputs)
+
+    def _scope_to_sections(self, task: Task, draft: str, report: QualityReport):
+        """
+        Hand the task only the flagged sections of the draft when the findings can be
+        localized, otherwise the full draft plus the findings.
+        """
+        plan = plan_revision(draft, report, self.quality_gate)
+        if plan.full_rewrite or plan.is_empty:
+            task.description = f"{task.description}\n\n{report.to_prompt()}"
+            return
+
+        if self._scoped_tasks is None:
+            self._scoped_tasks = {}
+        self._scoped_tasks.setdefault(task.name, (task.context, task.expected_output))
+        self.revision_plans[task.name] = plan
+        task.context = []
+        task.description = f"{task.description}\n\n{plan.to_prompt()}"
+        task.expected_output = ("Only the revised sections, each wrapped in its original <<<SECTION n>>> markers, "
+                                "followed by any requested new sections wrapped in their <<<NEW SECTION n>>> markers.")
+        logger.log_workflow_step(f"section_revision:{task.name}", "scoped",
+                                 f"{len(plan.flagged)} of {len(plan.sections)} sections "
+                                 f"({plan.flagged_word_count} words), {len(plan.additions)} new sections")
+
+    def _stitch_sections(self, output: TaskOutput, task_name: str):
+        """Stitch revised sections back into the full document for downstream tasks."""
+        plan = self.revision_plans.get(task_name)
+        if plan is not None:
+            output.raw = plan.stitch(output.raw)
+
+    def _evaluate_draft(self, output: TaskOutput):
+        """Evaluate the initial draft locally and hand the findings to the editor."""
+        self.draft_report = self.quality_gate.evaluate(output.raw)
+        logger.log_workflow_step("quality_gate:content_creation_task",
+                                 "passed" if self.draft_report.passed else "failed", self.draft_report.to_prompt())
+        if not self.draft_report.passed:
+            self._scope_to_sections(self.revision_task(), output.raw, self.draft_report)
+
+    def _evaluate_revision(self, output: TaskOutput):
+        """Stitch and evaluate the revised draft locally and hand any remaining findings to the leader."""
+        self._stitch_sections(output, "revision_task")
+        self.revision_report = self.quality_gate.evaluate(output.raw)
+        logger.log_workflow_step("quality_gate:revision_task",
+                                 "passed" if self.revision_report.passed else "failed", self.revision_report.to_prompt())
+        if not self.revision_report.passed:
+            self._scope_to_sections(self.finalization_task(), output.raw, self.revision_report)
+
+    def _finalize_sections(self, output: TaskOutput):
+        """Stitch the finalized sections back into the full document."""
+        self._stitch_sections(output, "finalization_task")
+
+    def _needs_revision(self, output: TaskOutput) -> bool:
+        """Skip the revision pass when the draft already passes every local check."""
+        if self.draft_report is not None and self.draft_report.passed:
+            logger.log_workflow_step("revision_task", "skipped", "Draft passed the quality gate")
+            return False
+        return True
+
+    def _needs_finalization(self, output: TaskOutput) -> bool:
+        """Skip the finalization pass when the latest draft passes every local check."""
+        latest_report = self.revision_report if output.raw else self.draft_report
+        if latest_report is not None and latest_report.passed:
+            logger.log_workflow_step("finalization_task", "skipped", "Latest draft passed the quality gate")
+            return False
+        return True
+
+    def _output_dir(self) -> str:
+        # Queue workers pass a per-job output_dir so that concurrent runs never share a directory
+        output_dir = (self.inputs or {}).get('output_dir') or os.path.join(
+            os.getenv('CONTENT_CREW_OUTPUT_DIR', os.path.join(os.getcwd(), 'output')),
+            datetime.now().strftime("%Y%m%d_%H%M%S"))
+        os.makedirs(output_dir, exist_ok=True)
+        return output_dir
+
+    @after_kickoff
+    def finish_run(self, result):
+        """
+        Derive the requested format variants, then format and write every output and the run
+        metrics locally, and archive the final content.
+        """
+        output_dir = self._output_dir()
+        draft = result.raw
+
+        variants = self._generate_variants(draft)
+        self._format_output(result, variants, output_dir)
+        run_budget.log_report()
+        self._export_metrics(output_dir, result.token_usage)
+        self._archive(draft, output_dir)
+        return result
+
+    def reuse_archived(self, piece: ArchivedPiece, inputs: dict):
+        """
+        Deliver an archived piece for a near-duplicate request without running the tasks:
+        it is only formatted locally for this run's output formats and disclaimers.
+        """
+        self.inputs = inputs
+        output_dir = self._output_dir()
+        result = SimpleNamespace(raw=piece.content)
+        self._format_output(result, {}, output_dir)
+        logger.log_workflow_step("content_archive", "reused", f"Piece {piece.id} ('{piece.request}') | Directory: {output_dir}")
+        return result
+
+    def _archive(self, content: str, output_dir: str):
+        """Store the final content in the content archive and report earlier pieces it nearly duplicates."""
+        cassette = active_cassette()
+        if not content or (cassette is not None and cassette.replaying):
+            # A replayed run repeats a recorded one and would only be reported as its own duplicate
+            return
+        try:
+            archive = content_archive()
+            piece_id = archive.add(self.inputs or {}, content, output_dir)
+            for match in archive.find_similar_content(content, (self.inputs or {}).get('brand_name'), exclude=piece_id):
+                logger.log_info(f"Content archive: output is {match.similarity:.0%} similar to piece {match.piece.id} "
+                                f"('{match.piece.request}', {match.piece.output_dir})")
+        except (sqlite3.Error, OSError) as e:
+            logger.log_warning(f"Could not archive the output: {str(e)}")
+
+    def _generate_variants(self, draft: str) -> dict:
+        """
+        Fan the approved draft out into the variants listed in inputs['output_variants']
+        (e.g. 'Social Media Post, Newsletter'), generated in parallel.
+        """
+        variants = parse_variants((self.inputs or {}).get('output_variants'))
+        if not variants or not draft:
+            return {}
+
+        try:
+            best_practices = CSVManager().load_best_practices()
+        except Exception as e:
+            logger.log_warning(f"Best practices unavailable, generating variants without guidelines: {str(e)}")
+            best_practices = {}
+        fanout = FormatFanout(self.copywriter(), best_practices, self.compliance_checker)
+        results = fanout.generate(draft, variants, self.inputs)
+        self.variant_report = {'generated': list(results), 'rejected': fanout.rejected}
+        return results
+
+    def _format_output(self, result, variants: dict, output_dir: str):
+        """
+        Format the final content and its variants locally and write one file per requested
+        output format (inputs['output_formats'], e.g. 'markdown, html, text').
+        """
+        inputs = self.inputs or {}
+        formats = [fmt.lower() for fmt in split_list(inputs.get('output_formats', 'markdown'))]
+        invalid = [fmt for fmt in formats if fmt not in OUTPUT_FORMATS]
+        if invalid:
+            logger.log_warning(f"Ignoring unsupported output formats: {', '.join(invalid)}")
+        formats = [fmt for fmt in formats if fmt in OUTPUT_FORMATS] or ['markdown']
+
+        formatter = ContentFormatterTool(disclaimers=inputs.get('disclaimers'))
+        structure = ":".join(split_list(inputs.get('structure'))) or None
+
+        # Short-form variants keep their own layout, so only the main content gets headers
+        documents = {'content': (result.raw, inputs.get('content_type', 'blog'), True)}
+        for variant, content in variants.items():
+            documents[variant.lower().replace(' ', '_')] = (content, variant, False)
+
+        extensions = {'markdown': 'md', 'html': 'html', 'text': 'txt'}
+        for name, (content, content_type, add_headers) in documents.items():
+            for fmt in formats:
+                formatted = formatter.format_document(content, content_type, structure=structure,
+                                                      output_format=fmt, add_headers=add_headers)
+                output_path = os.path.join(output_dir, f"{name}.{extensions[fmt]}")
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(formatted)
+                logger.log_data_access("ContentFormatterTool", output_path, "write", f"Format: {fmt}")
+                if name == 'content' and fmt == formats[0]:
+                    result.raw = formatted
+
+        logger.log_workflow_step("format_output", "completed",
+                                 f"Documents: {len(documents)} | Formats: {', '.join(formats)} | Directory: {output_dir}")
+
+    def _export_metrics(self, output_dir: str, token_usage=None):
+        """
+        Write the latency histograms, circuit breaker states, tool-call budgets, coalescing
+        counts, prompt cache usage and generated or rejected variants of this run.
+        """
+        metrics = resilience_registry.export()
+        metrics['tool_budget'] = run_budget.report()
+        # Process-wide counts: concurrent runs in this process share the single-flight layer
+        metrics['single_flight'] = single_flight.snapshot()
+        metrics['prompt_cache'] = prompt_cache_report(token_usage)
+        if self.variant_report is not None:
+            metrics['variants'] = self.variant_report
+        if self.prompt_layout is not None:
+            metrics['prompt_cache']['brand_block'] = self.prompt_layout.fingerprint
+        metrics_path = os.path.join(output_dir, 'metrics.json')
+        with open(metrics_path, 'w', encoding='utf-8') as f:
+            json.dump(metrics, f, indent=2)
+        for histogram in metrics['latency']:
+            if histogram['count']:
+                logger.log_info(f"Latency {histogram['name']}: {histogram['count']} calls | "
+                                f"p50 {histogram['p50']:.2f}s | p95 {histogram['p95']:.2f}s | p99 {histogram['p99']:.2f}s")
+        for tool_name, counts in metrics['single_flight'].items():
+            if counts['coalesced']:
+                logger.log_info(f"Single-flight {tool_name}: {counts['executed']} executed | "
+                                f"{counts['coalesced']} coalesced")
+        prompt_cache = metrics['prompt_cache']
+        if prompt_cache['prompt_tokens']:
+            logger.log_info(f"Prompt cache: {prompt_cache['cached_prompt_tokens']} of {prompt_cache['prompt_tokens']} "
+                            f"prompt tokens cached ({prompt_cache['cached_ratio']:.1%})")
+        logger.log_data_access("CrewAutomationContentEditorLauncherCrew", metrics_path, "write", "Run metrics")
+
     @agent
     def leader(self) -> Agent:
         return Agent(
             config=self.agents_config['leader'],
             tools=[CSVSearchTool()],
+            llm=prompt_cache_llm(),
         )
 
     @agent
     def web_searcher(self) -> Agent:
         return Agent(
             config=self.agents_config['web_searcher'],
-            tools=[WebSearchTool()],
+            tools=[WebSearchTool(), PageFetchTool()],
+            llm=prompt_cache_llm(),
         )
 
     @agent
@@ -27,6 +302,7 @@ class CrewAutomationContentEditorLauncherCrew():
         return Agent(
             config=self.agents_config['copywriter'],
             tools=[CSVSearchTool()],
+            llm=prompt_cache_llm(),
         )
 
     @agent
@@ -34,6 +310,7 @@ class CrewAutomationContentEditorLauncherCrew():
         return Agent(
             config=self.agents_config['editor'],
             tools=[CSVSearchTool()],
+            llm=prompt_cache_llm(),
         )
 
 
@@ -55,7 +332,7 @@ class CrewAutomationContentEditorLauncherCrew():
     def web_research_task(self) -> Task:
         return Task(
             config=self.tasks_config['web_research_task'],
-            tools=[WebSearchTool()],
+            tools=[WebSearchTool(), PageFetchTool()],
         )
 
     @task
@@ -63,20 +340,25 @@ class CrewAutomationContentEditorLauncherCrew():
         return Task(
             config=self.tasks_config['content_creation_task'],
             tools=[CSVSearchTool()],
+            callback=self._evaluate_draft,
         )
 
     @task
     def revision_task(self) -> Task:
-        return Task(
+        return ConditionalTask(
             config=self.tasks_config['revision_task'],
             tools=[CSVSearchTool()],
+            condition=self._needs_revision,
+            callback=self._evaluate_revision,
         )
 
     @task
     def finalization_task(self) -> Task:
-        return Task(
+        return ConditionalTask(
             config=self.tasks_config['finalization_task'],
+            condition=self._needs_finalization,
             tools=[],
+            callback=self._finalize_sections,
         )
 
 
@@ -1,20 +1,25 @@
 #!/usr/bin/env python
 import sys
 import os
+import multiprocessing
+from contextlib import nullcontext
+from datetime import datetime
 from crew_automation_content_editor_launcher.crew import CrewAutomationContentEditorLauncherCrew
 from crew_automation_content_editor_launcher.utils.logger import logger
+from crew_automation_content_editor_launcher.utils.job_queue import Job, JobWorker, SQLiteJobQueue
+from crew_automation_content_editor_launcher.utils.profiler import profiler
+from crew_automation_content_editor_launcher.utils.eval_runner import EvaluationRunner
+from crew_automation_content_editor_launcher.utils.content_archive import content_archive
+from crew_automation_content_editor_launcher.utils.scheduler import PRIORITY_CLASSES, JobScheduler
+from crew_automation_content_editor_launcher.utils.cassette import Cassette
+from crew_automation_content_editor_launcher.tools.web_search_tool import serper_rate_limiter
 
 # This main file is intended to be a way for your to run your
 # crew locally, so refrain from adding unnecessary logic into this file.
 
-def run():
-    """
-    Run the crew with Siebert Financial inputs.
-    """
-    # Get content request from user input
-    content_request = input("Enter your content request: ")
-    
-    inputs = {
+def _run_inputs(content_request: str) -> dict:
+    """Build the Siebert Financial inputs for a content request."""
+    return {
         'brand_name': 'Siebert Financial',
         'tone_of_voice': 'Professional, trustworthy, and approachable',
         'primary_target': 'Individual investors looking for reliable financial services',
@@ -32,17 +37,221 @@ def run():
         'required_elements': 'Company history, service descriptions, contact information',
         'mandatory_elements': 'Regulatory disclosures, fee transparency',
         'forbidden_elements': 'Specific return promises, competitor criticism',
-        'disclaimers': 'Investment advisory services involve risk. Past performance is not indicative of future results.'
+        'disclaimers': 'Investment advisory services involve risk. Past performance is not indicative of future results.',
+        'output_formats': 'markdown, html',
+        'output_variants': ''
     }
-    
-    logger.log_info("Starting Content Editor Crew with Siebert Financial inputs")
-    result = CrewAutomationContentEditorLauncherCrew().crew().kickoff(inputs=inputs)
-    logger.log_info("Content Editor Crew execution completed")
-    return result
+
+
+_profile = None
+
+
+def _profile_option():
+    """
+    Remove `--profile[=cpu|memory]` from the command line and return the (cpu, memory) toggles,
+    or None when profiling was not requested. Plain `--profile` enables both.
+    """
+    global _profile
+    for arg in sys.argv[1:]:
+        if arg == '--profile' or arg.startswith('--profile='):
+            sys.argv.remove(arg)
+            kinds = arg.partition('=')[2] or 'cpu,memory'
+            _profile = ('cpu' in kinds, 'memory' in kinds)
+    return _profile
+
+
+def _profiling(profile=None):
+    """Return a profiling session for the requested toggles, or a no-op context."""
+    profile = profile or _profile_option()
+    return profiler.session(cpu=profile[0], memory=profile[1]) if profile else nullcontext()
+
+
+def _concurrency_option():
+    """
+    Remove `--concurrency=N` from the command line and return N, or None to use
+    CONTENT_CREW_EVAL_CONCURRENCY (default 1, the sequential loop).
+    """
+    concurrency = None
+    for arg in sys.argv[1:]:
+        if arg.startswith('--concurrency='):
+            sys.argv.remove(arg)
+            concurrency = int(arg.partition('=')[2])
+    return concurrency
+
+
+_cassette = None
+
+
+def _cassette_option():
+    """
+    Remove `--record-cassette=PATH`, `--replay-cassette=PATH` and `--cassette-latency=SCALE`
+    from the command line and return the requested cassette, or None.
+    """
+    global _cassette
+    path, mode, latency_scale = None, None, 0.0
+    for arg in sys.argv[1:]:
+        name, _, value = arg.partition('=')
+        if name in ('--record-cassette', '--replay-cassette'):
+            sys.argv.remove(arg)
+            path, mode = value, name[2:].partition('-')[0]
+        elif name == '--cassette-latency':
+            sys.argv.remove(arg)
+            latency_scale = float(value)
+    if path:
+        _cassette = Cassette(path, mode, latency_scale)
+    return _cassette
+
+
+def _archived_choice(inputs: dict):
+    """
+    Show the archived pieces produced for near-duplicate requests and ask whether to reuse
+    one as is or to start from it as a draft. Returns ('reuse' | 'draft', piece) or None.
+    """
+    matches = content_archive().find_similar_requests(inputs)
+    if not matches:
+        return None
+    print("Similar content has already been produced:")
+    for number, match in enumerate(matches, 1):
+        print(f"  [{number}] {match.similarity:.0%} similar | {datetime.fromtimestamp(match.piece.created_at):%Y-%m-%d} | "
+              f"{match.piece.request} ({match.piece.output_dir})")
+    choice = input("Reuse a piece as is (r1), start from it as a draft (d1), or press Enter to write from scratch: ")
+    choice = choice.strip().lower()
+    number = choice[1:].strip() or '1'
+    if choice[:1] not in ('r', 'd') or not number.isdigit() or not 1 <= int(number) <= len(matches):
+        return None
+    return ('reuse' if choice[0] == 'r' else 'draft'), matches[int(number) - 1].piece
+
+
+def run():
+    """
+    Run the crew with Siebert Financial inputs.
+    Near-duplicates of earlier requests can reuse an archived piece or start from it as a draft.
+    Add --profile (or --profile=cpu / --profile=memory) to profile every task and tool call.
+    Add --record-cassette=PATH to record every LLM and Serper call of the run, and
+    --replay-cassette=PATH [--cassette-latency=SCALE] to re-run a recorded run offline.
+    """
+    cassette = _cassette_option()
+    with _profiling(), (cassette.activate() if cassette else nullcontext()):
+        crew = CrewAutomationContentEditorLauncherCrew()
+        if cassette is not None and cassette.replaying:
+            # The recorded inputs, so that the replay asks nothing and sends the recorded requests
+            inputs = dict(cassette.inputs)
+            logger.log_info(f"Replaying '{inputs.get('content_request')}' from cassette {cassette.path}")
+        else:
+            # Get content request from user input
+            content_request = input("Enter your content request: ")
+
+            inputs = _run_inputs(content_request)
+
+            archived = _archived_choice(inputs)
+            if archived is not None and archived[0] == 'reuse':
+                logger.log_info(f"Reusing archived piece {archived[1].id} instead of running the crew")
+                return crew.reuse_archived(archived[1], inputs)
+            if archived is not None:
+                logger.log_info(f"Starting the draft from archived piece {archived[1].id}")
+                inputs['starting_draft'] = archived[1].content
+            if cassette is not None:
+                cassette.inputs = dict(inputs)
+
+        logger.log_info("Starting Content Editor Crew with Siebert Financial inputs")
+        result = crew.crew().kickoff(inputs=inputs)
+        logger.log_info("Content Editor Crew execution completed")
+        return result
+
+
+def _command_args(command: str) -> list:
+    """Return the arguments after the command, for both `main.py <command> ...` and script entry points."""
+    args = sys.argv[1:]
+    return args[1:] if args[:1] == [command] else args
+
+
+def run_content_job(job: Job) -> dict:
+    """Run one queued content job and return its recorded result."""
+    inputs = dict(job.payload['inputs'])
+    inputs.setdefault('output_dir', os.path.join(
+        os.getenv('CONTENT_CREW_OUTPUT_DIR', os.path.join(os.getcwd(), 'output')), 'jobs', job.id))
+    crew = CrewAutomationContentEditorLauncherCrew().crew()
+    result = crew.kickoff(inputs=inputs)
+    # Task timings feed the scheduler's duration estimates for later jobs
+    task_seconds = {task.name: task.execution_duration for task in crew.tasks if task.execution_duration}
+    return {'output_dir': inputs['output_dir'], 'content': result.raw, 'task_seconds': task_seconds}
+
+
+def _scheduling_options() -> dict:
+    """
+    Remove `--priority=`, `--deadline=` (minutes from now) and `--tenant=` from the
+    command line and return them as job payload fields.
+    """
+    options = {}
+    for arg in sys.argv[1:]:
+        name, _, value = arg.partition('=')
+        if name in ('--priority', '--deadline', '--tenant'):
+            sys.argv.remove(arg)
+            if name == '--priority' and value not in PRIORITY_CLASSES:
+                raise ValueError(f"Unknown priority '{value}', expected one of {', '.join(PRIORITY_CLASSES)}")
+            if name == '--deadline':
+                options['deadline'] = datetime.now().timestamp() + float(value) * 60
+            else:
+                options[name[2:]] = value
+    return options
+
+
+def enqueue():
+    """
+    Queue a content request for the workers instead of running it in this process.
+    Usage: enqueue ["content request"] [max_attempts] [--priority=urgent|normal|batch]
+           [--deadline=<minutes>] [--tenant=<name>]
+    """
+    options = _scheduling_options()
+    args = _command_args("enqueue")
+    content_request = args[0] if args else input("Enter your content request: ")
+    max_attempts = int(args[1]) if len(args) > 1 else 3
+    job_id = SQLiteJobQueue().enqueue(dict({'inputs': _run_inputs(content_request)}, **options),
+                                      max_attempts=max_attempts)
+    print(f"Queued job {job_id}")
+    return job_id
+
+
+def _work(max_jobs: int = None, profile=None):
+    # Each worker process profiles itself into its own output/profile/<timestamp>-<pid> directory
+    with _profiling(profile):
+        queue = SQLiteJobQueue(scheduler=JobScheduler(serper_limiter=serper_rate_limiter()))
+        JobWorker(queue, run_content_job).run(max_jobs=max_jobs)
+
+
+def worker():
+    """
+    Drain the content job queue with one or more worker processes.
+    Usage: worker [processes] [max_jobs_per_process]
+    """
+    profile = _profile_option()
+    args = _command_args("worker")
+    processes = int(args[0]) if args else 1
+    max_jobs = int(args[1]) if len(args) > 1 else None
+    logger.log_info(f"Starting {processes} content job workers on {SQLiteJobQueue().db_path}")
+    if processes == 1:
+        _work(max_jobs, profile)
+        return
+
+    workers = [multiprocessing.Process(target=_work, args=(max_jobs, profile)) for _ in range(processes)]
+    for process in workers:
+        process.start()
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        for process in workers:
+            process.terminate()
 
 
 def train():
-    """Train the crew for a given number of iterations."""
+    """
+    Train the crew for a given number of iterations.
+    Usage: train <n_iterations> <filename> [--concurrency=N]
+    With --concurrency=N, N iterations run at the same time in separate processes.
+    """
+    concurrency = _concurrency_option()
+    args = _command_args("train")
     inputs = {
         'brand_name': 'Siebert Financial',
         'tone_of_voice': 'Professional, trustworthy, and approachable',
@@ -64,9 +273,10 @@ def train():
         'disclaimers': 'Investment advisory services involve risk. Past performance is not indicative of future results.'
     }
     try:
-        logger.log_info(f"Training Content Editor Crew for {sys.argv[1]} iterations")
-        CrewAutomationContentEditorLauncherCrew().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
-        logger.log_info("Training completed successfully")
+        with _profiling():
+            logger.log_info(f"Training Content Editor Crew for {args[0]} iterations")
+            EvaluationRunner(CrewAutomationContentEditorLauncherCrew, inputs, int(args[0]), concurrency).train(filename=args[1])
+            logger.log_info("Training completed successfully")
     except Exception as e:
         logger.log_error(f"An error occurred while training the crew: {str(e)}")
         raise Exception(f"An error occurred while training the crew: {e}")
@@ -76,9 +286,10 @@ def replay():
     Replay the crew execution from a specific task.
     """
     try:
-        logger.log_info(f"Replaying Content Editor Crew from task {sys.argv[1]}")
-        CrewAutomationContentEditorLauncherCrew().crew().replay(task_id=sys.argv[1])
-        logger.log_info("Replay completed successfully")
+        with _profiling():
+            logger.log_info(f"Replaying Content Editor Crew from task {sys.argv[1]}")
+            CrewAutomationContentEditorLauncherCrew().crew().replay(task_id=sys.argv[1])
+            logger.log_info("Replay completed successfully")
     except Exception as e:
         logger.log_error(f"An error occurred while replaying the crew: {str(e)}")
         raise Exception(f"An error occurred while replaying the crew: {e}")
@@ -86,7 +297,13 @@ def replay():
 def test():
     """
     Test the crew execution and returns the results.
+    Usage: test [n_iterations] [eval_llm] [--concurrency=N]
+    With --concurrency=N, N iterations run at the same time in separate processes.
     """
+    concurrency = _concurrency_option()
+    args = _command_args("test")
+    n_iterations = int(args[0]) if args else 5
+    eval_llm = args[1] if len(args) > 1 else 'gpt-4'
     inputs = {
         'brand_name': 'Siebert Financial',
         'tone_of_voice': 'Professional, informative, and educational',
@@ -108,15 +325,18 @@ def test():
         'disclaimers': 'Mutual fund investments are subject to market risks. Past performance is not indicative of future results. Please read the prospectus carefully before investing.'
     }
     try:
-        logger.log_info("Testing Content Editor Crew")
-        result = CrewAutomationContentEditorLauncherCrew().crew().test(inputs=inputs, n_iterations=5, eval_llm='gpt-4')
-        logger.log_info("Test completed successfully")
-        return result
+        with _profiling():
+            logger.log_info("Testing Content Editor Crew")
+            result = EvaluationRunner(CrewAutomationContentEditorLauncherCrew, inputs, n_iterations, concurrency).test(eval_llm)
+            logger.log_info("Test completed successfully")
+            return result
     except Exception as e:
         logger.log_error(f"An error occurred while testing the crew: {str(e)}")
         raise Exception(f"An error occurred while testing the crew: {e}")
 
 if __name__ == "__main__":
+    _profile_option()
+    _cassette_option()
     if len(sys.argv) > 1:
         if sys.argv[1] == "train" and len(sys.argv) > 3:
             train()
@@ -124,7 +344,11 @@ if __name__ == "__main__":
             replay()
         elif sys.argv[1] == "test":
             test()
+        elif sys.argv[1] == "enqueue":
+            enqueue()
+        elif sys.argv[1] == "worker":
+            worker()
         else:
-            print("Invalid command. Use 'train', 'replay', or 'test'.")
+            print("Invalid command. Use 'train', 'replay', 'test', 'enqueue', or 'worker'.")
     else:
         run()
@@ -1,5 +1,7 @@
+from .base_tool import ContentCrewTool
 from .web_search_tool import WebSearchTool
 from .csv_search_tool import CSVSearchTool
 from .content_formatter import ContentFormatterTool
+from .page_fetch_tool import PageFetchTool
 
-__all__ = ['WebSearchTool', 'CSVSearchTool', 'ContentFormatterTool']
\ No newline at end of file
+__all__ = ['ContentCrewTool', 'WebSearchTool', 'CSVSearchTool', 'ContentFormatterTool', 'PageFetchTool']
\ No newline at end of file
@@ -0,0 +1,112 @@
+from crewai.tools import BaseTool
+import asyncio
+import functools
+import inspect
+from typing import Any, ClassVar, Dict, Optional, Tuple
+from ..utils.profiler import profiler
+from ..utils.run_budget import run_budget
+from ..utils.single_flight import call_key, single_flight
+
+
+def _call_arguments(signature: inspect.Signature, self, args, kwargs) -> Optional[Dict[str, Any]]:
+    """Return the call arguments by name, or None when they do not match the signature."""
+    try:
+        bound = signature.bind(self, *args, **kwargs)
+    except TypeError:
+        return None
+    bound.apply_defaults()
+    return {name: value for name, value in bound.arguments.items() if name != "self"}
+
+
+def _managed_run(run):
+    """Wrap a tool's _run so that every call goes through the run budget, single-flight layer and profiler."""
+    signature = inspect.signature(run)
+
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        arguments = _call_arguments(signature, self, args, kwargs)
+        if arguments is None:
+            # Let the tool report invalid arguments itself
+            return run(self, *args, **kwargs)
+
+        answer = run_budget.before_call(self.name, arguments)
+        if answer is not None:
+            return answer
+
+        def execute():
+            with profiler.tool_call(self.name):
+                return run(self, *args, **kwargs)
+
+        # Concurrent identical calls (e.g. parallel crew runs for one brand) share one execution
+        result = single_flight.do(call_key(self.name, arguments, self.flight_config()), execute, group=self.name)
+        run_budget.after_call(self.name, arguments, result)
+        return result
+
+    return wrapper
+
+
+def _managed_arun(arun):
+    """
+    Wrap a tool's _arun like _managed_run. Async calls interleave on the event loop thread,
+    so they are not profiled as separate segments.
+    """
+    signature = inspect.signature(arun)
+
+    @functools.wraps(arun)
+    async def wrapper(self, *args, **kwargs):
+        arguments = _call_arguments(signature, self, args, kwargs)
+        if arguments is None:
+            return await arun(self, *args, **kwargs)
+
+        answer = run_budget.before_call(self.name, arguments)
+        if answer is not None:
+            return answer
+
+        result = await single_flight.do_async(call_key(self.name, arguments, self.flight_config()),
+                                              lambda: arun(self, *args, **kwargs), group=self.name)
+        run_budget.after_call(self.name, arguments, result)
+        return result
+
+    return wrapper
+
+
+class ContentCrewTool(BaseTool):
+    """
+    Base class for the crew's tools. Every subclass _run is routed through the run budget,
+    which enforces per-agent tool-call limits and answers repeated calls from earlier results
+    (only inside an agent execution), and through the single-flight layer, which makes
+    concurrent identical calls share one execution. Under `--profile` each executed call is
+    profiled as its own segment.
+
+    `arun` is the async entry point: tools with a native `_arun` run on the caller's event
+    loop, the others run their `_run` in a worker thread.
+    """
+
+    # Instance fields that, with the call arguments, decide a call's result. Tools that leave
+    # this unset are keyed by instance, so only calls to the same tool object are coalesced.
+    flight_fields: ClassVar[Optional[Tuple[str, ...]]] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "_run" in cls.__dict__:
+            cls._run = _managed_run(cls.__dict__["_run"])
+        if "_arun" in cls.__dict__:
+            cls._arun = _managed_arun(cls.__dict__["_arun"])
+
+    def flight_config(self) -> Dict[str, Any]:
+        """
+        Return the configuration part of this tool's single-flight key. Helper objects such as
+        rate limiters and circuit breakers are keyed by identity (their repr holds their address).
+        """
+        if self.flight_fields is None:
+            return {"instance": id(self)}
+        return {name: getattr(self, name) for name in self.flight_fields}
+
+    async def arun(self, *args: Any, **kwargs: Any) -> Any:
+        """Async counterpart of run."""
+        result = await self._arun(*args, **kwargs)
+        self.current_usage_count += 1
+        return result
+
+    async def _arun(self, *args: Any, **kwargs: Any) -> Any:
+        return await asyncio.to_thread(self._run, *args, **kwargs)
@@ -1,9 +1,28 @@
-from crewai.tools import BaseTool
-from typing import Type
+from .base_tool import ContentCrewTool
+from typing import ClassVar, List, Optional, Tuple, Type
 from pydantic import BaseModel, Field
+import html
 import os
 import re
 from ..utils.logger import logger
+from ..utils.csv_manager import CSVManager
+from ..utils.compliance_checker import split_sentences
+from ..utils.section_revision import has_headers, paragraph_group_bounds, split_into_paragraph_groups
+
+OUTPUT_FORMATS = ("markdown", "html", "text")
+
+# Used only when neither compliance_info.csv nor the caller provides disclaimers
+DEFAULT_DISCLAIMER = ("This content is for informational purposes only and does not "
+                      "constitute financial advice. Investment advisory services involve risk. "
+                      "Past performance is not indicative of future results. "
+                      "Please consult with a qualified financial advisor before making any investment decisions.")
+
+_HEADER_LINE_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_LIST_ITEM_RE = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+(.*)$')
+_HR_RE = re.compile(r'^\s*(?:-{3,}|\*{3,}|_{3,})\s*$')
+_BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+_ITALIC_RE = re.compile(r'(?<![*\w])\*(?!\s)(.+?)(?<!\s)\*(?![*\w])')
+_LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)')
 
 class ContentFormatterToolInput(BaseModel):
     """Input schema for ContentFormatterTool."""
@@ -13,49 +32,91 @@ class ContentFormatterToolInput(BaseModel):
     target_audience: str = Field(None, description="The target audience for the content.")
     structure: str = Field(None, description="The structure to follow (intro:problem:solution:conclusion, etc.).")
     include_disclaimers: bool = Field(True, description="Whether to include compliance disclaimers.")
+    output_format: str = Field("markdown", description="The output format (markdown, html, or text).")
 
-class ContentFormatterTool(BaseTool):
+class ContentFormatterTool(ContentCrewTool):
     name: str = "Content Formatter Tool"
     description: str = (
         "Format content according to best practices, structure guidelines, and compliance requirements."
     )
     args_schema: Type[BaseModel] = ContentFormatterToolInput
-    
-    def __init__(self):
-        super().__init__()
+    disclaimers: Optional[str] = None
+    flight_fields: ClassVar[Tuple[str, ...]] = ("disclaimers",)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
         logger.log_info("Content Formatter Tool initialized")
-    
-    def _run(self, content: str, content_type: str = "blog", tone: str = None, 
-             target_audience: str = None, structure: str = None, include_disclaimers: bool = True) -> str:
-        logger.log_agent_action("ContentFormatterTool", "format", 
+
+    def _run(self, content: str, content_type: str = "blog", tone: str = None,
+             target_audience: str = None, structure: str = None, include_disclaimers: bool = True,
+             output_format: str = "markdown") -> str:
+        logger.log_agent_action("ContentFormatterTool", "format",
                                f"Formatting {content_type} content with tone: {tone}")
-        
+
         try:
-            # Format the content based on the content type and structure
-            formatted_content = self._format_content(content, content_type, structure)
-            
-            # Add appropriate tone adjustments if specified
-            if tone:
-                formatted_content = self._adjust_tone(formatted_content, tone)
-            
-            # Add audience-specific elements if specified
-            if target_audience:
-                formatted_content = self._tailor_to_audience(formatted_content, target_audience)
-            
-            # Add compliance disclaimers if required
-            if include_disclaimers:
-                formatted_content = self._add_disclaimers(formatted_content, content_type)
-            
+            formatted_content = self.format_document(content, content_type, tone, target_audience, structure,
+                                                     include_disclaimers, output_format)
             logger.log_info(f"Content formatted successfully for {content_type}")
             return formatted_content
-        
+
         except Exception as e:
             error_msg = f"Error formatting content: {str(e)}"
             logger.log_error(error_msg)
             return error_msg
-    
+
+    def format_document(self, content: str, content_type: str = "blog", tone: str = None,
+                        target_audience: str = None, structure: str = None, include_disclaimers: bool = True,
+                        output_format: str = "markdown", add_headers: bool = True) -> str:
+        """
+        Format content locally, without an LLM round-trip.
+
+        Args:
+            content: The content to format
+            content_type: The type of content (blog, whitepaper, article, etc.)
+            tone: The tone of voice to use
+            target_audience: The target audience for the content
+            structure: Colon-separated sections to add when the content has no headers
+            include_disclaimers: Whether to append compliance disclaimers
+            output_format: One of markdown, html, or text
+            add_headers: Whether to add structure headers to content without any
+
+        Returns:
+            The formatted content
+
+        Raises:
+            ValueError: If the output format is not supported
+        """
+        output_format = output_format.lower()
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format '{output_format}'. Valid options are: {', '.join(OUTPUT_FORMATS)}")
+
+        # Format the content based on the content type and structure
+        formatted_content = self._format_content(content, content_type, structure) if add_headers else content
+
+        # Add appropriate tone adjustments if specified
+        if tone:
+            formatted_content = self._adjust_tone(formatted_content, tone)
+
+        # Add audience-specific elements if specified
+        if target_audience:
+            formatted_content = self._tailor_to_audience(formatted_content, target_audience)
+
+        # Add compliance disclaimers if required
+        if include_disclaimers:
+            formatted_content = self._add_disclaimers(formatted_content, content_type)
+
+        if output_format == "html":
+            return self._render_html(formatted_content)
+        if output_format == "text":
+            return self._render_text(formatted_content)
+        return formatted_content
+
     def _format_content(self, content: str, content_type: str, structure: str = None) -> str:
         """Format the content based on the content type and structure."""
+        # Content already has headers, keep as is
+        if has_headers(content):
+            return content
+
         # Default structure if none provided
         if not structure:
             if content_type.lower() == "blog":
@@ -64,70 +125,128 @@ class ContentFormatterTool(BaseTool):
                 structure = "exec_summary:problem:methodology:results:conclusions"
             else:
                 structure = "introduction:body:conclusion"
-        
+
         # Split the structure into sections
         sections = structure.split(":")
-        
-        # If content doesn't already have headers, add them based on structure
-        if not re.search(r'#\s+', content):
-            formatted_parts = []
-            # Split content into roughly equal parts based on number of sections
-            content_parts = self._split_content_into_sections(content, len(sections))
-            
-            for i, section in enumerate(sections):
-                section_title = section.replace("_", " ").title()
-                if i < len(content_parts):
-                    formatted_parts.append(f"## {section_title}\n\n{content_parts[i]}")
-                else:
-                    formatted_parts.append(f"## {section_title}\n\n")
-            
-            formatted_content = "\n\n".join(formatted_parts)
-        else:
-            # Content already has headers, keep as is
-            formatted_content = content
-        
-        return formatted_content
-    
+
+        # Add headers based on structure in a single pass: each section header is followed
+        # by its share of the paragraphs, and everything is joined once at the end
+        paragraphs = content.split("\n\n")
+        formatted_parts = []
+        for section, (start, end) in zip(sections, paragraph_group_bounds(len(paragraphs), len(sections))):
+            formatted_parts.append(f"## {section.replace('_', ' ').title()}")
+            formatted_parts.extend(paragraph for paragraph in paragraphs[start:end] if paragraph)
+
+        return "\n\n".join(formatted_parts)
+
     def _split_content_into_sections(self, content: str, num_sections: int) -> list:
         """Split content into roughly equal parts."""
-        paragraphs = content.split("\n\n")
-        if len(paragraphs) <= num_sections:
-            return paragraphs + ["" for _ in range(num_sections - len(paragraphs))]
-        
-        # Calculate paragraphs per section
-        paras_per_section = len(paragraphs) // num_sections
-        remainder = len(paragraphs) % num_sections
-        
-        sections = []
-        start_idx = 0
-        for i in range(num_sections):
-            # Add one extra paragraph to early sections if there's a remainder
-            extra = 1 if i < remainder else 0
-            end_idx = start_idx + paras_per_section + extra
-            section_content = "\n\n".join(paragraphs[start_idx:end_idx])
-            sections.append(section_content)
-            start_idx = end_idx
-        
-        return sections
-    
+        return split_into_paragraph_groups(content, num_sections)
+
     def _adjust_tone(self, content: str, tone: str) -> str:
         """Adjust the tone of the content."""
         # This is a placeholder - in a real implementation, this would use NLP techniques
         # to adjust the tone of the content
         return content
-    
+
     def _tailor_to_audience(self, content: str, audience: str) -> str:
         """Tailor the content to the specified audience."""
         # This is a placeholder - in a real implementation, this would add audience-specific
         # elements to the content
         return content
-    
+
     def _add_disclaimers(self, content: str, content_type: str) -> str:
-        """Add appropriate compliance disclaimers based on content type."""
-        # Financial services standard disclaimer
-        disclaimer = ("\n\n---\n\n*Disclaimer: This content is for informational purposes only and does not "
-                    "constitute financial advice. Investment advisory services involve risk. "
-                    "Past performance is not indicative of future results. "
-                    "Please consult with a qualified financial advisor before making any investment decisions.*")
-        
-        return content + disclaimer
\ No newline at end of file
+        """Add the compliance disclaimers that are not already present in the content."""
+        normalized_content = " ".join(content.lower().split())
+        missing = [sentence for sentence in self._get_disclaimers()
+                   if " ".join(sentence.lower().split()) not in normalized_content]
+        if not missing:
+            return content
+
+        return content + "\n\n---\n\n*Disclaimer: " + " ".join(missing) + "*"
+
+    def _get_disclaimers(self) -> List[str]:
+        """Collect disclaimers from compliance_info.csv and the caller, falling back to the default."""
+        disclaimers = []
+        try:
+            for key, value in CSVManager().load_compliance_info().items():
+                if "disclaimer" in str(key).lower() and isinstance(value, str):
+                    disclaimers.extend(split_sentences(value))
+        except Exception as e:
+            logger.log_warning(f"Could not load disclaimers from compliance_info: {str(e)}")
+
+        disclaimers.extend(split_sentences(self.disclaimers))
+        if not disclaimers:
+            disclaimers = split_sentences(DEFAULT_DISCLAIMER)
+        # Keep the first occurrence of each sentence
+        return list(dict.fromkeys(disclaimers))
+
+    def _render_html(self, content: str) -> str:
+        """Render Markdown content as HTML in a single pass over the lines."""
+        parts = []
+        paragraph = []
+        in_list = False
+
+        def flush_paragraph():
+            if paragraph:
+                parts.append(f"<p>{' '.join(paragraph)}</p>")
+                paragraph.clear()
+
+        for line in content.splitlines():
+            header = _HEADER_LINE_RE.match(line)
+            item = _LIST_ITEM_RE.match(line)
+            if item:
+                flush_paragraph()
+                if not in_list:
+                    parts.append("<ul>")
+                    in_list = True
+                parts.append(f"<li>{self._inline_html(item.group(1))}</li>")
+                continue
+            if in_list:
+                parts.append("</ul>")
+                in_list = False
+            if header:
+                flush_paragraph()
+                level = len(header.group(1))
+                parts.append(f"<h{level}>{self._inline_html(header.group(2))}</h{level}>")
+            elif _HR_RE.match(line):
+                flush_paragraph()
+                parts.append("<hr>")
+            elif not line.strip():
+                flush_paragraph()
+            else:
+                paragraph.append(self._inline_html(line.strip()))
+
+        flush_paragraph()
+        if in_list:
+            parts.append("</ul>")
+        return "\n".join(parts)
+
+    def _inline_html(self, text: str) -> str:
+        def link(match):
+            # The href was escaped with the rest of the line, so only its quotes are left to escape
+            href = match.group(2).replace('"', "&quot;")
+            return f'<a href="{href}">{match.group(1)}</a>'
+
+        text = html.escape(text, quote=False)
+        text = _LINK_RE.sub(link, text)
+        text = _BOLD_RE.sub(r"<strong>\1</strong>", text)
+        return _ITALIC_RE.sub(r"<em>\1</em>", text)
+
+    def _render_text(self, content: str) -> str:
+        """Render Markdown content as plain text in a single pass over the lines."""
+        lines = []
+        for line in content.splitlines():
+            header = _HEADER_LINE_RE.match(line)
+            if header:
+                line = header.group(2).upper()
+            elif _HR_RE.match(line):
+                line = ""
+            else:
+                item = _LIST_ITEM_RE.match(line)
+                if item:
+                    line = f"- {item.group(1)}"
+            line = _LINK_RE.sub(r"\1 (\2)", line)
+            line = _BOLD_RE.sub(r"\1", line)
+            lines.append(_ITALIC_RE.sub(r"\1", line))
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
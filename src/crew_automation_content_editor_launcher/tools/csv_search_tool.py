@@ -1,8 +1,7 @@
-from crewai.tools import BaseTool
-from typing import Type
+from .base_tool import ContentCrewTool
+from typing import Dict, Optional, Type
 from pydantic import BaseModel, Field
-import os
-import pandas as pd
+import asyncio
 from crew_automation_content_editor_launcher.utils.logger import logger
 from ..utils.csv_manager import CSVManager, CSVManagerConfig
 
@@ -14,7 +13,7 @@ class CSVSearchToolInput(BaseModel):
     class Config:
         arbitrary_types_allowed = True
 
-class CSVSearchTool(BaseTool):
+class CSVSearchTool(ContentCrewTool):
     name: str = "CSV Search Tool"
     description: str = (
         "Search for information in the RAG CSV files (brand_info, best_practices, or compliance_info)."
@@ -29,49 +28,67 @@ class CSVSearchTool(BaseTool):
         super().__init__()
         self.csv_manager = CSVManager()
         logger.log_info("CSV Search Tool initialized")
+
+    def flight_config(self) -> Dict[str, str]:
+        """Searches depend only on the RAG directory, so tools reading the same files share calls."""
+        return {"base_dir": self.csv_manager.base_dir}
     
     def _run(self, csv_file: str, query: str) -> str:
         logger.log_agent_action("CSVSearchTool", "search", f"Searching for '{query}' in {csv_file}")
         
         try:
-            # Load the appropriate CSV file
-            if csv_file.lower() == "brand_info":
-                data = self.csv_manager.load_brand_info()
-            elif csv_file.lower() == "best_practices":
-                data = self.csv_manager.load_best_practices()
-            elif csv_file.lower() == 'compliance_info':
-                data = self.csv_manager.load_compliance_info()
-            else:
-                warning_msg = f"Warning: Invalid CSV file '{csv_file}'. Valid options are: brand_info, best_practices, compliance_info"
-                logger.log_warning(warning_msg)
-                return warning_msg
-            
-            # Search for the query in the data
-            
-            # Split query into terms for partial matching
-            query_terms = query.lower().split()
-            results = {}
-            for key, value in data.items():
-                key_lower = key.lower()
-                value_str = str(value).lower()
-                for term in query_terms:
-                    if term in key_lower or term in value_str:
-                        results[key] = value
-                        break
-            
-            if not results:
-                logger.log_warning(f"No results found for '{query}' in {csv_file}. Try broader terms.")
-                return f"Warning: No exact matches found. Consider using different search terms."
-            
-            # Format the results
-            result_str = f"Found {len(results)} related entries for '{query}' in {csv_file}:\n"
-            for key, value in results.items():
-                result_str += f"- {key}: {value}\n"
-            
-            logger.log_info(f"Found {len(results)} results for '{query}' in {csv_file}")
-            return result_str
+            return self._search(csv_file, query, self._load(csv_file))
+        except Exception as e:
+            error_msg = f"Error searching CSV file: {str(e)}"
+            logger.log_error(error_msg)
+            return error_msg
+
+    async def _arun(self, csv_file: str, query: str) -> str:
+        logger.log_agent_action("CSVSearchTool", "search", f"Searching for '{query}' in {csv_file}")
         
+        try:
+            # The sheets are cached by CSVManager; only the freshness check and new rows touch the disk
+            return self._search(csv_file, query, await asyncio.to_thread(self._load, csv_file))
         except Exception as e:
             error_msg = f"Error searching CSV file: {str(e)}"
             logger.log_error(error_msg)
-            return error_msg
\ No newline at end of file
+            return error_msg
+
+    def _load(self, csv_file: str) -> Optional[Dict[str, str]]:
+        """Load the requested CSV file, or return None when the name is not a known file."""
+        if csv_file.lower() == "brand_info":
+            return self.csv_manager.load_brand_info()
+        elif csv_file.lower() == "best_practices":
+            return self.csv_manager.load_best_practices()
+        elif csv_file.lower() == 'compliance_info':
+            return self.csv_manager.load_compliance_info()
+        return None
+
+    def _search(self, csv_file: str, query: str, data: Optional[Dict[str, str]]) -> str:
+        if data is None:
+            warning_msg = f"Warning: Invalid CSV file '{csv_file}'. Valid options are: brand_info, best_practices, compliance_info"
+            logger.log_warning(warning_msg)
+            return warning_msg
+        
+        # Split query into terms for partial matching
+        query_terms = query.lower().split()
+        results = {}
+        for key, value in data.items():
+            key_lower = key.lower()
+            value_str = str(value).lower()
+            for term in query_terms:
+                if term in key_lower or term in value_str:
+                    results[key] = value
+                    break
+        
+        if not results:
+            logger.log_warning(f"No results found for '{query}' in {csv_file}. Try broader terms.")
+            return f"Warning: No exact matches found. Consider using different search terms."
+        
+        # Format the results
+        result_str = f"Found {len(results)} related entries for '{query}' in {csv_file}:\n"
+        for key, value in results.items():
+            result_str += f"- {key}: {value}\n"
+        
+        logger.log_info(f"Found {len(results)} results for '{query}' in {csv_file}")
+        return result_str
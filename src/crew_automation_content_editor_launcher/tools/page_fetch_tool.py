@@ -0,0 +1,253 @@
+from .base_tool import ContentCrewTool
+from typing import ClassVar, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, Field
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+from datetime import datetime
+import asyncio
+import codecs
+import hashlib
+import json
+import os
+import httpx
+from ..utils.logger import logger
+from .web_search_tool import WebSearchTool
+
+# Rough chars-per-token ratio used to budget extracts without a tokenizer dependency
+CHARS_PER_TOKEN = 4
+
+# Elements whose text is never part of the main content
+_SKIP_TAGS = {"script", "style", "noscript", "svg", "nav", "header", "footer", "aside", "form", "iframe", "template"}
+# Elements that end a block of text
+_BLOCK_TAGS = {"p", "div", "section", "article", "main", "li", "ul", "ol", "br", "tr", "table", "blockquote",
+               "h1", "h2", "h3", "h4", "h5", "h6", "pre"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+class MainTextExtractor(HTMLParser):
+    """
+    Incremental HTML parser that extracts the main text of a page.
+    Text inside <article>/<main> is preferred; navigation, scripts and boilerplate are skipped.
+    Fed chunk by chunk while the response streams in.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self._in_title = False
+        self._skip_depth = 0
+        self._main_depth = 0
+        self._blocks: List[str] = []
+        self._main_blocks: List[str] = []
+        self._current: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            if tag == "br":
+                self._end_block()
+            return
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in ("article", "main"):
+            self._end_block()
+            self._main_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in _BLOCK_TAGS:
+            self._end_block()
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in ("article", "main"):
+            self._end_block()
+            self._main_depth = max(0, self._main_depth - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in _BLOCK_TAGS:
+            self._end_block()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self._current.append(data)
+
+    def _end_block(self):
+        text = " ".join("".join(self._current).split())
+        self._current = []
+        if not text:
+            return
+        (self._main_blocks if self._main_depth else self._blocks).append(text)
+
+    def get_text(self) -> str:
+        self._end_block()
+        blocks = self._main_blocks or self._blocks
+        # Drop short fragments (menus, buttons) that survive outside the skipped elements
+        return "\n\n".join(block for block in blocks if len(block.split()) >= 4 or block.endswith((".", ":", "?", "!")))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to a token budget on a paragraph or sentence boundary."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    boundary = max(cut.rfind("\n\n"), cut.rfind(". "))
+    if boundary > max_chars // 2:
+        cut = cut[:boundary + 1]
+    return cut.rstrip() + " [...]"
+
+
+class PageFetchToolInput(BaseModel):
+    """Input schema for PageFetchTool."""
+    urls: List[str] = Field(default_factory=list, description="The page URLs to read.")
+    query: Optional[str] = Field(None, description="A search query whose top results should be read when no URLs are given.")
+    top_k: int = Field(3, description="How many top search results to read when a query is given.")
+    max_tokens: int = Field(800, description="Token budget for each page extract.")
+
+
+class PageFetchTool(ContentCrewTool):
+    name: str = "Page Fetch Tool"
+    description: str = (
+        "Read the main text of web pages (for example the top results of a web search) "
+        "and return token-budgeted extracts."
+    )
+    args_schema: Type[BaseModel] = PageFetchToolInput
+    max_connections: int = 8
+    per_domain_limit: int = 2
+    max_bytes: int = 2_000_000
+    timeout: float = 15.0
+    cache_dir: str = Field(default_factory=lambda: os.path.join(
+        os.getenv("CONTENT_CREW_CACHE_DIR", os.path.join(os.getcwd(), ".cache")), "pages"))
+    flight_fields: ClassVar[Tuple[str, ...]] = ("max_connections", "per_domain_limit", "max_bytes", "timeout", "cache_dir")
+
+    def _run(self, urls: List[str] = None, query: str = None, top_k: int = 3, max_tokens: int = 800) -> str:
+        urls = list(urls or [])
+        if not urls and query:
+            try:
+                urls = WebSearchTool().search_links(query, top_k)
+            except Exception as e:
+                error_msg = f"Error finding pages to read for '{query}': {str(e)}"
+                logger.log_error(error_msg)
+                return error_msg
+
+        if not urls:
+            error_msg = "Invalid page fetch request: provide urls or a query"
+            logger.log_error(error_msg)
+            return error_msg
+
+        logger.log_agent_action("PageFetchTool", "fetch", f"Reading {len(urls)} pages")
+        pages = self.fetch_pages(urls)
+
+        result_str = "## Page Extracts\n\n"
+        for i, page in enumerate(pages, 1):
+            if page.get("error"):
+                result_str += f"**{i}. {page['url']}**\n- ⚠️ Could not read page: {page['error']}\n\n"
+                continue
+            result_str += f"**{i}. {page.get('title') or 'No title'}**\n"
+            result_str += f"- 🔗 [Source]({page['url']})\n"
+            result_str += f"- 📅 Fetched {page['fetched_at']}\n\n"
+            result_str += truncate_to_tokens(page["text"], max_tokens) + "\n\n"
+
+        logger.log_info(f"Read {sum(1 for page in pages if not page.get('error'))} of {len(pages)} pages")
+        return result_str
+
+    def fetch_pages(self, urls: List[str]) -> List[Dict[str, str]]:
+        """
+        Fetch and extract the given pages concurrently.
+
+        Args:
+            urls: The page URLs, in the order results should be returned
+
+        Returns:
+            One dictionary per URL with url, title, text, fetched_at, or url and error
+        """
+        coroutine = self._fetch_all(urls)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        # Called from inside an event loop: run on a dedicated loop in a worker thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coroutine).result()
+
+    async def _fetch_all(self, urls: List[str]) -> List[Dict[str, str]]:
+        domain_limits: Dict[str, asyncio.Semaphore] = {}
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        headers = {'User-Agent': 'CrewAI/1.0 (Siebert_Content_Crew)'}
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout, headers=headers,
+                                     follow_redirects=True) as client:
+            return await asyncio.gather(*(self._fetch_page(client, domain_limits, url) for url in urls))
+
+    async def _fetch_page(self, client: httpx.AsyncClient, domain_limits: Dict[str, asyncio.Semaphore],
+                          url: str) -> Dict[str, str]:
+        cached = self._read_cache(url)
+        request_headers = {}
+        if cached and cached.get("etag"):
+            request_headers["If-None-Match"] = cached["etag"]
+
+        try:
+            # Malformed URLs fail here (ValueError) or in the request (httpx.InvalidURL), for this page only
+            domain = urlparse(url).netloc.lower()
+            semaphore = domain_limits.setdefault(domain, asyncio.Semaphore(self.per_domain_limit))
+            async with semaphore:
+                logger.log_api_call("Page Fetch", url, "pending")
+                async with client.stream("GET", url, headers=request_headers) as response:
+                    if response.status_code == 304 and cached:
+                        logger.log_api_call("Page Fetch", url, "not modified", "Served from cache")
+                        return cached
+                    if response.status_code != 200:
+                        return {"url": url, "error": f"HTTP {response.status_code}"}
+                    content_type = response.headers.get("content-type", "")
+                    if content_type and "html" not in content_type and "text" not in content_type:
+                        return {"url": url, "error": f"Unsupported content type {content_type}"}
+
+                    # Parse while streaming and stop reading once the byte cap is reached
+                    extractor = MainTextExtractor()
+                    decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+                    received = 0
+                    async for chunk in response.aiter_bytes():
+                        chunk = chunk[:self.max_bytes - received]
+                        received += len(chunk)
+                        extractor.feed(decoder.decode(chunk))
+                        if received >= self.max_bytes:
+                            logger.log_warning(f"Page {url} exceeded {self.max_bytes} bytes; truncating")
+                            break
+                    extractor.feed(decoder.decode(b"", final=True))
+                    etag = response.headers.get("etag")
+        except (httpx.HTTPError, httpx.InvalidURL, LookupError, ValueError) as e:
+            logger.log_error(f"Error fetching page {url}: {str(e)}")
+            return {"url": url, "error": str(e) or e.__class__.__name__}
+
+        page = {
+            "url": url,
+            "title": " ".join(extractor.title.split()),
+            "text": extractor.get_text(),
+            "etag": etag,
+            "fetched_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        if etag:
+            self._write_cache(page)
+        return page
+
+    def _cache_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _read_cache(self, url: str) -> Optional[Dict[str, str]]:
+        try:
+            with open(self._cache_path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, page: Dict[str, str]):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._cache_path(page["url"]) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(page, f)
+            os.replace(tmp_path, self._cache_path(page["url"]))
+        except OSError as e:
+            logger.log_warning(f"Could not cache page {page['url']}: {str(e)}")
@@ -1,28 +1,160 @@
-from crewai.tools import BaseTool
-from typing import Type
+from .base_tool import ContentCrewTool
+from typing import ClassVar, Dict, List, Optional, Tuple, Type
 from pydantic import BaseModel, Field
+from functools import lru_cache
 import os
 import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import httpx
 import requests
 import backoff
 from ..utils.logger import logger
+from ..utils.cassette import active_cassette
 from ..utils.config_manager import ConfigManager
+from ..utils.rate_limiter import RateLimiter
+from ..utils.resilience import (CircuitBreaker, CircuitOpenError, LatencyHistogram, hedged_call, hedged_call_async,
+                                resilience_registry)
+from ..utils.research_corpus import CorpusDocument, ResearchCorpus
+
+# Requests per second shared by all crew processes unless SERPER_RATE_LIMIT is set
+DEFAULT_SERPER_RATE = 5.0
+# How often a search that keeps receiving 429 is re-queued before giving up
+MAX_RATE_LIMITED_ATTEMPTS = 5
+# Samples needed before the hedging delay follows the observed p95 latency
+HEDGE_MIN_SAMPLES = 20
+# Never hedge earlier than this, even when Serper is consistently fast
+MIN_HEDGE_DELAY = 0.2
+
+def default_cache_dir() -> str:
+    """Return the directory for the tool's on-disk state ($CONTENT_CREW_CACHE_DIR or ./.cache)."""
+    return os.getenv("CONTENT_CREW_CACHE_DIR", os.path.join(os.getcwd(), ".cache"))
+
+def serper_rate_limiter() -> RateLimiter:
+    """Return the process-wide limiter for Serper, coordinated with other processes on disk."""
+    return _limiter_for(default_cache_dir())
+
+def research_corpus() -> ResearchCorpus:
+    """Return the process-wide research corpus, shared with other runs on disk."""
+    return _corpus_for(default_cache_dir())
+
+# One instance per cache directory, so that a changed CONTENT_CREW_CACHE_DIR is honoured
+@lru_cache(maxsize=None)
+def _limiter_for(directory: str) -> RateLimiter:
+    return RateLimiter.from_env("serper", DEFAULT_SERPER_RATE, db_path=os.path.join(directory, "rate_limits.sqlite"))
+
+@lru_cache(maxsize=None)
+def _corpus_for(directory: str) -> ResearchCorpus:
+    return ResearchCorpus(db_path=os.path.join(directory, "research_corpus.sqlite"))
+
+# Async Serper clients by event loop: an httpx client cannot be shared across loops, and
+# creating one per call (SSL context and connection pool) costs more than the call itself
+_async_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+_async_clients_lock = threading.Lock()
+
+def serper_async_client() -> httpx.AsyncClient:
+    """Return the Serper client of the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        for closed in [other for other in _async_clients if other.is_closed()]:
+            del _async_clients[closed]
+        client = _async_clients.get(loop)
+        if client is None:
+            # Concurrency is bounded by the Serper rate limiter, not by the connection pool
+            client = _async_clients[loop] = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=20))
+        return client
+
+class CachedSearchResponse:
+    """Stand-in for a Serper response served from the local search cache."""
+    status_code = 200
+
+    def __init__(self, search_results: dict):
+        self._search_results = search_results
+        self.text = json.dumps(search_results)
+        self.headers = {}
+
+    def json(self) -> dict:
+        return self._search_results
 
 class WebSearchToolInput(BaseModel):
     """Input schema for WebSearchTool."""
     query: str = Field(..., description="The search query to perform.")
     num_results: int = Field(5, description="The number of search results to return.")
 
-class WebSearchTool(BaseTool):
+class WebSearchTool(ContentCrewTool):
     name: str = "Web Search Tool"
     description: str = (
         "Search the web for information using the Serper API."
     )
     args_schema: Type[BaseModel] = WebSearchToolInput
     api_key: str = Field(default_factory=lambda: os.getenv("SERPER_API_KEY") or ConfigManager().get_api_key("serper"))
+    base_url: str = Field(default_factory=lambda: os.getenv("SERPER_BASE_URL", "https://google.serper.dev"))
+    timeout: float = Field(default_factory=lambda: float(os.getenv("SERPER_TIMEOUT", 10)))
+    # Initial hedging delay in seconds until enough latency samples exist (0 disables hedging)
+    hedge_delay: float = Field(default_factory=lambda: float(os.getenv("SERPER_HEDGE_DELAY", 2.0)))
+    cache_dir: str = Field(default_factory=lambda: os.path.join(default_cache_dir(), "search"))
+    rate_limiter: Optional[RateLimiter] = None
+    circuit_breaker: Optional[CircuitBreaker] = None
+    latency: Optional[LatencyHistogram] = None
+    # Answer recurring topics from the local research corpus before calling Serper
+    use_corpus: bool = True
+    corpus: Optional[ResearchCorpus] = None
+    flight_fields: ClassVar[Tuple[str, ...]] = ("api_key", "base_url", "timeout", "hedge_delay", "cache_dir", "rate_limiter",
+                                                "circuit_breaker", "latency", "use_corpus", "corpus")
 
     def _run(self, query: str, num_results: int = 5) -> str:
-        # Input validation
+        error_msg = self._validate(query, num_results)
+        if error_msg:
+            return error_msg
+
+        documents = self._lookup_corpus(query, num_results)
+        if documents is not None:
+            return self._corpus_answer(query, num_results, documents)
+
+        if not self.api_key:
+            error_msg = "Missing Serper API key - check configuration"
+            logger.log_error(error_msg)
+            return error_msg
+
+        logger.log_agent_action("WebSearchTool", "search", f"Searching for '{query}' on the web")
+        
+        try:
+            return self._handle_response(query, num_results, self._search(query, num_results))
+        except Exception as e:
+            error_msg = f"Error searching the web: {str(e)}"
+            logger.log_error(error_msg)
+            return error_msg
+
+    async def _arun(self, query: str, num_results: int = 5) -> str:
+        error_msg = self._validate(query, num_results)
+        if error_msg:
+            return error_msg
+
+        documents = await asyncio.to_thread(self._lookup_corpus, query, num_results)
+        if documents is not None:
+            return self._corpus_answer(query, num_results, documents)
+
+        if not self.api_key:
+            error_msg = "Missing Serper API key - check configuration"
+            logger.log_error(error_msg)
+            return error_msg
+
+        logger.log_agent_action("WebSearchTool", "search", f"Searching for '{query}' on the web")
+
+        try:
+            return self._handle_response(query, num_results, await self._asearch(query, num_results))
+        except Exception as e:
+            error_msg = f"Error searching the web: {str(e)}"
+            logger.log_error(error_msg)
+            return error_msg
+
+    @staticmethod
+    def _validate(query: str, num_results: int) -> Optional[str]:
+        """Return the error message for invalid arguments, or None."""
         if not query or not isinstance(query, str):
             error_msg = "Invalid search query: must be a non-empty string"
             logger.log_error(error_msg)
@@ -32,89 +164,313 @@ class WebSearchTool(BaseTool):
             error_msg = f"Invalid num_results: {num_results}. Must be between 1-100"
             logger.log_error(error_msg)
             return error_msg
+        return None
 
-        if not self.api_key:
-            error_msg = "Missing Serper API key - check configuration"
+    def _corpus_answer(self, query: str, num_results: int, documents: List[CorpusDocument]) -> str:
+        logger.log_agent_action("WebSearchTool", "search", f"Answered '{query}' from the research corpus")
+        oldest = time.strftime("%Y-%m-%d %H:%M", time.localtime(min(doc.fetched_at for doc in documents)))
+        return self._format_results(query, num_results, self._corpus_results(documents),
+                                    note=f"_From the local research corpus (fetched since {oldest})_")
+
+    def _handle_response(self, query: str, num_results: int, response) -> str:
+        if response.status_code == 403:
+            error_msg = "Invalid or missing API credentials - verify ConfigManager settings"
             logger.log_error(error_msg)
-            return error_msg
+            return f"ERROR: {error_msg}. Please check your API configuration."
 
-        logger.log_agent_action("WebSearchTool", "search", f"Searching for '{query}' on the web")
+        if response.status_code != 200:
+            error_msg = f"API request failed: {response.status_code} - {response.text}"
+            logger.log_error(error_msg)
+            return f"ERROR: {error_msg}"
+
+        search_results = response.json()
+        result_str = self._format_results(query, num_results, search_results)
+        
+        logger.log_info(f"Found {min(num_results, len(search_results.get('organic', [])))} search results for '{query}'")
+        return result_str
+
+    def search_links(self, query: str, num_results: int = 5) -> list:
+        """
+        Return the organic result links for a query, in ranking order.
+        
+        Raises:
+            RuntimeError: If the Serper request fails
+        """
+        documents = self._lookup_corpus(query, num_results)
+        if documents is not None:
+            return [document.url for document in documents]
+        if not self.api_key:
+            raise RuntimeError("Missing Serper API key - check configuration")
+        response = self._search(query, num_results)
+        if response.status_code != 200:
+            raise RuntimeError(f"API request failed: {response.status_code} - {response.text}")
+        organic = response.json().get("organic", [])[:num_results]
+        return [result["link"] for result in organic if result.get("link")]
+
+    def _search(self, query: str, num_results: int):
+        """Send the Serper search, or record/replay it through the active cassette."""
+        cassette = active_cassette()
+        if cassette is None:
+            return self._request_search(query, num_results)
+        return cassette.http("serper", {"q": query, "num": num_results},
+                             lambda: self._request_search(query, num_results))
+
+    async def _asearch(self, query: str, num_results: int):
+        cassette = active_cassette()
+        if cassette is None:
+            return await self._arequest_search(query, num_results)
+        return await cassette.ahttp("serper", {"q": query, "num": num_results},
+                                    lambda: self._arequest_search(query, num_results))
+
+    def _search_request(self, query: str, num_results: int):
+        """Return the URL, headers and body of the Serper search request."""
+        url = f"{self.base_url.rstrip('/')}/search"
+        payload = json.dumps({
+            "q": query,
+            "num": num_results,
+            "page": 1,
+            "hl": "en"
+        })
+        headers = {
+            'X-API-KEY': self.api_key,
+            'Content-Type': 'application/json',
+            'User-Agent': 'CrewAI/1.0 (Siebert_Content_Crew)'
+        }
+        return url, headers, payload
+
+    def _request_search(self, query: str, num_results: int):
+        url, headers, payload = self._search_request(query, num_results)
+        limiter = self.rate_limiter or serper_rate_limiter()
+        breaker = self.circuit_breaker or resilience_registry.breaker("serper")
+        latency = self.latency or resilience_registry.histogram("serper")
+
+        if not breaker.allow():
+            return self._fallback(query, num_results, CircuitOpenError("Serper circuit breaker is open"))
+
+        def timed_request():
+            # Wait for a shared request slot instead of racing other processes into 429s
+            limiter.acquire()
+            started = time.monotonic()
+            try:
+                response = requests.request("POST", url, headers=headers, data=payload, timeout=self.timeout)
+            except requests.exceptions.RequestException:
+                breaker.record_failure()
+                raise
+            finally:
+                latency.observe(time.monotonic() - started)
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return response
+
+        @backoff.on_exception(backoff.expo,
+                          requests.exceptions.RequestException,
+                          max_tries=3,
+                          giveup=lambda e: breaker.is_open)
+        @backoff.on_predicate(backoff.expo,
+                           lambda r: r.status_code >= 500 and not breaker.is_open,
+                           max_tries=3)
+        def make_request():
+            for attempt in range(1, MAX_RATE_LIMITED_ATTEMPTS + 1):
+                logger.log_api_call("Serper API", "search", "pending", f"Query: {query}")
+                # Duplicate the request when it is slower than usual and take the first response
+                response = hedged_call(timed_request, self._hedge_delay(latency))
+                if response.status_code != 429:
+                    return response
+                retry_after = self._retry_after(response)
+                logger.log_api_call("Serper API", "search", "rate limited",
+                                    f"Attempt {attempt}, requeued after {retry_after:.1f}s")
+                limiter.pause(retry_after)
+            return response
         
         try:
-            url = "https://google.serper.dev/search"
-            payload = json.dumps({
-                "q": query,
-                "num": num_results,
-                "page": 1,
-                "hl": "en"
-            })
-            headers = {
-                'X-API-KEY': self.api_key,
-                'Content-Type': 'application/json',
-                'User-Agent': 'CrewAI/1.0 (Siebert_Content_Crew)'
-            }
-            
-            @backoff.on_exception(backoff.expo,
-                              requests.exceptions.RequestException,
+            response = make_request()
+        except requests.exceptions.RequestException as e:
+            return self._fallback(query, num_results, e)
+        finally:
+            breaker.release()
+        return self._finish_request(query, num_results, response)
+
+    async def _arequest_search(self, query: str, num_results: int):
+        """
+        Async counterpart of _request_search on httpx: the same rate limiting, circuit
+        breaker, hedging, retries and cache fallback, without holding a thread while waiting.
+        """
+        url, headers, payload = self._search_request(query, num_results)
+        limiter = self.rate_limiter or serper_rate_limiter()
+        breaker = self.circuit_breaker or resilience_registry.breaker("serper")
+        latency = self.latency or resilience_registry.histogram("serper")
+
+        if not breaker.allow():
+            return await asyncio.to_thread(self._fallback, query, num_results,
+                                           CircuitOpenError("Serper circuit breaker is open"))
+
+        client = serper_async_client()
+
+        async def timed_request():
+            await limiter.acquire_async()
+            started = time.monotonic()
+            try:
+                response = await client.request("POST", url, headers=headers, content=payload,
+                                                timeout=self.timeout)
+            except httpx.RequestError:
+                breaker.record_failure()
+                raise
+            finally:
+                latency.observe(time.monotonic() - started)
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return response
+
+        @backoff.on_exception(backoff.expo,
+                              httpx.RequestError,
+                              max_tries=3,
+                              giveup=lambda e: breaker.is_open)
+        @backoff.on_predicate(backoff.expo,
+                              lambda r: r.status_code >= 500 and not breaker.is_open,
                               max_tries=3)
-            @backoff.on_predicate(backoff.expo,
-                               lambda r: r.status_code >= 500,
-                               max_tries=3)
-            def make_request():
+        async def make_request():
+            for attempt in range(1, MAX_RATE_LIMITED_ATTEMPTS + 1):
                 logger.log_api_call("Serper API", "search", "pending", f"Query: {query}")
-                return requests.request("POST", url, headers=headers, data=payload)
-            
-            response = make_request()
-            
-            if response.status_code == 403:
-                error_msg = "Invalid or missing API credentials - verify ConfigManager settings"
-                logger.log_error(error_msg)
-                return f"ERROR: {error_msg}. Please check your API configuration."
+                response = await hedged_call_async(timed_request, self._hedge_delay(latency))
+                if response.status_code != 429:
+                    return response
+                retry_after = self._retry_after(response)
+                logger.log_api_call("Serper API", "search", "rate limited",
+                                    f"Attempt {attempt}, requeued after {retry_after:.1f}s")
+                await asyncio.to_thread(limiter.pause, retry_after)
+            return response
 
-            if response.status_code != 200:
-                error_msg = f"API request failed: {response.status_code} - {response.text}"
-                logger.log_error(error_msg)
-                return f"ERROR: {error_msg}"
+        try:
+            response = await make_request()
+        except httpx.RequestError as e:
+            return await asyncio.to_thread(self._fallback, query, num_results, e)
+        finally:
+            breaker.release()
+        return await asyncio.to_thread(self._finish_request, query, num_results, response)
 
-            search_results = response.json()
-            
-            # Format the results
-            result_str = f"## Web Search Results for '{query}'\n\n"
-            
-            # Process organic results
-            if "organic" in search_results:
-                result_str += "### Top Results:\n"
-                for i, result in enumerate(search_results["organic"], 1):
-                    if i > num_results:
-                        break
-                    
-                    title = result.get("title", "No title")
-                    link = result.get("link", "No link")
-                    snippet = result.get("snippet", "No snippet")
-                    date = result.get("date", "Date not available")
-                    author = result.get("author", "Unknown author")
-                    
-                    result_str += f"**{i}. {title}**\n"
-                    result_str += f"- 🔗 [Source]({link})\n"
-                    result_str += f"- 👤 {author}\n" if author else ""
-                    result_str += f"- 📅 {date}\n" if date else ""
-                    result_str += f"- 📝 {snippet}\n\n"
-            
-            # Process knowledge graph
-            if "knowledgeGraph" in search_results:
-                kg = search_results["knowledgeGraph"]
-                result_str += "\n### Knowledge Graph:\n"
-                result_str += f"**{kg.get('title', 'N/A')}**\n"
-                result_str += f"- Type: {kg.get('type', 'N/A')}\n"
-                result_str += f"- Description: {kg.get('description', 'N/A')}\n"
+    def _finish_request(self, query: str, num_results: int, response):
+        """Cache a successful response, or answer a server error from the cache when possible."""
+        if response.status_code >= 500:
+            cached = self._read_cached_search(query, num_results)
+            if cached is not None:
+                logger.log_warning(f"Serper returned {response.status_code}; using cached results for '{query}'")
+                return CachedSearchResponse(cached)
+        elif response.status_code == 200 and response.json().get("organic"):
+            # Empty results are not kept: _fallback would later serve them as real results
+            self._write_cached_search(query, num_results, response.json())
+            self._store_in_corpus(query, num_results, response.json())
+        return response
+
+    def _hedge_delay(self, latency: LatencyHistogram) -> Optional[float]:
+        """Hedge after the observed p95 latency, or after hedge_delay until enough samples exist."""
+        if not self.hedge_delay:
+            return None
+        p95 = latency.percentile(95, min_samples=HEDGE_MIN_SAMPLES)
+        return self.hedge_delay if p95 is None else max(p95, MIN_HEDGE_DELAY)
+
+    def _fallback(self, query: str, num_results: int, error: Exception):
+        """Serve cached results when live search is unavailable, or re-raise the error."""
+        cached = self._read_cached_search(query, num_results)
+        if cached is None:
+            raise error
+        logger.log_warning(f"Live search unavailable ({str(error) or error.__class__.__name__}); "
+                           f"using cached results for '{query}'")
+        return CachedSearchResponse(cached)
+
+    def _cache_path(self, query: str, num_results: int) -> str:
+        key = f"{' '.join(query.lower().split())}|{num_results}"
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _read_cached_search(self, query: str, num_results: int) -> Optional[dict]:
+        try:
+            with open(self._cache_path(query, num_results), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cached_search(self, query: str, num_results: int, search_results: dict):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._cache_path(query, num_results)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(search_results, f)
+            os.replace(path + ".tmp", path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.log_warning(f"Could not cache search results for '{query}': {str(e)}")
+
+    def _research_corpus(self) -> Optional[ResearchCorpus]:
+        # A cassette run searches live (or from the cassette) so that every search is recorded
+        if not self.use_corpus or active_cassette() is not None:
+            return None
+        return self.corpus or research_corpus()
+
+    def _lookup_corpus(self, query: str, num_results: int) -> Optional[List[CorpusDocument]]:
+        """Return fresh corpus documents covering the query, or None to search live."""
+        try:
+            corpus = self._research_corpus()
+            return corpus.lookup(query, num_results) if corpus else None
+        except (OSError, sqlite3.Error) as e:
+            logger.log_warning(f"Research corpus unavailable, searching live for '{query}': {str(e)}")
+            return None
+
+    def _store_in_corpus(self, query: str, num_results: int, search_results: dict):
+        try:
+            corpus = self._research_corpus()
+            if corpus:
+                corpus.add_search_results(query, search_results, num_results)
+        except (OSError, sqlite3.Error) as e:
+            logger.log_warning(f"Could not add search results for '{query}' to the research corpus: {str(e)}")
+
+    @staticmethod
+    def _corpus_results(documents: List[CorpusDocument]) -> dict:
+        return {"organic": [{"title": document.title, "link": document.url, "snippet": document.snippet,
+                             "date": document.published} for document in documents]}
+
+    @staticmethod
+    def _retry_after(response) -> float:
+        try:
+            return max(1.0, float(response.headers.get("Retry-After", 1)))
+        except (TypeError, ValueError):
+            return 1.0
+
+    def _format_results(self, query: str, num_results: int, search_results: dict, note: str = None) -> str:
+        # Format the results
+        result_str = f"## Web Search Results for '{query}'\n\n"
+        if note:
+            result_str += f"{note}\n\n"
+        
+        # Process organic results
+        if "organic" in search_results:
+            result_str += "### Top Results:\n"
+            for i, result in enumerate(search_results["organic"], 1):
+                if i > num_results:
+                    break
+                
+                title = result.get("title", "No title")
+                link = result.get("link", "No link")
+                snippet = result.get("snippet", "No snippet")
+                date = result.get("date", "Date not available")
+                author = result.get("author", "Unknown author")
                 
-                for attr, value in kg.get('attributes', {}).items():
-                    result_str += f"- {attr.capitalize()}: {value}\n"
+                result_str += f"**{i}. {title}**\n"
+                result_str += f"- 🔗 [Source]({link})\n"
+                result_str += f"- 👤 {author}\n" if author else ""
+                result_str += f"- 📅 {date}\n" if date else ""
+                result_str += f"- 📝 {snippet}\n\n"
+        
+        # Process knowledge graph
+        if "knowledgeGraph" in search_results:
+            kg = search_results["knowledgeGraph"]
+            result_str += "\n### Knowledge Graph:\n"
+            result_str += f"**{kg.get('title', 'N/A')}**\n"
+            result_str += f"- Type: {kg.get('type', 'N/A')}\n"
+            result_str += f"- Description: {kg.get('description', 'N/A')}\n"
             
-            logger.log_info(f"Found {min(num_results, len(search_results.get('organic', [])))} search results for '{query}'")
-            return result_str
+            for attr, value in kg.get('attributes', {}).items():
+                result_str += f"- {attr.capitalize()}: {value}\n"
         
-        except Exception as e:
-            error_msg = f"Error searching the web: {str(e)}"
-            logger.log_error(error_msg)
-            return error_msg
\ No newline at end of file
+        return result_str
@@ -1,5 +1,24 @@
 from .logger import logger, ContentEditorLogger
 from .config_manager import ConfigManager, config_manager
 from .csv_manager import CSVManager
+from .compliance_checker import ComplianceChecker, ComplianceReport
+from .rate_limiter import RateLimiter, QuotaExceededError
+from .resilience import CircuitBreaker, CircuitOpenError, LatencyHistogram, resilience_registry
+from .run_budget import RunBudget, run_budget
+from .single_flight import SingleFlight, single_flight
+from .job_queue import Job, JobQueue, JobWorker, SQLiteJobQueue
+from .profiler import RunProfiler, profiler
+from .prompt_layout import PromptLayout
+from .research_corpus import ResearchCorpus
+from .eval_runner import EvaluationRunner
+from .content_archive import ContentArchive
+from .scheduler import JobEstimate, JobScheduler
+from .cassette import Cassette, CassetteMissError, active_cassette
 
-__all__ = ['logger', 'ContentEditorLogger', 'ConfigManager', 'config_manager', 'CSVManager']
\ No newline at end of file
+__all__ = ['logger', 'ContentEditorLogger', 'ConfigManager', 'config_manager', 'CSVManager',
+           'ComplianceChecker', 'ComplianceReport', 'RateLimiter', 'QuotaExceededError',
+           'CircuitBreaker', 'CircuitOpenError', 'LatencyHistogram', 'resilience_registry',
+           'RunBudget', 'run_budget', 'SingleFlight', 'single_flight',
+           'Job', 'JobQueue', 'JobWorker', 'SQLiteJobQueue', 'RunProfiler', 'profiler',
+           'PromptLayout', 'ResearchCorpus', 'EvaluationRunner', 'ContentArchive',
+           'JobEstimate', 'JobScheduler', 'Cassette', 'CassetteMissError', 'active_cassette']
\ No newline at end of file
@@ -0,0 +1,266 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+from pydantic import BaseModel
+from .logger import logger
+
+CASSETTE_VERSION = 1
+CASSETTE_MODES = ("record", "replay")
+# LLM parameters that are secrets or change between otherwise identical calls
+_VOLATILE_LLM_PARAMS = ("api_key", "api_base", "base_url", "api_version", "callbacks", "timeout", "metadata",
+                        "stream_options")
+# HTTP response headers kept in a cassette (the tools only read Retry-After)
+_RECORDED_HEADERS = ("Retry-After", "Content-Type")
+
+
+class CassetteMissError(RuntimeError):
+    """Raised on replay when a request has no recorded interaction left."""
+
+
+class RecordedError(RuntimeError):
+    """A call that failed while recording, raised again on replay with the original message."""
+
+
+class Interaction(BaseModel):
+    """One recorded LLM or Serper call."""
+    kind: str
+    key: str
+    request: Dict[str, Any]
+    response: Optional[Any] = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+
+class RecordedResponse:
+    """Stand-in for an HTTP response served from a cassette."""
+
+    def __init__(self, status_code: int, text: str, headers: Dict[str, str] = None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+def request_key(kind: str, request: Dict[str, Any]) -> str:
+    """Return the matching key of a request: a hash of its kind and normalized parameters."""
+    normalized = json.dumps({"kind": kind, "request": request}, sort_keys=True, default=repr)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:24]
+
+
+def _dump_http(response) -> Dict[str, Any]:
+    headers = {name: response.headers[name] for name in _RECORDED_HEADERS if name in response.headers}
+    return {"status_code": response.status_code, "text": response.text, "headers": headers}
+
+
+def _load_http(data: Dict[str, Any]) -> RecordedResponse:
+    return RecordedResponse(data["status_code"], data["text"], data.get("headers"))
+
+
+def _dump_llm(response) -> Any:
+    if isinstance(response, list):
+        return [chunk.model_dump(mode="json") for chunk in response]
+    return response.model_dump(mode="json")
+
+
+def _load_llm(data: Any) -> Any:
+    from litellm import ModelResponse, ModelResponseStream
+
+    if isinstance(data, list):
+        return [ModelResponseStream(**chunk) for chunk in data]
+    return ModelResponse(**data)
+
+
+_active: Optional["Cassette"] = None
+
+
+def active_cassette() -> Optional["Cassette"]:
+    """Return the cassette recording or replaying the current run, if any."""
+    return _active
+
+
+class Cassette:
+    """
+    Records every LLM completion and Serper search of a run into a gzipped JSON file, or
+    serves them back in a later run without network access.
+
+    Calls are matched on a hash of their request (LLM parameters without secrets, the
+    Serper query); identical requests are served in recording order. When a request
+    changed since recording (e.g. an edited prompt), the next unused call of the same
+    kind is served instead with a warning, unless strict. Replayed calls return at once,
+    or after their recorded duration times latency_scale.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", latency_scale: float = 0.0, strict: bool = False):
+        """
+        Initialize the cassette.
+
+        Args:
+            path: The cassette file (e.g. output/cassettes/run.json.gz)
+            mode: record or replay
+            latency_scale: Fraction of the recorded durations to wait on replay (0 = no wait)
+            strict: Raise CassetteMissError instead of serving a changed request out of order
+        """
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Invalid cassette mode '{mode}'. Valid options are: {', '.join(CASSETTE_MODES)}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self.inputs: Dict[str, Any] = {}
+        self.interactions: List[Interaction] = []
+        self._pending: Dict[str, Deque[int]] = {}
+        self._used: set = set()
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version {data.get('version')} in {self.path}")
+        self.inputs = data.get("inputs") or {}
+        self.interactions = [Interaction(**interaction) for interaction in data["interactions"]]
+        for index, interaction in enumerate(self.interactions):
+            self._pending.setdefault(interaction.key, deque()).append(index)
+        logger.log_data_access("Cassette", self.path, "read", f"{len(self.interactions)} interactions")
+
+    def save(self):
+        """Write the recorded interactions (atomically replacing the file)."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock:
+            data = {"version": CASSETTE_VERSION, "created_at": time.time(), "inputs": self.inputs,
+                    "interactions": [interaction.model_dump() for interaction in self.interactions]}
+        with gzip.open(self.path + ".tmp", "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"), default=repr)
+        os.replace(self.path + ".tmp", self.path)
+        logger.log_data_access("Cassette", self.path, "write", f"{len(data['interactions'])} interactions")
+
+    @contextmanager
+    def activate(self):
+        """Route LLM completions and Serper searches through this cassette while the block runs."""
+        global _active
+        import litellm
+
+        original = litellm.completion
+
+        def completion(*args, **kwargs):
+            params = dict(zip(("model", "messages"), args), **kwargs)
+            request = {name: value for name, value in params.items()
+                       if name not in _VOLATILE_LLM_PARAMS and value is not None}
+            if params.get("stream"):
+                # Streams are recorded whole and handed back as an iterator of chunks
+                return iter(self.call("llm", request, lambda: list(original(*args, **kwargs)), _dump_llm, _load_llm))
+            return self.call("llm", request, lambda: original(*args, **kwargs), _dump_llm, _load_llm)
+
+        litellm.completion = completion
+        _active = self
+        try:
+            yield self
+        finally:
+            litellm.completion = original
+            _active = None
+            if self.recording:
+                self.save()
+
+    def call(self, kind: str, request: Dict[str, Any], func: Callable[[], Any],
+             dump: Callable[[Any], Any], load: Callable[[Any], Any]) -> Any:
+        """
+        Record func's result for the request, or serve the recorded one.
+
+        Args:
+            kind: The kind of call (llm or serper)
+            request: The request parameters the call is matched on
+            func: Performs the call (only while recording)
+            dump: Turns a result into JSON data
+            load: Turns recorded JSON data back into a result
+
+        Returns:
+            The live or recorded result
+        """
+        if self.replaying:
+            interaction = self._next(kind, request)
+            if self.latency_scale and interaction.seconds:
+                time.sleep(interaction.seconds * self.latency_scale)
+            return self._served(interaction, load)
+
+        started = time.monotonic()
+        try:
+            result = func()
+        except Exception as e:
+            self._record(kind, request, None, str(e), time.monotonic() - started)
+            raise
+        self._record(kind, request, dump(result), None, time.monotonic() - started)
+        return result
+
+    async def acall(self, kind: str, request: Dict[str, Any], func: Callable[[], Awaitable[Any]],
+                    dump: Callable[[Any], Any], load: Callable[[Any], Any]) -> Any:
+        """Async counterpart of call."""
+        if self.replaying:
+            interaction = self._next(kind, request)
+            if self.latency_scale and interaction.seconds:
+                await asyncio.sleep(interaction.seconds * self.latency_scale)
+            return self._served(interaction, load)
+
+        started = time.monotonic()
+        try:
+            result = await func()
+        except Exception as e:
+            self._record(kind, request, None, str(e), time.monotonic() - started)
+            raise
+        self._record(kind, request, dump(result), None, time.monotonic() - started)
+        return result
+
+    def http(self, kind: str, request: Dict[str, Any], func: Callable[[], Any]) -> Any:
+        """Record or serve an HTTP call whose result has status_code, text and headers."""
+        return self.call(kind, request, func, _dump_http, _load_http)
+
+    async def ahttp(self, kind: str, request: Dict[str, Any], func: Callable[[], Awaitable[Any]]) -> Any:
+        """Async counterpart of http."""
+        return await self.acall(kind, request, func, _dump_http, _load_http)
+
+    def _record(self, kind: str, request: Dict[str, Any], response: Any, error: Optional[str], seconds: float):
+        interaction = Interaction(kind=kind, key=request_key(kind, request), request=request, response=response,
+                                  error=error, seconds=round(seconds, 3))
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def _next(self, kind: str, request: Dict[str, Any]) -> Interaction:
+        key = request_key(kind, request)
+        with self._lock:
+            queue = self._pending.get(key)
+            if queue:
+                index = queue.popleft()
+            else:
+                index = next((index for index, interaction in enumerate(self.interactions)
+                              if interaction.kind == kind and index not in self._used), None)
+                if index is None or self.strict:
+                    raise CassetteMissError(f"No recorded {kind} call left for this request in {self.path}")
+                logger.log_warning(f"Cassette: {kind} request changed since recording; "
+                                   f"serving recorded call {index} in order")
+                self._pending[self.interactions[index].key].remove(index)
+            self._used.add(index)
+        return self.interactions[index]
+
+    @staticmethod
+    def _served(interaction: Interaction, load: Callable[[Any], Any]) -> Any:
+        if interaction.error is not None:
+            raise RecordedError(interaction.error)
+        return load(interaction.response)
@@ -0,0 +1,246 @@
+import re
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+from .logger import logger
+
+# Rule kinds that must NOT appear in a draft
+PROHIBITED_KINDS = ("avoid_term", "forbidden_element", "compliance_rule")
+# Rule kinds that MUST appear in a draft
+REQUIRED_KINDS = ("mandatory_element", "disclaimer")
+
+# Concept patterns for descriptive rules ("Specific return promises") that would never
+# match literally. Keyed by a fragment of the rule text, lowercase.
+_CONCEPT_PATTERNS = {
+    "return promise": [
+        r"\b(?:guarantee[sd]?|promis(?:e[sd]?|ing))\b[^.\n]{0,40}?\breturns?\b",
+        r"\b\d+(?:\.\d+)?\s?%\s+(?:annual\s+|yearly\s+|monthly\s+)?(?:returns?|gains?|yields?)\b",
+    ],
+    "competitor": [
+        r"\b(?:unlike|better than|superior to|outperform(?:s|ing)?)\s+(?:other|competing|rival)\s+"
+        r"(?:firms?|brokers?|advisors?|banks?|compan(?:y|ies))\b",
+    ],
+    "tax optimization": [r"\btax[- ](?:optimi[sz]\w*|avoidance|shelters?|loopholes?)\b"],
+    "tax advice": [r"\btax[- ](?:advice|optimi[sz]\w*|avoidance|shelters?|loopholes?)\b"],
+    "cross-border": [r"\bcross[- ]border\b"],
+    "market timing": [r"\bmarket timing\b", r"\btim(?:e|ing) the market\b"],
+    "hot stock": [r"\bhot stock(?: tips?| picks?)?\b"],
+}
+
+# Words ignored when turning a mandatory element into stems
+_STOP_WORDS = {"and", "the", "for", "with", "of", "to", "a", "an", "on", "in", "importance"}
+
+
+class ComplianceRule(BaseModel):
+    """A single compiled compliance rule."""
+    kind: str
+    label: str
+    pattern: str
+
+
+class ComplianceViolation(BaseModel):
+    """A prohibited match found in a draft."""
+    kind: str
+    rule: str
+    match: str
+    start: int
+    end: int
+
+
+class ComplianceReport(BaseModel):
+    """Result of scanning a draft against the compliance automaton."""
+    violations: List[ComplianceViolation] = Field(default_factory=list)
+    missing_elements: List[str] = Field(default_factory=list)
+    missing_disclaimers: List[str] = Field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return not (self.violations or self.missing_elements or self.missing_disclaimers)
+
+    def to_prompt(self) -> str:
+        """Render the report as instructions for the editing agent."""
+        if self.passed:
+            return "Deterministic compliance scan: no violations found, all mandatory elements and disclaimers present."
+
+        lines = ["Deterministic compliance scan findings (fix only these):"]
+        for violation in self.violations:
+            lines.append(f"- Remove {violation.kind.replace('_', ' ')} '{violation.match}' "
+                         f"(rule: {violation.rule}, chars {violation.start}-{violation.end})")
+        for element in self.missing_elements:
+            lines.append(f"- Add missing mandatory element: {element}")
+        for disclaimer in self.missing_disclaimers:
+            lines.append(f"- Add missing disclaimer text: \"{disclaimer}\"")
+        return "\n".join(lines)
+
+
+class ComplianceChecker:
+    """
+    Deterministic compliance scanner for drafts.
+    Compiles avoid terms, forbidden elements and compliance CSV rules into a single regex
+    automaton that finds every violation in one pass. Mandatory elements and disclaimers
+    are searched for separately, so that rules matching at the same offset cannot hide
+    each other.
+    """
+
+    def __init__(self, avoid_terms: List[str] = None, forbidden_elements: List[str] = None,
+                 mandatory_elements: List[str] = None, disclaimers: List[str] = None,
+                 compliance_rules: List[str] = None):
+        """
+        Initialize the checker and compile the automaton.
+
+        Args:
+            avoid_terms: Literal terms that must not appear in the draft
+            forbidden_elements: Forbidden elements (literal or known concepts)
+            mandatory_elements: Elements the draft must mention
+            disclaimers: Disclaimer sentences the draft must contain
+            compliance_rules: Prohibited content rules taken from compliance_info.csv
+        """
+        self.rules: List[ComplianceRule] = []
+        # Mandatory element label -> indexes of the stem rules that satisfy it
+        self._element_rules: Dict[str, List[int]] = {}
+
+        for term in avoid_terms or []:
+            self._add_rule("avoid_term", term, self._phrase_pattern(term))
+        for element in forbidden_elements or []:
+            for pattern in self._concept_patterns(element):
+                self._add_rule("forbidden_element", element, pattern)
+        for rule in compliance_rules or []:
+            for pattern in self._concept_patterns(rule):
+                self._add_rule("compliance_rule", rule, pattern)
+        for element in mandatory_elements or []:
+            indexes = [self._add_rule("mandatory_element", element, rf"\b{re.escape(stem)}\w*")
+                       for stem in self._stems(element)]
+            if indexes:
+                self._element_rules[element] = indexes
+        for disclaimer in disclaimers or []:
+            self._add_rule("disclaimer", disclaimer, self._phrase_pattern(disclaimer))
+
+        self._automaton = self._compile()
+        self._required = {index: re.compile(rule.pattern, re.IGNORECASE) for index, rule in enumerate(self.rules)
+                          if rule.kind in REQUIRED_KINDS}
+        logger.log_info(f"Compliance checker compiled {len(self.rules) - len(self._required)} prohibited rules "
+                        f"into a single automaton and {len(self._required)} required rules")
+
+    @classmethod
+    def from_inputs(cls, inputs: Dict[str, str], compliance_info: Dict[str, str] = None) -> "ComplianceChecker":
+        """
+        Build a checker from crew kickoff inputs and the compliance_info CSV data.
+
+        Args:
+            inputs: The crew inputs (avoid_terms, forbidden_elements, mandatory_elements, disclaimers)
+            compliance_info: The compliance_info CSV data as loaded by CSVManager
+
+        Returns:
+            A compiled ComplianceChecker
+        """
+        compliance_rules = []
+        csv_disclaimers = []
+        for key, value in (compliance_info or {}).items():
+            key_lower = str(key).lower()
+            if not isinstance(value, str) or not value.strip():
+                continue
+            if any(marker in key_lower for marker in ("prohibit", "forbidden", "vietat")):
+                compliance_rules.extend(split_numbered_list(value))
+            elif "disclaimer" in key_lower:
+                csv_disclaimers.extend(split_sentences(value))
+
+        return cls(
+            avoid_terms=split_list(inputs.get("avoid_terms")),
+            forbidden_elements=split_list(inputs.get("forbidden_elements")),
+            mandatory_elements=split_list(inputs.get("mandatory_elements")),
+            disclaimers=split_sentences(inputs.get("disclaimers")) + csv_disclaimers,
+            compliance_rules=compliance_rules,
+        )
+
+    def scan(self, draft: str) -> ComplianceReport:
+        """
+        Scan a draft: one automaton pass for violations, one search per required rule.
+
+        Args:
+            draft: The draft text
+
+        Returns:
+            A ComplianceReport with violation spans and missing required elements
+        """
+        report = ComplianceReport()
+        if self._automaton is not None and draft:
+            for match in self._automaton.finditer(draft):
+                rule = self.rules[int(match.lastgroup[1:])]
+                report.violations.append(ComplianceViolation(
+                    kind=rule.kind, rule=rule.label, match=match.group(0),
+                    start=match.start(), end=match.end()))
+
+        matched = {index for index, pattern in self._required.items() if draft and pattern.search(draft)}
+
+        report.missing_elements = [element for element, indexes in self._element_rules.items()
+                                   if not all(index in matched for index in indexes)]
+        report.missing_disclaimers = [rule.label for index, rule in enumerate(self.rules)
+                                      if rule.kind == "disclaimer" and index not in matched]
+
+        logger.log_info(f"Compliance scan: {len(report.violations)} violations, "
+                        f"{len(report.missing_elements)} missing elements, "
+                        f"{len(report.missing_disclaimers)} missing disclaimers")
+        return report
+
+    def _add_rule(self, kind: str, label: str, pattern: str) -> int:
+        self.rules.append(ComplianceRule(kind=kind, label=label, pattern=pattern))
+        return len(self.rules) - 1
+
+    def _compile(self) -> Optional[re.Pattern]:
+        prohibited = [i for i, rule in enumerate(self.rules) if rule.kind in PROHIBITED_KINDS]
+        if not prohibited:
+            return None
+        # Most specific first, so the leftmost match reports the rule the author listed verbatim:
+        # avoid terms, then literal phrases, then concept patterns, longest first within each
+        order = sorted(prohibited, key=lambda i: (self._specificity(self.rules[i]), -len(self.rules[i].pattern)))
+        return re.compile("|".join(f"(?P<r{i}>{self.rules[i].pattern})" for i in order), re.IGNORECASE)
+
+    @classmethod
+    def _specificity(cls, rule: ComplianceRule) -> int:
+        if rule.kind == "avoid_term":
+            return 0
+        return 1 if rule.pattern == cls._phrase_pattern(rule.label) else 2
+
+    @staticmethod
+    def _phrase_pattern(phrase: str) -> str:
+        words = [re.escape(word) for word in phrase.split()]
+        pattern = r"\s+".join(words)
+        # Only anchor on word boundaries where the phrase starts/ends with a word character
+        if re.match(r"\w", phrase.strip()):
+            pattern = r"\b" + pattern
+        if re.search(r"\w$", phrase.strip()):
+            pattern = pattern + r"\b"
+        return pattern
+
+    @classmethod
+    def _concept_patterns(cls, element: str) -> List[str]:
+        element_lower = element.lower()
+        patterns = [pattern for concept, concept_patterns in _CONCEPT_PATTERNS.items()
+                    if concept in element_lower for pattern in concept_patterns]
+        return patterns or [cls._phrase_pattern(element)]
+
+    @staticmethod
+    def _stems(element: str) -> List[str]:
+        words = re.findall(r"[a-zA-Z]+", element.lower())
+        return [word[:7] for word in words if word not in _STOP_WORDS and len(word) > 2]
+
+
+def split_list(value: Optional[str]) -> List[str]:
+    """Split a comma-separated input value into trimmed items."""
+    if not value:
+        return []
+    return [item.strip() for item in str(value).split(",") if item.strip()]
+
+
+def split_numbered_list(value: Optional[str]) -> List[str]:
+    """Split '1. Foo 2. Bar' style CSV cells into items."""
+    if not value:
+        return []
+    items = re.split(r"(?:^|\s)\d+\.\s+", str(value))
+    return [item.strip(" ;,") for item in items if item.strip(" ;,")]
+
+
+def split_sentences(value: Optional[str]) -> List[str]:
+    """Split disclaimer text into sentences that must each be present."""
+    if not value:
+        return []
+    return [sentence.strip() for sentence in re.split(r"(?<=[.!?])\s+", str(value)) if sentence.strip()]
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import time
+from contextlib import closing
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+from .logger import logger
+
+# MinHash signature length and LSH banding: 16 bands of 4 rows make pieces with a Jaccard
+# similarity around 0.5 and above very likely to share a bucket
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+# Estimated similarity from which a prior piece is reported (override with CONTENT_CREW_DUPLICATE_THRESHOLD)
+DEFAULT_THRESHOLD = 0.6
+_MERSENNE_PRIME = (1 << 61) - 1
+_TOKEN_RE = re.compile(r"\w+")
+# Inputs derived for a kickoff (prompt layout, starting draft) are not archived with a piece
+_DERIVED_INPUTS = ("request_details", "draft_details", "prompt_layout_file", "starting_draft", "output_dir")
+
+
+def _permutation(seed: int) -> tuple:
+    """Draw the (a, b) of one hash function a * x + b from a single seeded generator."""
+    rng = random.Random(seed)
+    return rng.randrange(1, _MERSENNE_PRIME), rng.randrange(_MERSENNE_PRIME)
+
+
+_PERMUTATIONS = [_permutation(seed) for seed in range(1, NUM_PERMUTATIONS + 1)]
+
+
+class ArchivedPiece(BaseModel):
+    """A final output stored in the content archive with the inputs that produced it."""
+    id: int
+    brand: str = ""
+    request: str
+    inputs: Dict[str, Any] = {}
+    content: str
+    output_dir: str = ""
+    created_at: float
+
+
+class ArchiveMatch(BaseModel):
+    """A prior piece whose request or content is close to the one being checked."""
+    piece: ArchivedPiece
+    similarity: float
+    matched_on: str
+
+
+def shingles(text: str, kind: str = "content") -> set:
+    """
+    Split text into the shingles compared by MinHash: character 4-grams for requests,
+    which are a sentence long, and word 3-grams for content.
+    """
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    if kind == "request":
+        joined = " ".join(tokens)
+        return {joined[i:i + 4] for i in range(max(len(joined) - 3, 1))} if joined else set()
+    if len(tokens) < 3:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + 3]) for i in range(len(tokens) - 2)}
+
+
+def minhash(text: str, kind: str = "content") -> Optional[List[int]]:
+    """Return the MinHash signature of text, or None when it has no words."""
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+              for shingle in shingles(text, kind)]
+    if not hashes:
+        return None
+    return [min((a * value + b) % _MERSENNE_PRIME for value in hashes) for a, b in _PERMUTATIONS]
+
+
+def signature_similarity(first: List[int], second: List[int]) -> float:
+    """Estimate the Jaccard similarity of two texts from their signatures."""
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+def _buckets(signature: List[int]) -> List[str]:
+    rows = len(signature) // LSH_BANDS
+    return [hashlib.blake2b(json.dumps(signature[band * rows:(band + 1) * rows]).encode("utf-8"),
+                            digest_size=8).hexdigest() for band in range(LSH_BANDS)]
+
+
+class ContentArchive:
+    """
+    Local archive of every final output with the inputs that produced it. Requests and
+    contents are indexed with MinHash signatures in LSH buckets, so that a new request can
+    be checked against all prior pieces without comparing it to each one: only pieces that
+    share a bucket are scored, and those above the threshold are reported.
+    """
+
+    def __init__(self, db_path: str = None, threshold: float = None):
+        """
+        Initialize the archive.
+
+        Args:
+            db_path: The SQLite file (default: $CONTENT_CREW_CACHE_DIR/content_archive.sqlite)
+            threshold: Minimum estimated similarity of a reported piece
+                (default: CONTENT_CREW_DUPLICATE_THRESHOLD or 0.6)
+        """
+        self.db_path = db_path or os.path.join(
+            os.getenv("CONTENT_CREW_CACHE_DIR", os.path.join(os.getcwd(), ".cache")), "content_archive.sqlite")
+        self.threshold = float(threshold if threshold is not None
+                               else os.getenv("CONTENT_CREW_DUPLICATE_THRESHOLD", DEFAULT_THRESHOLD))
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS pieces (
+                id INTEGER PRIMARY KEY,
+                brand TEXT,
+                request TEXT NOT NULL,
+                inputs TEXT NOT NULL,
+                content TEXT NOT NULL,
+                output_dir TEXT,
+                created_at REAL NOT NULL,
+                request_signature TEXT,
+                content_signature TEXT)""")
+            conn.execute("""CREATE TABLE IF NOT EXISTS lsh_buckets (
+                kind TEXT NOT NULL,
+                band INTEGER NOT NULL,
+                bucket TEXT NOT NULL,
+                piece_id INTEGER NOT NULL,
+                PRIMARY KEY (kind, band, bucket, piece_id))""")
+
+    def _connect(self) -> closing:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return closing(conn)
+
+    def add(self, inputs: Dict[str, Any], content: str, output_dir: str = None) -> int:
+        """
+        Archive a final output.
+
+        Args:
+            inputs: The inputs of the run
+            content: The final content
+            output_dir: Where the formatted outputs were written
+
+        Returns:
+            The id of the archived piece
+        """
+        request = str(inputs.get("content_request") or "")
+        request_signature = minhash(request, "request")
+        content_signature = minhash(content, "content")
+        stored_inputs = {key: value for key, value in inputs.items()
+                         if key not in _DERIVED_INPUTS and isinstance(value, (str, int, float, bool))}
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.execute(
+                    "INSERT INTO pieces (brand, request, inputs, content, output_dir, created_at, "
+                    "request_signature, content_signature) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (inputs.get("brand_name") or "", request, json.dumps(stored_inputs), content, output_dir or "",
+                     time.time(), json.dumps(request_signature), json.dumps(content_signature)))
+                piece_id = cursor.lastrowid
+                for kind, signature in (("request", request_signature), ("content", content_signature)):
+                    if signature is not None:
+                        conn.executemany("INSERT OR IGNORE INTO lsh_buckets (kind, band, bucket, piece_id) VALUES (?, ?, ?, ?)",
+                                         [(kind, band, bucket, piece_id) for band, bucket in enumerate(_buckets(signature))])
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        logger.log_data_access("ContentArchive", self.db_path, "write", f"Piece {piece_id} for '{request}'")
+        return piece_id
+
+    def find_similar_requests(self, inputs: Dict[str, Any], limit: int = 3) -> List[ArchiveMatch]:
+        """Return prior pieces of the same brand whose request is close to inputs['content_request']."""
+        return self._find("request", str(inputs.get("content_request") or ""), inputs.get("brand_name"), limit)
+
+    def find_similar_content(self, content: str, brand: str = None, limit: int = 3,
+                             exclude: int = None) -> List[ArchiveMatch]:
+        """Return prior pieces whose content is close to content."""
+        return [match for match in self._find("content", content, brand, limit + 1) if match.piece.id != exclude][:limit]
+
+    def _find(self, kind: str, text: str, brand: Optional[str], limit: int) -> List[ArchiveMatch]:
+        signature = minhash(text, kind)
+        if signature is None:
+            return []
+        matches = []
+        with self._connect() as conn:
+            candidates = set()
+            for band, bucket in enumerate(_buckets(signature)):
+                candidates.update(piece_id for (piece_id,) in conn.execute(
+                    "SELECT piece_id FROM lsh_buckets WHERE kind = ? AND band = ? AND bucket = ?", (kind, band, bucket)))
+            for piece_id in candidates:
+                row = conn.execute(f"SELECT id, brand, request, inputs, content, output_dir, created_at, {kind}_signature "
+                                   "FROM pieces WHERE id = ?", (piece_id,)).fetchone()
+                if row is None or (brand and row[1] and row[1] != brand):
+                    continue
+                similarity = signature_similarity(signature, json.loads(row[7]))
+                if similarity >= self.threshold:
+                    piece = ArchivedPiece(id=row[0], brand=row[1] or "", request=row[2], inputs=json.loads(row[3]),
+                                          content=row[4], output_dir=row[5] or "", created_at=row[6])
+                    matches.append(ArchiveMatch(piece=piece, similarity=round(similarity, 3), matched_on=kind))
+        # Most similar first, the most recent piece breaking ties
+        matches.sort(key=lambda match: (-match.similarity, -match.piece.created_at))
+        return matches[:limit]
+
+    def get(self, piece_id: int) -> Optional[ArchivedPiece]:
+        """Return an archived piece by id."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT id, brand, request, inputs, content, output_dir, created_at FROM pieces "
+                               "WHERE id = ?", (piece_id,)).fetchone()
+        if row is None:
+            return None
+        return ArchivedPiece(id=row[0], brand=row[1] or "", request=row[2], inputs=json.loads(row[3]),
+                             content=row[4], output_dir=row[5] or "", created_at=row[6])
+
+
+@lru_cache(maxsize=None)
+def content_archive() -> ContentArchive:
+    """Return the process-wide content archive, shared with other runs on disk."""
+    return ContentArchive()
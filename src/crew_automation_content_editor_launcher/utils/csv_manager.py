@@ -1,7 +1,7 @@
 import os
 import csv
-import pandas as pd
-from typing import Dict, List, Any, Optional
+import threading
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from pydantic import BaseModel
 from .logger import logger
 
@@ -10,12 +10,153 @@ class CSVManagerConfig(BaseModel):
     class Config:
         arbitrary_types_allowed = True
 
+# Marks a key that did not exist before the open last row was parsed
+_MISSING = object()
+
+
+class IndexedSheet:
+    """
+    A key/value CSV sheet parsed up to a byte offset of its file. Rows appended to the file
+    are parsed from that offset with the csv module, one record at a time, so a refresh
+    costs as much as the new tail. Any other change (a shorter file, or different bytes at
+    the start of the file or just before the offset) rebuilds the sheet from scratch.
+    Rows with more fields than columns keep the extra fields in their value (unquoted
+    commas), and later rows override earlier ones with the same key.
+    """
+    
+    # Bytes compared at the start of the file and before the offset to detect in-place edits
+    check_window = 4096
+    
+    def __init__(self, csv_path: str, columns: Callable[[List[str]], Tuple[int, int]]):
+        """
+        Initialize an empty sheet.
+        
+        Args:
+            csv_path: The path to the CSV file
+            columns: Maps the header row to the (key, value) column indexes
+        """
+        self.csv_path = csv_path
+        self.columns = columns
+        self.data: Dict[str, str] = {}
+        self.header: Optional[List[str]] = None
+        self.key_column, self.value_column = 0, 1
+        self.offset = 0
+        self.rows = 0
+        self.version: Optional[Tuple[int, int]] = None
+        self._head = b""
+        self._boundary = b""
+        # A last row without a line ending: parsed, but read again on the next refresh
+        self._open_row: Optional[Tuple[str, Any]] = None
+        self.lock = threading.Lock()
+    
+    def refresh(self) -> str:
+        """
+        Bring the sheet up to date with its file.
+        
+        Returns:
+            "cached", "appended" or "rebuilt"
+        """
+        stat = os.stat(self.csv_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        if version == self.version:
+            return "cached"
+        
+        with open(self.csv_path, 'rb') as f:
+            if self.version is not None and self._is_append(f, stat.st_size):
+                self._undo_open_row()
+                self._parse(f)
+                operation = "appended"
+            else:
+                self._reset()
+                self._parse(f)
+                operation = "rebuilt"
+        self.version = version
+        return operation
+    
+    def _is_append(self, f, size: int) -> bool:
+        """True when the bytes parsed so far are unchanged and the file only grew."""
+        if size <= self.version[1]:
+            return False
+        f.seek(0)
+        if f.read(len(self._head)) != self._head:
+            return False
+        f.seek(self.offset - len(self._boundary))
+        return f.read(len(self._boundary)) == self._boundary
+    
+    def _reset(self):
+        self.data = {}
+        self.header = None
+        self.offset = 0
+        self.rows = 0
+        self._open_row = None
+    
+    def _undo_open_row(self):
+        if self._open_row is None:
+            return
+        key, previous = self._open_row
+        if previous is _MISSING:
+            self.data.pop(key, None)
+        else:
+            self.data[key] = previous
+        self._open_row = None
+    
+    def _parse(self, f):
+        """Parse the records after the offset, advancing it past every complete record."""
+        f.seek(self.offset)
+        record = b""
+        for line in f:
+            record += line
+            # A newline inside a quoted field continues the record on the next line
+            if record.count(b'"') % 2:
+                continue
+            if not record.endswith(b"\n"):
+                # Last row still being written (or no final newline): keep it, but do not consume it
+                self._add(record, consumed=False)
+                break
+            self._add(record, consumed=True)
+            self.offset += len(record)
+            record = b""
+        
+        f.seek(0)
+        self._head = f.read(min(self.offset, self.check_window))
+        f.seek(max(self.offset - self.check_window, 0))
+        self._boundary = f.read(self.offset - max(self.offset - self.check_window, 0))
+    
+    def _add(self, record: bytes, consumed: bool):
+        row = next(csv.reader([record.decode('utf-8-sig' if self.header is None else 'utf-8')]), [])
+        if not row:
+            return
+        if self.header is None:
+            if consumed:
+                self.header = row
+                self.key_column, self.value_column = self.columns(row)
+            return
+        if consumed:
+            self.rows += 1
+        if len(row) <= self.key_column or not row[self.key_column].strip():
+            return
+        key = row[self.key_column]
+        # Unquoted commas split the value over several fields: keep them all in the value
+        value = ",".join(row[self.value_column:]) if self.value_column == len(self.header) - 1 else (
+            row[self.value_column] if len(row) > self.value_column else "")
+        if not consumed:
+            self._open_row = (key, self.data.get(key, _MISSING))
+        self.data[key] = value
+
+
+
 class CSVManager:
     """
     Manages loading, parsing, and validating CSV files for the Content Editor System.
     Handles the three RAG CSV files: brand_info, best_practices, and compliance_info.
+    Parsed files are cached per path for all instances; rows appended to a file are parsed
+    incrementally, and any other change rebuilds it.
     """
     
+    # csv_path -> parsed sheet
+    _cache: Dict[str, IndexedSheet] = {}
+    _cache_lock = threading.Lock()
+    
     def __init__(self, base_dir: str = None):
         """
         Initialize the CSV Manager with the base directory for RAG files.
@@ -94,26 +235,59 @@ class CSVManager:
         
         logger.log_info(f"Created empty {csv_name} CSV file at {csv_path}")
     
+    def _load_cached(self, csv_path: str, csv_name: str,
+                     columns: Callable[[List[str]], Tuple[int, int]]) -> Dict[str, str]:
+        """
+        Return the parsed CSV data, parsing only what changed since the last load.
+        
+        Args:
+            csv_path: The path to the CSV file
+            csv_name: The name of the CSV file, used for logging
+            columns: Maps the header row to the (key, value) column indexes
+            
+        Returns:
+            A copy of the parsed data
+        """
+        with self._cache_lock:
+            sheet = self._cache.get(csv_path)
+            if sheet is None:
+                sheet = self._cache[csv_path] = IndexedSheet(csv_path, columns)
+        
+        with sheet.lock:
+            operation = sheet.refresh()
+            data = dict(sheet.data)
+        
+        operation = "read (cached)" if operation == "cached" else f"read ({operation})"
+        logger.log_data_access("CSVManager", csv_path, operation, 
+                              f"Query: {csv_name} search | Results: {len(data)} entries | "
+                              f"Rows: {sheet.rows} | Offset: {sheet.offset}")
+        return data
+    
     def load_brand_info(self) -> Dict[str, str]:
-        df = pd.read_csv(self.rag1_path)
-        brand_info = df.set_index('Area')['Key Info'].to_dict()
-        logger.log_data_access("CSVManager", self.rag1_path, "read", 
-                              f"Query: brand_info search | Results: {len(brand_info)} entries")
-        return brand_info
+        return self._load_cached(self.rag1_path, "brand_info", self._brand_info_columns)
 
     def load_best_practices(self) -> Dict[str, str]:
-        df = pd.read_csv(self.rag2_path)
-        best_practices = df.set_index('Content Type')['Engagement Guidelines'].to_dict()
-        logger.log_data_access("CSVManager", self.rag2_path, "read", 
-                              f"Query: best_practices search | Results: {len(best_practices)} entries")
-        return best_practices
+        return self._load_cached(self.rag2_path, "best_practices", self._best_practices_columns)
 
     def load_compliance_info(self) -> Dict[str, str]:
-        df = pd.read_csv(self.rag3_path)
-        compliance_info = df.set_index(df.columns[0])[df.columns[1]].to_dict()
-        logger.log_data_access("CSVManager", self.rag3_path, "read", 
-                              f"Query: compliance_info search | Results: {len(compliance_info)} entries")
-        return compliance_info
+        return self._load_cached(self.rag3_path, "compliance_info", self._key_value_columns)
+    
+    @staticmethod
+    def _brand_info_columns(header: List[str]) -> Tuple[int, int]:
+        if 'Area' not in header or 'Key Info' not in header:
+            raise KeyError(f"brand_info CSV needs 'Area' and 'Key Info' columns, found {header}")
+        return header.index('Area'), header.index('Key Info')
+    
+    @classmethod
+    def _best_practices_columns(cls, header: List[str]) -> Tuple[int, int]:
+        if 'Content Type' in header and 'Engagement Guidelines' in header:
+            return header.index('Content Type'), header.index('Engagement Guidelines')
+        # Key/value sheets without the template headers
+        return cls._key_value_columns(header)
+    
+    @staticmethod
+    def _key_value_columns(header: List[str]) -> Tuple[int, int]:
+        return 0, 1
     
     def load_all_rag_data(self) -> Dict[str, Dict[str, str]]:
         """
@@ -132,33 +306,30 @@ class CSVManager:
         required_columns = ['brand_name', 'tone_of_voice']
         for col in required_columns:
             if col not in data.columns:
-                self.logger.log_warning(f"Missing recommended column: {col} in brand_info.csv")
+                logger.log_warning(f"Missing recommended column: {col} in brand_info.csv")
         return data.fillna('').to_dict()
     
     def validate_best_practices(self, data):
         if 'guideline' not in data.columns:
-            self.logger.log_error("Critical column 'guideline' missing in best_practices.csv")
+            logger.log_error("Critical column 'guideline' missing in best_practices.csv")
             return {}
         return data.fillna('').to_dict()
     
     def validate_compliance_info(self, data):
-        from fuzzywuzzy import fuzz
-        mandatory_rules = ['disclaimer', 'data_protection']
+        # Synonym patterns per mandatory rule, matched against all column names at once
+        mandatory_rules = {
+            'disclaimer': r'disclaim|disclos',
+            'data_protection': r'data.?protect|gdpr|privacy|protezione',
+        }
+        columns = data.columns.astype(str).str.lower()
         found_rules = {}
         
-        for rule in mandatory_rules:
-            best_match = None
-            best_score = 0
-            for col in data.columns:
-                score = fuzz.partial_ratio(rule, col.lower())
-                if score > 75:
-                    best_match = col
-                    best_score = score
-                    break
-            if best_match:
-                found_rules[rule] = data[best_match].iloc[0]
+        for rule, pattern in mandatory_rules.items():
+            matches = data.columns[columns.str.contains(pattern, regex=True)]
+            if len(matches):
+                found_rules[rule] = data[matches[0]].iloc[0]
             else:
-                self.logger.log_warning(f"No close match found for mandatory rule: {rule}")
+                logger.log_warning(f"No close match found for mandatory rule: {rule}")
                 found_rules[rule] = 'Default placeholder - consult legal team'
         
-        return found_rules
\ No newline at end of file
+        return found_rules
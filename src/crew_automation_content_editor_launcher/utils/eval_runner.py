@@ -0,0 +1,353 @@
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+from pydantic import BaseModel
+from .logger import logger
+
+# Lock shared by the worker processes of a parallel training run, so that only one
+# iteration at a time asks for human feedback on the terminal
+_feedback_lock = None
+
+
+class IterationResult(BaseModel):
+    """The outcome of one train or test iteration, run in its own directory."""
+    iteration: int
+    output_dir: str
+    log_file: str
+    seconds: float = 0.0
+    scores: List[float] = []
+    task_durations: List[float] = []
+    task_agents: List[List[str]] = []
+    training_data: Dict[str, Any] = {}
+    error: Optional[str] = None
+
+
+def _init_worker(feedback_lock):
+    global _feedback_lock
+    _feedback_lock = feedback_lock
+    # multiprocessing points stdin at /dev/null; training feedback needs the terminal back
+    try:
+        sys.stdin = open(0, closefd=False)
+    except OSError:
+        pass
+
+
+def _crew_reference(crew_class) -> str:
+    """
+    Return the 'module:name' under which crew_class is imported in the worker processes.
+    @CrewBase replaces a class by a generated subclass that cannot be pickled or looked up
+    by its own name, so the name is taken from the decorated class its module binds to it.
+    """
+    for cls in crew_class.__mro__:
+        module = sys.modules.get(cls.__module__)
+        if module is not None and getattr(module, cls.__qualname__, None) is crew_class:
+            return f"{cls.__module__}:{cls.__qualname__}"
+    raise ValueError(f"{crew_class!r} cannot be imported by name from its module")
+
+
+def _load_crew_class(reference: str):
+    module_name, name = reference.split(':')
+    return getattr(importlib.import_module(module_name), name)
+
+
+def _run_iteration(crew_reference: str, iteration_fn: Callable, inputs: Dict[str, Any], iteration: int,
+                   iteration_dir: str) -> IterationResult:
+    """Import the crew class, build a fresh crew and run one iteration with its own output directory and log file."""
+    output_dir = os.path.join(iteration_dir, 'output')
+    log_file = os.path.join(iteration_dir, 'logs', 'content_editor.log')
+    os.makedirs(output_dir, exist_ok=True)
+    previous_log_file = logger.set_log_file(log_file)
+    logger.log_workflow_step(f"Evaluation iteration {iteration}", "started", f"PID {os.getpid()}")
+    started = time.perf_counter()
+    details, error = {}, None
+    try:
+        details = iteration_fn(_load_crew_class(crew_reference)().crew(), dict(inputs, output_dir=output_dir), iteration, iteration_dir) or {}
+        logger.log_workflow_step(f"Evaluation iteration {iteration}", "completed")
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        logger.log_error(f"Evaluation iteration {iteration} failed: {error}")
+    finally:
+        logger.set_log_file(previous_log_file)
+    return IterationResult(iteration=iteration, output_dir=output_dir, log_file=log_file,
+                           seconds=round(time.perf_counter() - started, 3), error=error, **details)
+
+
+def evaluate_iteration(crew, inputs: Dict[str, Any], iteration: int, iteration_dir: str, eval_llm: str = 'gpt-4') -> dict:
+    """Run one `crew.test` iteration: kick off the crew and score every task with eval_llm."""
+    from crewai.utilities.evaluators.crew_evaluator_handler import CrewEvaluator
+    from crewai.utilities.llm_utils import create_llm
+
+    evaluator = CrewEvaluator(crew, create_llm(eval_llm))
+    evaluator.set_iteration(iteration)
+    crew.kickoff(inputs=inputs)
+    return {
+        'scores': evaluator.tasks_scores[iteration],
+        'task_durations': evaluator.run_execution_times[iteration],
+        'task_agents': [sorted(task.processed_by_agents) for task in crew.tasks],
+    }
+
+
+@contextmanager
+def _training_files(iteration_dir: str):
+    """Point crewai's training data file into the iteration directory while the iteration runs."""
+    import crewai.crew
+    import crewai.agents.crew_agent_executor as executor
+
+    previous = executor.TRAINING_DATA_FILE
+    crewai.crew.TRAINING_DATA_FILE = executor.TRAINING_DATA_FILE = os.path.join(iteration_dir, 'training_data.pkl')
+    try:
+        yield executor.TRAINING_DATA_FILE
+    finally:
+        crewai.crew.TRAINING_DATA_FILE = executor.TRAINING_DATA_FILE = previous
+
+
+@contextmanager
+def _serialized_feedback(iteration: int):
+    """In a parallel run, ask for one iteration's feedback at a time and say which one it is."""
+    if _feedback_lock is None:
+        yield
+        return
+    from crewai.agents.crew_agent_executor import CrewAgentExecutor
+
+    ask_human_input = CrewAgentExecutor._ask_human_input
+
+    def ask(executor, final_answer: str) -> str:
+        with _feedback_lock:
+            print(f"\n===== Training iteration {iteration} | {executor.agent.role} =====")
+            return ask_human_input(executor, final_answer)
+
+    CrewAgentExecutor._ask_human_input = ask
+    try:
+        yield
+    finally:
+        CrewAgentExecutor._ask_human_input = ask_human_input
+
+
+def train_iteration(crew, inputs: Dict[str, Any], iteration: int, iteration_dir: str,
+                    feedback: Dict[str, Dict[int, Any]] = None) -> dict:
+    """
+    Run one `crew.train` iteration and return the feedback it collected, keyed by agent role.
+
+    Args:
+        feedback: Feedback of earlier iterations by agent role; as in the sequential loop,
+            agents are told to follow it
+    """
+    from crewai.utilities.training_handler import CrewTrainingHandler
+
+    roles = {str(agent.id): agent.role for agent in crew.agents}
+    with _training_files(iteration_dir) as training_file, _serialized_feedback(iteration):
+        crew._setup_for_training(os.path.join(iteration_dir, 'trained_agents.pkl'))
+        CrewTrainingHandler(training_file).save({agent_id: dict(feedback[role]) for agent_id, role in roles.items()
+                                                 if role in (feedback or {})})
+        crew._train_iteration = iteration
+        crew.kickoff(inputs=inputs)
+        training_data = CrewTrainingHandler(training_file).load()
+
+    return {'training_data': {roles[agent_id]: data[iteration] for agent_id, data in training_data.items()
+                              if agent_id in roles and iteration in data}}
+
+
+def _earlier_feedback(completed: List[IterationResult]) -> dict:
+    feedback = {}
+    for result in sorted(completed, key=lambda result: result.iteration):
+        if result.error is None:
+            for role, data in result.training_data.items():
+                feedback.setdefault(role, {})[result.iteration] = data
+    return {'feedback': feedback}
+
+
+class EvaluationRunner:
+    """
+    Runs the independent iterations of `crew.train` / `crew.test` in a pool of worker
+    processes. Every iteration builds its own crew and writes to its own output and log
+    directory under output/eval/<mode>-<timestamp>/iteration-<n>; scores, training feedback
+    and timings are then aggregated in iteration order, exactly as the sequential loop
+    would, and written to report.json. A training iteration starts with the feedback of
+    the iterations finished before it, so with concurrency 1 (iterations run one after
+    another in this process) training is the same as the sequential loop.
+    """
+
+    def __init__(self, crew_class, inputs: Dict[str, Any], n_iterations: int, concurrency: int = None,
+                 output_dir: str = None):
+        """
+        Initialize the runner.
+
+        Args:
+            crew_class: The CrewBase class, defined at module level; each iteration runs `crew_class().crew()`
+            inputs: The kickoff inputs shared by all iterations
+            n_iterations: The number of iterations
+            concurrency: Iterations run at the same time (default: CONTENT_CREW_EVAL_CONCURRENCY or 1)
+            output_dir: Root directory of the run (default: output/eval/<mode>-<timestamp>)
+        """
+        self.crew_class = crew_class
+        # Workers import the crew class by name; the class itself cannot be pickled
+        self.crew_reference = _crew_reference(crew_class)
+        self.inputs = inputs or {}
+        self.n_iterations = n_iterations
+        self.concurrency = max(1, min(int(concurrency or os.getenv('CONTENT_CREW_EVAL_CONCURRENCY', 1)), n_iterations))
+        self.output_dir = output_dir
+
+    def _run_dir(self, mode: str) -> str:
+        if self.output_dir is None:
+            self.output_dir = os.path.join(os.getenv('CONTENT_CREW_OUTPUT_DIR', os.path.join(os.getcwd(), 'output')),
+                                           'eval', f"{mode}-{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        os.makedirs(self.output_dir, exist_ok=True)
+        return self.output_dir
+
+    def run(self, iteration_fn: Callable, iterations: List[int], mode: str = 'run',
+            prepare: Callable[[List[IterationResult]], Dict[str, Any]] = None) -> List[IterationResult]:
+        """
+        Run iteration_fn(crew, inputs, iteration, iteration_dir, **prepared) for every iteration.
+
+        Args:
+            iteration_fn: A picklable function returning the IterationResult details of one iteration
+            iterations: The iteration numbers
+            mode: Names the run directory
+            prepare: Called with the results completed so far when an iteration is started;
+                returns extra keyword arguments for iteration_fn
+
+        Returns:
+            The iteration results, in iteration order
+        """
+        run_dir = self._run_dir(mode)
+        completed: List[IterationResult] = []
+
+        def job(iteration: int) -> tuple:
+            fn = partial(iteration_fn, **prepare(completed)) if prepare else iteration_fn
+            return self.crew_reference, fn, self.inputs, iteration, os.path.join(run_dir, f"iteration-{iteration}")
+
+        logger.log_workflow_step(f"Evaluation {mode}", "started",
+                                 f"{len(iterations)} iterations, concurrency {self.concurrency}, directory {run_dir}")
+        if self.concurrency == 1:
+            for iteration in iterations:
+                completed.append(_run_iteration(*job(iteration)))
+            return completed
+
+        pending = list(iterations)
+        with ProcessPoolExecutor(max_workers=self.concurrency, initializer=_init_worker,
+                                 initargs=(multiprocessing.Lock(),)) as pool:
+            running = set()
+            while pending or running:
+                while pending and len(running) < self.concurrency:
+                    running.add(pool.submit(_run_iteration, *job(pending.pop(0))))
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                completed.extend(future.result() for future in done)
+        return sorted(completed, key=lambda result: result.iteration)
+
+    def test(self, eval_llm: str = 'gpt-4') -> dict:
+        """
+        Run the test iterations in parallel and print crewai's score table.
+
+        Args:
+            eval_llm: The model that scores every task output
+
+        Returns:
+            The aggregated report
+        """
+        started = time.perf_counter()
+        results = self.run(partial(evaluate_iteration, eval_llm=eval_llm), list(range(1, self.n_iterations + 1)), 'test')
+        report = self._write_report('test', results, time.perf_counter() - started, eval_llm=eval_llm)
+        if not report['failed']:
+            self._print_scores(results, eval_llm)
+        self._raise_on_failure(report)
+        return report
+
+    def train(self, filename: str) -> dict:
+        """
+        Run the training iterations in parallel, then evaluate the collected feedback of every
+        agent and save the trained data to filename, as `crew.train` does.
+
+        Args:
+            filename: The trained agents file
+
+        Returns:
+            The aggregated report
+        """
+        from crewai.utilities.constants import TRAINING_DATA_FILE
+        from crewai.utilities.evaluators.task_evaluator import TaskEvaluator
+        from crewai.utilities.training_handler import CrewTrainingHandler
+
+        started = time.perf_counter()
+        results = self.run(train_iteration, list(range(self.n_iterations)), 'train', prepare=_earlier_feedback)
+        report = self._write_report('train', results, time.perf_counter() - started, filename=filename)
+        self._raise_on_failure(report)
+
+        train_crew = self.crew_class().crew()
+        agent_ids = {agent.role: str(agent.id) for agent in train_crew.agents}
+        training_data = {}
+        for result in results:
+            for role, data in result.training_data.items():
+                if role in agent_ids:
+                    training_data.setdefault(agent_ids[role], {})[result.iteration] = data
+        CrewTrainingHandler(TRAINING_DATA_FILE).save(training_data)
+
+        trained_agents = CrewTrainingHandler(filename)
+        trained_agents.initialize_file()
+        for agent in train_crew.agents:
+            if training_data.get(str(agent.id)):
+                result = TaskEvaluator(agent).evaluate_training_data(training_data=training_data, agent_id=str(agent.id))
+                trained_agents.save_trained_data(agent_id=str(agent.role), trained_data=result.model_dump())
+                report['trained_agents'].append(agent.role)
+        self._save_report(report)
+        return report
+
+    def _write_report(self, mode: str, results: List[IterationResult], wall_seconds: float, **details) -> dict:
+        completed = [result for result in results if result.error is None]
+        report = {
+            'mode': mode,
+            'n_iterations': self.n_iterations,
+            'concurrency': self.concurrency,
+            'wall_seconds': round(wall_seconds, 3),
+            'iteration_seconds': round(sum(result.seconds for result in results), 3),
+            'failed': [result.iteration for result in results if result.error is not None],
+            **details,
+            'iterations': [result.model_dump(exclude={'training_data'}) for result in results],
+        }
+        if mode == 'test' and completed:
+            task_scores = list(zip(*(result.scores for result in completed)))
+            crew_scores = [sum(result.scores) / len(result.scores) for result in completed if result.scores]
+            run_seconds = [sum(result.task_durations) for result in completed]
+            report['tasks'] = [{'task': index + 1, 'scores': list(scores), 'average': sum(scores) / len(scores)}
+                               for index, scores in enumerate(task_scores)]
+            report['crew'] = {'scores': crew_scores,
+                              'average': sum(crew_scores) / len(crew_scores) if crew_scores else None}
+            report['execution_seconds'] = {'runs': run_seconds, 'average': sum(run_seconds) / len(run_seconds)}
+        if mode == 'train':
+            report['trained_agents'] = []
+            report['feedback'] = {result.iteration: sorted(result.training_data) for result in completed}
+        self._save_report(report)
+        return report
+
+    def _save_report(self, report: dict):
+        report_path = os.path.join(self.output_dir, 'report.json')
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+        logger.log_data_access("EvaluationRunner", report_path, "write",
+                               f"{report['mode']}: {report['n_iterations']} iterations in {report['wall_seconds']}s "
+                               f"(sequential time {report['iteration_seconds']}s)")
+
+    def _raise_on_failure(self, report: dict):
+        if report['failed']:
+            raise RuntimeError(f"{len(report['failed'])} of {report['n_iterations']} {report['mode']} iterations failed "
+                               f"({', '.join(map(str, report['failed']))}); see {self.output_dir}/report.json")
+
+    def _print_scores(self, results: List[IterationResult], eval_llm: str):
+        from crewai.utilities.evaluators.crew_evaluator_handler import CrewEvaluator
+        from crewai.utilities.llm_utils import create_llm
+
+        crew = self.crew_class().crew()
+        evaluator = CrewEvaluator(crew, create_llm(eval_llm))
+        for result in results:
+            evaluator.tasks_scores[result.iteration] = list(result.scores)
+            evaluator.run_execution_times[result.iteration] = list(result.task_durations)
+            for task, agents in zip(crew.tasks, result.task_agents):
+                task.processed_by_agents.update(agents)
+        evaluator.print_crew_evaluation_result()
@@ -0,0 +1,164 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from crewai import Agent, Task
+from .logger import logger
+from .compliance_checker import ComplianceChecker, ComplianceReport, split_list
+
+# Formats the fan-out stage knows how to derive from a long-form draft
+SUPPORTED_VARIANTS = ("Social Media Post", "Blog Article", "Video Script", "Newsletter", "Infographic")
+
+# The key/value best_practices sheet (RAG/Rag 2) describes the content types listed under
+# tipocontenuto; its other keys are the practices for them
+_SHEET_CONTENT_TYPE_KEY = "tipocontenuto"
+_SHEET_PRACTICE_KEYS = {
+    "struttura": "Structure",
+    "lunghezzaideale": "Ideal length",
+    "elementinecessari": "Required elements",
+    "tonoconsigliato": "Recommended tone",
+}
+
+
+class FormatFanout:
+    """
+    Derives several content formats from one approved long-form draft in parallel.
+    Each variant is a single small generation call that reuses the shared upstream
+    context (brief, research, approved draft) instead of a full crew run. A variant with
+    compliance violations is generated again with the findings, and dropped when the
+    violations remain.
+    """
+
+    def __init__(self, agent: Agent, best_practices: Dict[str, str] = None,
+                 compliance_checker: ComplianceChecker = None, max_workers: int = None,
+                 compliance_retries: int = 1):
+        """
+        Initialize the fan-out stage.
+
+        Args:
+            agent: The agent that writes the variants (a copy is made per variant)
+            best_practices: The best_practices RAG data, either content type -> guidelines
+                or the key/value sheet (tipocontenuto, struttura, ...)
+            compliance_checker: Optional checker used to scan every generated variant
+            max_workers: Maximum parallel generations (default: one per variant)
+            compliance_retries: Regenerations of a variant with compliance violations
+        """
+        self.agent = agent
+        self.best_practices = {str(key).strip().lower(): value for key, value in (best_practices or {}).items()}
+        self.compliance_checker = compliance_checker
+        self.max_workers = max_workers
+        self.compliance_retries = compliance_retries
+        # Variants dropped by the last generate call -> their remaining violations
+        self.rejected: Dict[str, List[str]] = {}
+
+    def get_guidelines(self, variant: str) -> Optional[str]:
+        """Return the best-practice guidelines for a content type, if the RAG has them."""
+        variant_key = variant.strip().lower()
+        guidelines = self.best_practices.get(variant_key)
+        if isinstance(guidelines, str) and guidelines.strip():
+            return guidelines.strip()
+
+        content_types = self.best_practices.get(_SHEET_CONTENT_TYPE_KEY)
+        if not isinstance(content_types, str) or variant_key not in [item.lower() for item in split_list(content_types)]:
+            return None
+        practices = [f"{label}: {self.best_practices[key].strip()}" for key, label in _SHEET_PRACTICE_KEYS.items()
+                     if isinstance(self.best_practices.get(key), str) and self.best_practices[key].strip()]
+        return "; ".join(practices) or None
+
+    def build_task(self, variant: str, inputs: Dict[str, str], findings: ComplianceReport = None) -> Task:
+        """Build the generation task for one variant, with the findings on a rejected attempt, if any."""
+        guidelines = self.get_guidelines(variant)
+        description = (
+            f"Adapt the approved long-form content provided as context into a {variant} for "
+            f"{inputs.get('brand_name', 'the brand')}. Keep the {inputs.get('tone_of_voice', 'brand')} tone, "
+            f"the facts and the compliance of the original; do not add new claims."
+        )
+        if guidelines:
+            description += f" Follow these {variant} best practices: {guidelines}."
+        if inputs.get('avoid_terms'):
+            description += f" Never use: {inputs['avoid_terms']}."
+        if inputs.get('disclaimers'):
+            description += f" Include this disclaimer verbatim: {inputs['disclaimers']}"
+        if findings is not None:
+            description += f"\n\nA previous version was rejected. {findings.to_prompt()}"
+
+        return Task(
+            name=f"variant_{variant.lower().replace(' ', '_')}",
+            description=description,
+            expected_output=f"A ready-to-publish {variant} derived from the approved content.",
+            agent=self.agent,
+        )
+
+    def generate(self, draft: str, variants: List[str], inputs: Dict[str, str]) -> Dict[str, str]:
+        """
+        Generate all requested variants from the approved draft in parallel.
+
+        Args:
+            draft: The approved long-form draft
+            variants: The content types to derive
+            inputs: The crew inputs (brand_name, tone_of_voice, avoid_terms, disclaimers)
+
+        Returns:
+            A dictionary mapping each compliant variant to its generated content; rejected
+            variants are listed in self.rejected
+        """
+        if not variants:
+            return {}
+
+        logger.log_workflow_step("format_fanout", "started", f"Variants: {', '.join(variants)}")
+        for variant in variants:
+            if self.get_guidelines(variant) is None:
+                logger.log_info(f"No best practices for {variant} in the best_practices RAG; "
+                                f"it is derived from the draft alone")
+
+        def run(variant: str) -> Tuple[str, Optional[ComplianceReport]]:
+            # Agents keep per-execution state, so every parallel generation gets its own copy
+            agent = self.agent.copy()
+            findings = None
+            for _ in range(self.compliance_retries + 1):
+                task = self.build_task(variant, inputs, findings)
+                logger.log_task_execution(task.name, agent.role, "started")
+                content = task.execute_sync(agent=agent, context=draft, tools=[]).raw
+                logger.log_task_execution(task.name, agent.role, "completed")
+                report = self.compliance_checker.scan(content) if self.compliance_checker else None
+                if report is None or not report.violations:
+                    return content, report
+                logger.log_warning(f"{variant} variant has {len(report.violations)} compliance violations: "
+                                   f"{', '.join(violation.match for violation in report.violations)}")
+                # Only the violations: the formatter adds missing disclaimers to every variant
+                findings = ComplianceReport(violations=report.violations)
+            return content, report
+
+        results = {}
+        self.rejected = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers or len(variants)) as executor:
+            futures = {variant: executor.submit(run, variant) for variant in variants}
+            for variant, future in futures.items():
+                try:
+                    content, report = future.result()
+                except Exception as e:
+                    logger.log_error(f"Failed to generate {variant} variant: {str(e)}")
+                    continue
+
+                if report is not None and report.violations:
+                    self.rejected[variant] = [violation.match for violation in report.violations]
+                    logger.log_workflow_step(f"format_fanout:{variant}", "rejected",
+                                             f"Compliance violations remain after {self.compliance_retries + 1} "
+                                             f"attempts: {', '.join(self.rejected[variant])}")
+                    continue
+                results[variant] = content
+
+        logger.log_workflow_step("format_fanout", "completed", f"Generated {len(results)} of {len(variants)} variants"
+                                 + (f" | Rejected: {', '.join(self.rejected)}" if self.rejected else ""))
+        return results
+
+
+def parse_variants(value: Optional[str]) -> List[str]:
+    """Parse the output_variants input into known content types, preserving order."""
+    variants = []
+    known = {variant.lower(): variant for variant in SUPPORTED_VARIANTS}
+    for item in split_list(value):
+        variant = known.get(item.lower())
+        if variant is None:
+            logger.log_warning(f"Unknown content variant '{item}'. Valid options are: {', '.join(SUPPORTED_VARIANTS)}")
+        elif variant not in variants:
+            variants.append(variant)
+    return variants
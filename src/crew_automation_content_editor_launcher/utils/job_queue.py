@@ -0,0 +1,343 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import closing
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+from pydantic import BaseModel
+from .logger import logger
+
+if TYPE_CHECKING:
+    from .scheduler import JobScheduler
+
+JOB_STATUSES = ("queued", "leased", "done", "dead")
+
+
+class Job(BaseModel):
+    """A queued unit of work and its delivery state."""
+    id: str
+    queue: str
+    payload: Dict[str, Any]
+    status: str = "queued"
+    attempts: int = 0
+    max_attempts: int = 3
+    lease_token: Optional[str] = None
+    lease_owner: Optional[str] = None
+    lease_expires: Optional[float] = None
+    available_at: float = 0.0
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+
+class JobQueue(ABC):
+    """
+    Interface of a durable job queue with lease/ack semantics. A leased job is invisible
+    to other workers until its visibility timeout expires; only the holder of the current
+    lease can ack or nack it, so every job records at most one result.
+    """
+
+    @abstractmethod
+    def enqueue(self, payload: Dict[str, Any], max_attempts: int = 3) -> str:
+        """Add a job and return its id."""
+
+    @abstractmethod
+    def lease(self, worker_id: str, visibility_timeout: float = 300.0) -> Optional[Job]:
+        """Lease the next available job, or return None when the queue is empty."""
+
+    @abstractmethod
+    def extend(self, job: Job, visibility_timeout: float = 300.0) -> bool:
+        """Extend the lease of a running job; returns False when the lease was lost."""
+
+    @abstractmethod
+    def ack(self, job: Job, result: Any = None) -> bool:
+        """Record the result of a leased job; returns False when the lease was lost."""
+
+    @abstractmethod
+    def nack(self, job: Job, error: str, retry_delay: float = None) -> str:
+        """Report a failed attempt; returns the new job status (queued or dead)."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by id."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Return the number of jobs per status."""
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    SQLite-backed job queue. Every state change is a single transaction, so any number of
+    worker processes can drain the same database file. Workers on several hosts can share
+    the file on a volume; network filesystems need journal_mode='DELETE', since WAL relies
+    on shared memory.
+    """
+
+    # Base delay before a failed job is retried, doubled on every attempt
+    retry_base_delay = 5.0
+    # Ready jobs (oldest first) among which the scheduler chooses
+    schedule_window = 500
+
+    def __init__(self, db_path: str = None, queue: str = "content", journal_mode: str = None,
+                 scheduler: "JobScheduler" = None):
+        """
+        Initialize the queue.
+
+        Args:
+            db_path: The SQLite file (default: $CONTENT_CREW_QUEUE_DB or $CONTENT_CREW_CACHE_DIR/jobs.sqlite)
+            queue: The name of the queue inside the database
+            journal_mode: SQLite journal mode (default: $CONTENT_CREW_QUEUE_JOURNAL_MODE or WAL)
+            scheduler: Chooses the next job to lease (default: oldest available job first)
+        """
+        self.db_path = db_path or os.getenv("CONTENT_CREW_QUEUE_DB") or os.path.join(
+            os.getenv("CONTENT_CREW_CACHE_DIR", os.path.join(os.getcwd(), ".cache")), "jobs.sqlite")
+        self.queue = queue
+        self.journal_mode = journal_mode or os.getenv("CONTENT_CREW_QUEUE_JOURNAL_MODE", "WAL")
+        self.scheduler = scheduler
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    queue TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    lease_token TEXT,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    available_at REAL NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (queue, status, available_at)")
+            if self.scheduler is not None:
+                self.scheduler.ensure_schema(conn)
+
+    def _connect(self) -> closing:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        return closing(conn)
+
+    def enqueue(self, payload: Dict[str, Any], max_attempts: int = 3) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT INTO jobs (id, queue, payload, status, max_attempts, available_at, created_at, updated_at) "
+                         "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                         (job_id, self.queue, json.dumps(payload), max_attempts, now, now, now))
+        logger.log_workflow_step(f"job_queue:{self.queue}", "enqueued", f"Job {job_id}")
+        return job_id
+
+    def lease(self, worker_id: str, visibility_timeout: float = 300.0) -> Optional[Job]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                # Jobs whose lease expired after the last allowed attempt were abandoned by crashed workers
+                for row in conn.execute("SELECT id FROM jobs WHERE queue = ? AND status = 'leased' "
+                                        "AND lease_expires <= ? AND attempts >= max_attempts",
+                                        (self.queue, now)).fetchall():
+                    conn.execute("UPDATE jobs SET status = 'dead', lease_token = NULL, updated_at = ?, "
+                                 "error = COALESCE(error, 'Lease expired on the last attempt') WHERE id = ?",
+                                 (now, row["id"]))
+                    logger.log_warning(f"Job {row['id']} dead-lettered: lease expired on the last attempt")
+
+                rows = conn.execute("SELECT * FROM jobs WHERE queue = ? AND ((status = 'queued' AND available_at <= ?) "
+                                    "OR (status = 'leased' AND lease_expires <= ?)) "
+                                    "ORDER BY available_at, created_at LIMIT ?",
+                                    (self.queue, now, now, self.schedule_window if self.scheduler else 1)).fetchall()
+                row = rows[0] if rows else None
+                if rows and self.scheduler is not None:
+                    running = [self._job(running_row) for running_row in conn.execute(
+                        "SELECT * FROM jobs WHERE queue = ? AND status = 'leased' AND lease_expires > ?", (self.queue, now))]
+                    chosen = self.scheduler.select(conn, self.queue, [self._job(ready) for ready in rows], running, now)
+                    row = next((ready for ready in rows if chosen is not None and ready["id"] == chosen.id), None)
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                if row["status"] == "leased":
+                    logger.log_warning(f"Job {row['id']} lease held by {row['lease_owner']} expired; re-leasing")
+
+                token = uuid.uuid4().hex
+                conn.execute("UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_token = ?, "
+                             "lease_owner = ?, lease_expires = ?, updated_at = ? WHERE id = ?",
+                             (token, worker_id, now + visibility_timeout, now, row["id"]))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return self._load(conn, row["id"])
+
+    def extend(self, job: Job, visibility_timeout: float = 300.0) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                                  "WHERE id = ? AND status = 'leased' AND lease_token = ?",
+                                  (now + visibility_timeout, now, job.id, job.lease_token))
+        if cursor.rowcount:
+            job.lease_expires = now + visibility_timeout
+        return bool(cursor.rowcount)
+
+    def ack(self, job: Job, result: Any = None) -> bool:
+        with self._connect() as conn:
+            # Only the current lease holder may record the result, so it is recorded exactly once
+            cursor = conn.execute("UPDATE jobs SET status = 'done', result = ?, lease_token = NULL, updated_at = ? "
+                                  "WHERE id = ? AND status = 'leased' AND lease_token = ?",
+                                  (json.dumps(result), time.time(), job.id, job.lease_token))
+            if cursor.rowcount and self.scheduler is not None:
+                self.scheduler.record(conn, job, result)
+        if not cursor.rowcount:
+            logger.log_warning(f"Job {job.id}: lease lost before ack; result discarded")
+            return False
+        logger.log_workflow_step(f"job_queue:{self.queue}", "done", f"Job {job.id} after {job.attempts} attempts")
+        return True
+
+    def nack(self, job: Job, error: str, retry_delay: float = None) -> str:
+        if retry_delay is None:
+            retry_delay = self.retry_base_delay * 2 ** max(0, job.attempts - 1)
+        status = "dead" if job.attempts >= job.max_attempts else "queued"
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE jobs SET status = ?, error = ?, lease_token = NULL, available_at = ?, "
+                                  "updated_at = ? WHERE id = ? AND status = 'leased' AND lease_token = ?",
+                                  (status, error, now + retry_delay, now, job.id, job.lease_token))
+        if not cursor.rowcount:
+            logger.log_warning(f"Job {job.id}: lease lost before nack")
+            return self.get(job.id).status
+        if status == "dead":
+            logger.log_error(f"Job {job.id} dead-lettered after {job.attempts} attempts: {error}")
+        else:
+            logger.log_warning(f"Job {job.id} attempt {job.attempts} failed, retrying in {retry_delay:.0f}s: {error}")
+        return status
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            return self._load(conn, job_id)
+
+    def dead_letters(self) -> List[Job]:
+        """Return the jobs that exhausted their attempts."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id FROM jobs WHERE queue = ? AND status = 'dead' ORDER BY updated_at",
+                                (self.queue,)).fetchall()
+            return [self._load(conn, row["id"]) for row in rows]
+
+    def requeue(self, job_id: str, max_attempts: int = None) -> bool:
+        """Move a dead-lettered job back to the queue with a fresh attempt count."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE jobs SET status = 'queued', attempts = 0, max_attempts = COALESCE(?, max_attempts), "
+                                  "available_at = ?, updated_at = ? WHERE id = ? AND status = 'dead'",
+                                  (max_attempts, now, now, job_id))
+        return bool(cursor.rowcount)
+
+    def stats(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs WHERE queue = ? GROUP BY status",
+                                (self.queue,)).fetchall()
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def _load(self, conn: sqlite3.Connection, job_id: str) -> Optional[Job]:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row is not None else None
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Job:
+        data = dict(row)
+        data["payload"] = json.loads(data["payload"])
+        data["result"] = json.loads(data["result"]) if data["result"] is not None else None
+        return Job(**data)
+
+
+class JobWorker:
+    """
+    Drains a JobQueue: leases a job, runs the handler on its payload while keeping the
+    lease alive, then acks the result or nacks the error for a retry.
+    """
+
+    def __init__(self, queue: JobQueue, handler: Callable[[Job], Any], worker_id: str = None,
+                 visibility_timeout: float = 300.0, poll_interval: float = 2.0):
+        """
+        Initialize the worker.
+
+        Args:
+            queue: The queue to drain
+            handler: Called with each leased job; its return value is recorded as the result
+            worker_id: Identifies the worker in leases (default: host:pid)
+            visibility_timeout: Seconds a lease lasts without renewal
+            poll_interval: Seconds to wait when the queue is empty
+        """
+        self.queue = queue
+        self.handler = handler
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self._stopping = threading.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    def run(self, max_jobs: int = None, exit_when_empty: bool = False) -> int:
+        """
+        Process jobs until stopped.
+
+        Args:
+            max_jobs: Stop after this many jobs (default: no limit)
+            exit_when_empty: Stop as soon as no job is available
+
+        Returns:
+            The number of jobs processed
+        """
+        processed = 0
+        logger.log_info(f"Worker {self.worker_id} started on {self.queue.__class__.__name__}")
+        while not self._stopping.is_set() and (max_jobs is None or processed < max_jobs):
+            job = self.queue.lease(self.worker_id, self.visibility_timeout)
+            if job is None:
+                if exit_when_empty:
+                    break
+                self._stopping.wait(self.poll_interval)
+                continue
+            self.process(job)
+            processed += 1
+        logger.log_info(f"Worker {self.worker_id} stopped after {processed} jobs")
+        return processed
+
+    def process(self, job: Job) -> bool:
+        """Run one leased job; returns True when its result was recorded."""
+        logger.log_task_execution(f"job:{job.id}", self.worker_id, "started", f"Attempt {job.attempts}/{job.max_attempts}")
+        heartbeat_stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, heartbeat_stop), daemon=True)
+        heartbeat.start()
+        try:
+            result = self.handler(job)
+        except Exception as e:
+            heartbeat_stop.set()
+            heartbeat.join()
+            self.queue.nack(job, f"{e.__class__.__name__}: {str(e)}")
+            logger.log_task_execution(f"job:{job.id}", self.worker_id, "failed", str(e))
+            return False
+        heartbeat_stop.set()
+        heartbeat.join()
+        recorded = self.queue.ack(job, result)
+        logger.log_task_execution(f"job:{job.id}", self.worker_id, "completed" if recorded else "discarded")
+        return recorded
+
+    def _heartbeat(self, job: Job, stop: threading.Event):
+        # Renew the lease well before it expires so long crew runs keep their job
+        while not stop.wait(self.visibility_timeout / 3):
+            if not self.queue.extend(job, self.visibility_timeout):
+                logger.log_warning(f"Job {job.id}: lease lost while running")
+                return
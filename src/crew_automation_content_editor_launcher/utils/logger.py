@@ -40,12 +40,37 @@ class ContentEditorLogger:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             log_file = os.path.join(log_dir, f"content_editor_{timestamp}.log")
         
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        self.formatter = formatter
+        self.log_file = log_file
+        self.file_handler = logging.FileHandler(log_file)
+        self.file_handler.setFormatter(formatter)
+        self.logger.addHandler(self.file_handler)
         
         self.log_info(f"Logger initialized. Log file: {log_file}")
     
+    def set_log_file(self, log_file):
+        """
+        Send file output to another log file (console output is unchanged).
+        
+        Args:
+            log_file: The path to the new log file
+            
+        Returns:
+            The previous log file, so that callers can switch back
+        """
+        previous = self.log_file
+        if log_file == previous:
+            return previous
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setFormatter(self.formatter)
+        self.logger.removeHandler(self.file_handler)
+        self.file_handler.close()
+        self.logger.addHandler(file_handler)
+        self.file_handler = file_handler
+        self.log_file = log_file
+        return previous
+    
     def log_debug(self, message):
         """Log a debug message."""
         self.logger.debug(message)
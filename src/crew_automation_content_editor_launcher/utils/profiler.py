@@ -0,0 +1,329 @@
+import cProfile
+import os
+import pstats
+import re
+import sysconfig
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from .logger import logger
+
+# Functions defined under this directory count as our own code in the summary
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_STDLIB_DIR = sysconfig.get_paths()["stdlib"]
+_SITE_PACKAGE_RE = re.compile(r"[/\\](?:site|dist)-packages[/\\]([^/\\]+)")
+_TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class SegmentStats(BaseModel):
+    """Wall time and memory accounting for one profiled task, tool or the whole run."""
+    kind: str
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    peak_bytes: int = 0
+    net_bytes: int = 0
+
+
+def code_origin(filename: str) -> str:
+    """
+    Classify the file of a profiled function.
+
+    Returns:
+        'local' for this package, the distribution name for installed packages,
+        'builtins' for C functions and 'stdlib' or 'other' for everything else
+    """
+    if filename.startswith(PACKAGE_DIR):
+        return "local"
+    if filename.startswith(("~", "<")):
+        return "builtins"
+    match = _SITE_PACKAGE_RE.search(filename)
+    if match:
+        return match.group(1).split(".")[0]
+    if filename.startswith(_STDLIB_DIR):
+        return "stdlib"
+    return "other"
+
+
+def _file_stem(kind: str, name: str) -> str:
+    stem = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "unnamed"
+    return stem if kind in ("task", "run") else f"{kind}-{stem}"
+
+
+def _display_path(filename: str) -> str:
+    return os.path.relpath(filename, PACKAGE_DIR) if filename.startswith(PACKAGE_DIR) else filename
+
+
+def _function_label(key: Tuple[str, int, str]) -> str:
+    filename, lineno, function = key
+    return f"{_display_path(filename)}:{lineno}({function})"
+
+
+class RunProfiler:
+    """
+    Opt-in CPU and memory profiler for crew runs (the `--profile` flag of main.py).
+
+    Every task and every tool call is a separate segment: cProfile data is collected per
+    segment (a tool call pauses the profile of the task that made it), and tracemalloc
+    measures the memory each segment allocates. When the session ends it writes one .prof
+    file per task and tool, top-N allocation reports per task and a summary ranking the
+    hottest functions of this package apart from framework and library code.
+    """
+
+    def __init__(self, top_n: int = 25):
+        """
+        Initialize the profiler.
+
+        Args:
+            top_n: Number of entries in the allocation reports and summary rankings
+        """
+        self.top_n = top_n
+        self.active = False
+        self.cpu = False
+        self.memory = False
+        self.output_dir: Optional[str] = None
+        self.segments: Dict[str, SegmentStats] = {}
+        self._profiles: Dict[str, Dict[int, cProfile.Profile]] = {}
+        self._reports: Dict[str, int] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._installed = False
+        self._started_tracemalloc = False
+
+    def install(self):
+        """Segment the profile by task through the CrewAI event bus (once per process)."""
+        if self._installed:
+            return
+        from crewai.events.event_bus import crewai_event_bus
+        from crewai.events.types.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+
+        crewai_event_bus.register_handler(TaskStartedEvent, self._on_task_started)
+        crewai_event_bus.register_handler(TaskCompletedEvent, self._on_task_finished)
+        crewai_event_bus.register_handler(TaskFailedEvent, self._on_task_finished)
+        self._installed = True
+
+    def _on_task_started(self, source, event):
+        task = event.task
+        name = getattr(task, "name", None) or (getattr(task, "description", None) or "task")[:40]
+        self._push("task", name)
+
+    def _on_task_finished(self, source, event):
+        stack = self._stack()
+        if stack and stack[-1]["kind"] == "task":
+            self._pop(stack[-1])
+
+    @contextmanager
+    def session(self, output_dir: str = None, cpu: bool = True, memory: bool = True):
+        """
+        Profile everything run inside the block.
+
+        Args:
+            output_dir: Where to write the reports (default: output/profile/<timestamp>-<pid>)
+            cpu: Collect cProfile data
+            memory: Trace allocations with tracemalloc
+
+        Yields:
+            The profiler, whose output_dir holds the reports once the block exits
+        """
+        self.start(output_dir, cpu=cpu, memory=memory)
+        frame = self._push("run", "run")
+        try:
+            yield self
+        finally:
+            self._pop(frame)
+            self.stop()
+
+    def start(self, output_dir: str = None, cpu: bool = True, memory: bool = True):
+        """Begin a profiling session (see session for the arguments)."""
+        if output_dir is None:
+            output_dir = os.path.join(os.getenv('CONTENT_CREW_OUTPUT_DIR', os.path.join(os.getcwd(), 'output')),
+                                      'profile', f"{datetime.now().strftime('%Y%m%d_%H%M%S')}-{os.getpid()}")
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.cpu = cpu
+        self.memory = memory
+        self.segments = {}
+        self._profiles = {}
+        self._reports = {}
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self._started_tracemalloc = True
+        self.install()
+        self.active = True
+        logger.log_info(f"Profiling enabled (cpu={cpu}, memory={memory}); reports in {output_dir}")
+
+    def stop(self) -> Optional[str]:
+        """
+        End the session and write the reports.
+
+        Returns:
+            The path of the summary, or None if no session was active
+        """
+        if not self.active:
+            return None
+        self.active = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        stats = self._write_profiles()
+        summary_path = os.path.join(self.output_dir, "summary.txt")
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write(self._summary(stats))
+        logger.log_info(f"Profile summary written to {summary_path}")
+        return summary_path
+
+    @contextmanager
+    def tool_call(self, tool_name: str):
+        """Profile one tool call as its own segment (no-op outside a session)."""
+        frame = self._push("tool", tool_name)
+        try:
+            yield
+        finally:
+            self._pop(frame)
+
+    def _stack(self) -> List[Dict[str, Any]]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _profile_for(self, stem: str) -> cProfile.Profile:
+        # One profile per segment and thread; they are merged when the session ends
+        with self._lock:
+            profiles = self._profiles.setdefault(stem, {})
+            return profiles.setdefault(threading.get_ident(), cProfile.Profile())
+
+    def _push(self, kind: str, name: str) -> Optional[Dict[str, Any]]:
+        if not self.active:
+            return None
+        stack = self._stack()
+        frame = {"kind": kind, "name": name, "stem": _file_stem(kind, name), "started": 0.0,
+                 "profile": None, "snapshot": None, "memory": 0, "peak": 0}
+        # Pause the enclosing segment first so that the bookkeeping below is not profiled
+        if stack and stack[-1]["profile"] is not None:
+            stack[-1]["profile"].disable()
+
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # Keep the peak of the enclosing segments before resetting it for this one
+            for outer in stack:
+                outer["peak"] = max(outer["peak"], peak - outer["memory"])
+            if kind != "tool":
+                frame["snapshot"] = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+            tracemalloc.reset_peak()
+            frame["memory"] = tracemalloc.get_traced_memory()[0]
+
+        stack.append(frame)
+        frame["started"] = time.perf_counter()
+        if self.cpu:
+            profile = self._profile_for(frame["stem"])
+            try:
+                profile.enable()
+                frame["profile"] = profile
+            except ValueError as e:
+                # Another profiler is active in this process (e.g. a concurrent segment on Python 3.12+)
+                logger.log_warning(f"CPU profile of {kind} {name} skipped: {str(e)}")
+        return frame
+
+    def _pop(self, frame: Optional[Dict[str, Any]]):
+        if frame is None:
+            return
+        stack = self._stack()
+        if frame not in stack:
+            return
+        while stack:
+            if stack.pop() is frame:
+                break
+        if frame["profile"] is not None:
+            frame["profile"].disable()
+        seconds = time.perf_counter() - frame["started"]
+
+        net = peak = 0
+        if self.memory and tracemalloc.is_tracing():
+            current, traced_peak = tracemalloc.get_traced_memory()
+            net = current - frame["memory"]
+            peak = max(frame["peak"], traced_peak - frame["memory"])
+            for outer in stack:
+                outer["peak"] = max(outer["peak"], peak + frame["memory"] - outer["memory"])
+            if frame["snapshot"] is not None:
+                self._write_allocations(frame, tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS))
+
+        with self._lock:
+            segment = self.segments.setdefault(frame["stem"], SegmentStats(kind=frame["kind"], name=frame["name"]))
+            segment.calls += 1
+            segment.seconds += seconds
+            segment.peak_bytes = max(segment.peak_bytes, peak)
+            segment.net_bytes += net
+        if stack and stack[-1]["profile"] is not None:
+            stack[-1]["profile"].enable()
+
+    def _write_allocations(self, frame: Dict[str, Any], snapshot: tracemalloc.Snapshot):
+        differences = snapshot.compare_to(frame["snapshot"], "lineno")
+        with self._lock:
+            run = self._reports.get(frame["stem"], 0) + 1
+            self._reports[frame["stem"]] = run
+        suffix = "" if run == 1 else f"-{run}"
+        path = os.path.join(self.output_dir, f"{frame['stem']}{suffix}.alloc.txt")
+        lines = [f"Top {self.top_n} allocations of {frame['kind']} {frame['name']} (by net size)", ""]
+        for stat in differences[:self.top_n]:
+            origin = stat.traceback[0]
+            lines.append(f"{stat.size_diff / 1024:>10.1f} KiB {stat.count_diff:>+8} blocks  "
+                         f"[{code_origin(origin.filename)}] {_display_path(origin.filename)}:{origin.lineno}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def _write_profiles(self) -> Optional[pstats.Stats]:
+        """Merge the per-thread profiles of each segment into <segment>.prof and return the merged run stats."""
+        merged = None
+        for stem, profiles in self._profiles.items():
+            stats = pstats.Stats()
+            for profile in profiles.values():
+                profile.create_stats()
+                if profile.stats:
+                    stats.add(profile)
+            if not stats.stats:
+                continue
+            stats.dump_stats(os.path.join(self.output_dir, f"{stem}.prof"))
+            if merged is None:
+                merged = pstats.Stats()
+            merged.add(stats)
+        return merged
+
+    def _summary(self, stats: Optional[pstats.Stats]) -> str:
+        lines = [f"Profile summary ({datetime.now().isoformat(timespec='seconds')})", "", "Segments:"]
+        for segment in sorted(self.segments.values(), key=lambda s: s.seconds, reverse=True):
+            lines.append(f"  {segment.kind:<5} {segment.name:<40} {segment.calls:>4} calls {segment.seconds:>9.3f}s "
+                         f"peak {segment.peak_bytes / 1024:>10.1f} KiB net {segment.net_bytes / 1024:>+10.1f} KiB")
+        if stats is None:
+            return "\n".join(lines) + "\n"
+
+        entries = stats.stats
+        total = sum(tottime for _, _, tottime, _, _ in entries.values()) or 1e-9
+        by_origin: Dict[str, float] = {}
+        for (filename, _, _), (_, _, tottime, _, _) in entries.items():
+            origin = code_origin(filename)
+            by_origin[origin] = by_origin.get(origin, 0.0) + tottime
+
+        lines += ["", f"Self time by origin (total {total:.3f}s):"]
+        for origin, seconds in sorted(by_origin.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"  {origin:<20} {seconds:>9.3f}s {100 * seconds / total:>6.1f}%")
+
+        local = [(key, value) for key, value in entries.items() if code_origin(key[0]) == "local"]
+        for title, column in (("self", 2), ("cumulative", 3)):
+            lines += ["", f"Hottest local functions by {title} time:"]
+            for key, value in sorted(local, key=lambda item: item[1][column], reverse=True)[:self.top_n]:
+                calls, _, tottime, cumtime, _ = value
+                lines.append(f"  {tottime:>9.3f}s self {cumtime:>9.3f}s cumulative {calls:>7} calls  {_function_label(key)}")
+        return "\n".join(lines) + "\n"
+
+
+# Create a singleton instance
+profiler = RunProfiler()
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+from .logger import logger
+
+# Per-brand inputs: identical for every request of a brand, so they belong in the cached prefix
+BRAND_FIELDS = (
+    ('brand_name', 'Brand'),
+    ('tone_of_voice', 'Tone of voice'),
+    ('primary_target', 'Primary target'),
+    ('secondary_target', 'Secondary target'),
+    ('unique_selling_points', 'Unique selling points'),
+    ('brand_colors', 'Brand colors'),
+    ('keywords', 'Keywords'),
+    ('avoid_terms', 'Terms to avoid'),
+    ('mandatory_elements', 'Mandatory elements'),
+    ('forbidden_elements', 'Forbidden elements'),
+    ('disclaimers', 'Required disclaimers'),
+)
+# Per-request inputs: rendered last, after everything that can be cached
+REQUEST_FIELDS = (
+    ('content_request', 'Content request'),
+    ('structure', 'Structure'),
+    ('ideal_length', 'Ideal length'),
+    ('required_elements', 'Required elements'),
+)
+# Model name fragments of providers that only cache explicitly marked prompt prefixes
+EXPLICIT_CACHE_MODELS = ('anthropic', 'claude')
+
+
+def _clean(value: Any) -> str:
+    """Normalize a value to one line, so that formatting noise never changes the prefix bytes."""
+    if value is None or value != value:  # None or NaN from pandas
+        return ''
+    # Braces would be read as CrewAI placeholders once the block is part of a prompt template
+    return " ".join(str(value).split()).replace('{', '(').replace('}', ')')
+
+
+class PromptLayout:
+    """
+    Splits a run's inputs into a static per-brand block and the volatile request details.
+
+    The brand block is rendered deterministically (fixed field order, normalized whitespace)
+    and placed before every agent's system prompt through a CrewAI prompt file, so all LLM
+    calls for a brand share a byte-identical prefix that providers can cache. Request data
+    only appears at the end of the task descriptions.
+    """
+
+    def __init__(self, inputs: Dict[str, Any], brand_info: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the layout.
+
+        Args:
+            inputs: The crew inputs
+            brand_info: Brand information from the brand_info CSV (Area -> Key Info)
+        """
+        self.inputs = inputs or {}
+        self.brand_info = brand_info or {}
+        self.static_block = self._render_static_block()
+        self.fingerprint = hashlib.sha256(self.static_block.encode('utf-8')).hexdigest()[:16]
+
+    def _render_static_block(self) -> str:
+        lines = ["BRAND CONTEXT (shared by every agent and task; the same for every request of this brand)", ""]
+        for key, label in BRAND_FIELDS:
+            value = _clean(self.inputs.get(key))
+            if value:
+                lines.append(f"- {label}: {value}")
+        brand_lines = [f"- {_clean(area)}: {_clean(info)}" for area, info in self.brand_info.items()
+                       if _clean(area) and _clean(info)]
+        if brand_lines:
+            lines += ["", "Brand information (brand_info CSV):"] + brand_lines
+        return "\n".join(lines)
+
+    @property
+    def request_block(self) -> str:
+        """The per-request details, to be placed at the end of each task description."""
+        lines = ["REQUEST DETAILS:"]
+        for key, label in REQUEST_FIELDS:
+            value = str(self.inputs.get(key) or '').strip()
+            if value:
+                lines.append(f"- {label}: {value}")
+        return "\n".join(lines)
+
+    @property
+    def draft_block(self) -> str:
+        """An earlier piece to start the draft from (inputs['starting_draft']), placed after the request details."""
+        draft = str(self.inputs.get('starting_draft') or '').strip()
+        if not draft:
+            return ''
+        return ("\n\nSTARTING DRAFT (written earlier for a similar request; update and adapt it to the request "
+                f"details above instead of writing from scratch):\n\n{draft}")
+
+    def prompt_file(self, cache_dir: str = None) -> str:
+        """
+        Write (once per brand) a CrewAI prompt file whose role-playing slice starts with the brand block.
+
+        Args:
+            cache_dir: Directory for the prompt files (default: $CONTENT_CREW_CACHE_DIR/prompts)
+
+        Returns:
+            The path of the prompt file
+        """
+        cache_dir = cache_dir or os.path.join(os.getenv('CONTENT_CREW_CACHE_DIR', os.path.join(os.getcwd(), '.cache')),
+                                              'prompts')
+        path = os.path.join(cache_dir, f"{self.fingerprint}.json")
+        if os.path.exists(path):
+            return path
+
+        from crewai.utilities import i18n
+        # Start from CrewAI's own translations so that every other prompt stays unchanged
+        default_file = os.path.join(os.path.dirname(os.path.realpath(i18n.__file__)), '..', 'translations', 'en.json')
+        with open(default_file, encoding='utf-8') as f:
+            prompts = json.load(f)
+        prompts['slices']['role_playing'] = f"{self.static_block}\n\n{prompts['slices']['role_playing']}"
+
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(prompts, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        logger.log_data_access("PromptLayout", path, "write", f"Brand block of {len(self.static_block)} characters")
+        return path
+
+    def apply(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the request details, the starting draft and the prompt file to the inputs of a kickoff."""
+        inputs['request_details'] = self.request_block
+        inputs['draft_details'] = self.draft_block
+        inputs['prompt_layout_file'] = self.prompt_file()
+        return inputs
+
+
+_installed = False
+
+
+def install_prompt_layout():
+    """Point every crew at the prompt file of its kickoff inputs through the CrewAI event bus (once per process)."""
+    global _installed
+    if _installed:
+        return
+    from crewai.events.event_bus import crewai_event_bus
+    from crewai.events.types.crew_events import CrewKickoffStartedEvent
+
+    def on_kickoff_started(source, event):
+        # Emitted after the before_kickoff hooks and before the crew loads its prompts;
+        # the source is the crew actually running, including the copies made by train()
+        prompt_file = (event.inputs or {}).get('prompt_layout_file')
+        if prompt_file and hasattr(source, 'prompt_file'):
+            source.prompt_file = prompt_file
+
+    crewai_event_bus.register_handler(CrewKickoffStartedEvent, on_kickoff_started)
+    _installed = True
+
+
+def prompt_cache_llm(model: str = None):
+    """
+    Return an LLM that marks the system prompt for caching on providers that need explicit
+    cache marks (Anthropic), or None to keep CrewAI's default LLM. OpenAI, DeepSeek and
+    Gemini cache long shared prefixes automatically.
+
+    Args:
+        model: The model name (default: the MODEL or OPENAI_MODEL_NAME environment variable)
+    """
+    model = model or os.getenv('MODEL') or os.getenv('OPENAI_MODEL_NAME')
+    if not model or not any(name in model.lower() for name in EXPLICIT_CACHE_MODELS):
+        return None
+    from crewai import LLM
+    return LLM(model=model, cache_control_injection_points=[{"location": "message", "role": "system"}])
+
+
+def prompt_cache_report(token_usage) -> Dict[str, Any]:
+    """
+    Summarize how much of a run's prompt input was served from the provider cache.
+
+    Args:
+        token_usage: The UsageMetrics of a crew output
+
+    Returns:
+        Prompt tokens, cached prompt tokens and their ratio
+    """
+    prompt_tokens = getattr(token_usage, 'prompt_tokens', 0) or 0
+    cached_tokens = getattr(token_usage, 'cached_prompt_tokens', 0) or 0
+    return {
+        'prompt_tokens': prompt_tokens,
+        'cached_prompt_tokens': cached_tokens,
+        'cached_ratio': round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0,
+    }
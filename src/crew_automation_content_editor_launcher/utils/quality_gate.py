@@ -0,0 +1,187 @@
+import re
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
+from .logger import logger
+from .compliance_checker import ComplianceChecker, ComplianceReport, split_list
+
+_WORD_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9'’-]*")
+_SENTENCE_RE = re.compile(r"[.!?]+(?:\s|$)")
+_VOWEL_GROUP_RE = re.compile(r"[aeiouy]+")
+_MARKDOWN_HEADER_RE = re.compile(r"^\s{0,3}#{1,6}\s+(.+?)\s*#*\s*$")
+_BOLD_HEADER_RE = re.compile(r"^\s*\*\*(.+?)\*\*:?\s*$")
+
+
+class QualityReport(BaseModel):
+    """Result of the local quality evaluation of a draft."""
+    word_count: int = 0
+    length_range: Optional[Tuple[int, int]] = None
+    missing_sections: List[str] = Field(default_factory=list)
+    keyword_density: Dict[str, float] = Field(default_factory=dict)
+    flesch_reading_ease: float = 0.0
+    flesch_kincaid_grade: float = 0.0
+    failures: List[str] = Field(default_factory=list)
+    compliance: Optional[ComplianceReport] = None
+
+    @property
+    def passed(self) -> bool:
+        return not self.failures and (self.compliance is None or self.compliance.passed)
+
+    def to_prompt(self) -> str:
+        """Render the failed checks as instructions for the editing agent."""
+        if self.passed:
+            return "Deterministic quality gate: all length, structure, keyword, readability and disclaimer checks passed."
+        lines = []
+        if self.failures:
+            lines.append("Deterministic quality gate findings (fix only these):")
+            lines.extend(f"- {failure}" for failure in self.failures)
+        if self.compliance is not None and not self.compliance.passed:
+            lines.append(self.compliance.to_prompt())
+        return "\n".join(lines)
+
+
+class QualityGate:
+    """
+    Fast local evaluator for drafts.
+    Checks length, section coverage, keyword density, readability and (through the
+    ComplianceChecker) disclaimer presence, so the crew can skip revision passes when a
+    draft already meets every requirement.
+    """
+
+    # Minimum Flesch reading ease; financial content is naturally dense
+    min_reading_ease: float = 30.0
+    # Maximum share of words a single keyword may take before it reads as stuffing
+    max_keyword_density: float = 0.03
+
+    def __init__(self, ideal_length: str = None, structure: str = None, keywords: str = None,
+                 compliance_checker: ComplianceChecker = None):
+        """
+        Initialize the gate from the crew inputs.
+
+        Args:
+            ideal_length: The ideal length, e.g. '800-1200 words'
+            structure: Comma-separated section names the draft must cover
+            keywords: Comma-separated SEO keywords the draft must contain
+            compliance_checker: Checker used for forbidden content and disclaimer presence
+        """
+        self.length_range = parse_length_range(ideal_length)
+        self.sections = split_list(structure)
+        self.keywords = split_list(keywords)
+        self.compliance_checker = compliance_checker
+        self._keyword_patterns = {
+            keyword: re.compile(r"\b" + r"\s+".join(re.escape(word) for word in keyword.split()) + r"\b",
+                                re.IGNORECASE)
+            for keyword in self.keywords
+        }
+
+    @classmethod
+    def from_inputs(cls, inputs: Dict[str, str], compliance_checker: ComplianceChecker = None) -> "QualityGate":
+        """Build a gate from crew kickoff inputs."""
+        return cls(
+            ideal_length=inputs.get("ideal_length"),
+            structure=inputs.get("structure"),
+            keywords=inputs.get("keywords"),
+            compliance_checker=compliance_checker,
+        )
+
+    def evaluate(self, draft: str) -> QualityReport:
+        """
+        Evaluate a draft against all deterministic checks.
+
+        Args:
+            draft: The draft text
+
+        Returns:
+            A QualityReport listing every failed check
+        """
+        draft = draft or ""
+        words = _WORD_RE.findall(draft)
+        report = QualityReport(word_count=len(words), length_range=self.length_range)
+
+        if self.length_range:
+            low, high = self.length_range
+            if not low <= report.word_count <= high:
+                report.failures.append(f"Length is {report.word_count} words, expected {low}-{high}")
+
+        headers = [normalize_header(header) for header in extract_headers(draft)]
+        report.missing_sections = [section for section in self.sections
+                                   if not any(section_matches(section, header) for header in headers)]
+        if report.missing_sections:
+            report.failures.append(f"Missing sections: {', '.join(report.missing_sections)}")
+
+        for keyword, pattern in self._keyword_patterns.items():
+            occurrences = len(pattern.findall(draft))
+            density = (occurrences * len(keyword.split()) / len(words)) if words else 0.0
+            report.keyword_density[keyword] = round(density, 4)
+            if occurrences == 0:
+                report.failures.append(f"Keyword '{keyword}' is missing")
+            elif density > self.max_keyword_density:
+                report.failures.append(f"Keyword '{keyword}' density {density:.1%} exceeds {self.max_keyword_density:.0%}")
+
+        report.flesch_reading_ease, report.flesch_kincaid_grade = readability_scores(words, draft)
+        if words and report.flesch_reading_ease < self.min_reading_ease:
+            report.failures.append(f"Flesch reading ease {report.flesch_reading_ease:.1f} is below {self.min_reading_ease:.0f}")
+
+        if self.compliance_checker:
+            report.compliance = self.compliance_checker.scan(draft)
+
+        logger.log_info(f"Quality gate: {report.word_count} words, reading ease {report.flesch_reading_ease:.1f}, "
+                        f"{len(report.failures)} failed checks, compliance "
+                        f"{'passed' if report.compliance is None or report.compliance.passed else 'failed'}")
+        return report
+
+
+def parse_length_range(ideal_length: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parse '800-1200 words' (or '1000') into an inclusive word range."""
+    if not ideal_length:
+        return None
+    numbers = [int(number) for number in re.findall(r"\d+", str(ideal_length).replace(",", ""))]
+    if not numbers:
+        return None
+    if len(numbers) == 1:
+        return numbers[0], numbers[0]
+    return min(numbers[0], numbers[1]), max(numbers[0], numbers[1])
+
+
+def extract_headers(content: str) -> List[str]:
+    """Return Markdown ('## Title') and bold-line ('**Title**') headers in document order."""
+    headers = []
+    for line in content.splitlines():
+        match = _MARKDOWN_HEADER_RE.match(line) or _BOLD_HEADER_RE.match(line)
+        if match:
+            headers.append(match.group(1))
+    return headers
+
+
+def normalize_header(header: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", header.lower()))
+
+
+def section_matches(section: str, normalized_header: str) -> bool:
+    """A section is covered when every significant word of its name appears in the header."""
+    words = [word for word in re.findall(r"[a-z0-9]+", section.lower()) if len(word) > 2]
+    header_words = normalized_header.split()
+    return bool(words) and all(any(header_word.startswith(word[:5]) for header_word in header_words)
+                               for word in words)
+
+
+def count_syllables(word: str) -> int:
+    word = word.lower().strip("'’-")
+    if not word:
+        return 0
+    syllables = len(_VOWEL_GROUP_RE.findall(word))
+    if word.endswith("e") and not word.endswith(("le", "ee")) and syllables > 1:
+        syllables -= 1
+    return max(1, syllables)
+
+
+def readability_scores(words: List[str], text: str) -> Tuple[float, float]:
+    """Return (Flesch reading ease, Flesch-Kincaid grade) for the text."""
+    if not words:
+        return 0.0, 0.0
+    sentences = max(1, len(_SENTENCE_RE.findall(text)))
+    syllables = sum(count_syllables(word) for word in words)
+    words_per_sentence = len(words) / sentences
+    syllables_per_word = syllables / len(words)
+    reading_ease = 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+    grade = 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59
+    return round(reading_ease, 2), round(grade, 2)
@@ -0,0 +1,162 @@
+import asyncio
+import os
+import sqlite3
+import time
+from contextlib import closing
+from datetime import date
+from typing import Optional
+from .logger import logger
+
+
+class QuotaExceededError(RuntimeError):
+    """Raised when the daily request quota of a rate limiter is used up."""
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter shared by every process that opens the same SQLite file.
+    Callers that find the bucket empty wait for their turn instead of failing, so the
+    aggregate request rate of all crew processes stays at the provider limit. Daily
+    quota consumption is tracked in the same database.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float = None, daily_quota: int = 0,
+                 db_path: str = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            name: The name of the limited resource (one bucket per name)
+            rate: The sustained rate in requests per second
+            burst: The bucket capacity (default: one second of requests, at least 1)
+            daily_quota: Maximum requests per calendar day (0 = unlimited)
+            db_path: The SQLite file shared between processes
+                (default: $CONTENT_CREW_CACHE_DIR/rate_limits.sqlite)
+        """
+        if rate <= 0:
+            raise ValueError(f"Invalid rate for {name}: {rate}. Must be greater than 0")
+        self.name = name
+        self.rate = float(rate)
+        self.burst = float(burst) if burst else max(1.0, self.rate)
+        self.daily_quota = daily_quota
+        self.db_path = db_path or os.path.join(
+            os.getenv("CONTENT_CREW_CACHE_DIR", os.path.join(os.getcwd(), ".cache")), "rate_limits.sqlite")
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS quota (name TEXT, day TEXT, used INTEGER, PRIMARY KEY (name, day))")
+
+    @classmethod
+    def from_env(cls, name: str, default_rate: float, db_path: str = None) -> "RateLimiter":
+        """
+        Build a limiter configured through environment variables prefixed with the
+        upper-cased name, e.g. SERPER_RATE_LIMIT, SERPER_BURST and SERPER_DAILY_QUOTA.
+        """
+        prefix = name.upper()
+        return cls(
+            name,
+            rate=float(os.getenv(f"{prefix}_RATE_LIMIT", default_rate)),
+            burst=float(os.getenv(f"{prefix}_BURST", 0)) or None,
+            daily_quota=int(os.getenv(f"{prefix}_DAILY_QUOTA", 0)),
+            db_path=db_path,
+        )
+
+    def _connect(self) -> closing:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return closing(conn)
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        Take one token, waiting until one is available.
+
+        Args:
+            timeout: Maximum seconds to wait (default: wait as long as needed)
+
+        Returns:
+            The number of seconds spent waiting
+
+        Raises:
+            QuotaExceededError: If the daily quota is used up
+            TimeoutError: If no token became available within the timeout
+        """
+        waited = 0.0
+        while True:
+            wait = self._try_acquire()
+            if wait == 0:
+                if waited:
+                    logger.log_info(f"Rate limiter '{self.name}': waited {waited:.2f}s for a request slot")
+                return waited
+            if timeout is not None and waited + wait > timeout:
+                raise TimeoutError(f"Rate limiter '{self.name}': no request slot within {timeout}s")
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> float:
+        """
+        Async counterpart of acquire: the bucket is read off the event loop and the wait
+        for the next token does not block it.
+        """
+        waited = 0.0
+        while True:
+            wait = await asyncio.to_thread(self._try_acquire)
+            if wait == 0:
+                if waited:
+                    logger.log_info(f"Rate limiter '{self.name}': waited {waited:.2f}s for a request slot")
+                return waited
+            if timeout is not None and waited + wait > timeout:
+                raise TimeoutError(f"Rate limiter '{self.name}': no request slot within {timeout}s")
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def _try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return the seconds until the next one."""
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE serializes the read-modify-write across processes
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)).fetchone()
+                tokens = self.burst if row is None else min(self.burst, row[0] + (now - row[1]) * self.rate)
+
+                if tokens < 1:
+                    conn.execute("REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                                 (self.name, tokens, now))
+                    conn.execute("COMMIT")
+                    return (1 - tokens) / self.rate
+
+                today = date.today().isoformat()
+                if self.daily_quota:
+                    used = conn.execute("SELECT used FROM quota WHERE name = ? AND day = ?",
+                                        (self.name, today)).fetchone()
+                    if used and used[0] >= self.daily_quota:
+                        raise QuotaExceededError(f"Daily quota of {self.daily_quota} requests for "
+                                                 f"'{self.name}' is used up")
+
+                conn.execute("REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                             (self.name, tokens - 1, now))
+                conn.execute("INSERT INTO quota (name, day, used) VALUES (?, ?, 1) "
+                             "ON CONFLICT (name, day) DO UPDATE SET used = used + 1", (self.name, today))
+                conn.execute("COMMIT")
+                return 0
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def pause(self, seconds: float):
+        """
+        Hold back every process sharing this limiter, e.g. after the provider answered 429.
+        The bucket is drained so that the next token becomes available after the given delay.
+        """
+        with self._connect() as conn:
+            conn.execute("REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                         (self.name, 1 - seconds * self.rate, time.time()))
+        logger.log_warning(f"Rate limiter '{self.name}': pausing requests for {seconds:.1f}s")
+
+    def usage(self, day: date = None) -> int:
+        """Return the number of requests made on the given day (default: today)."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT used FROM quota WHERE name = ? AND day = ?",
+                               (self.name, (day or date.today()).isoformat())).fetchone()
+        return row[0] if row else 0
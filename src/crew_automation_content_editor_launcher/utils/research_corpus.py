@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from pydantic import BaseModel
+from .logger import logger
+
+# Documents older than this are stale and trigger a live search (override with CONTENT_CREW_CORPUS_MAX_AGE_DAYS)
+DEFAULT_MAX_AGE_DAYS = 7.0
+_TOKEN_RE = re.compile(r"\w+")
+_STOP_WORDS = {"a", "an", "and", "the", "for", "of", "in", "on", "to", "with", "about", "from", "by", "is",
+               "are", "what", "how", "why", "best", "vs"}
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|mc_cid|mc_eid|ref)$")
+
+
+class CorpusDocument(BaseModel):
+    """A search result kept in the research corpus."""
+    id: int
+    url: str
+    title: str = ""
+    snippet: str = ""
+    published: str = ""
+    fetched_at: float
+
+
+def normalize_url(url: str) -> str:
+    """Reduce a URL to the key used for de-duplication (no fragment, tracking parameters or www.)."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                             if not _TRACKING_PARAMS.match(key.lower())))
+    return urlunsplit((parts.scheme.lower() or "https", host, parts.path.rstrip("/") or "/", query, ""))
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class ResearchCorpus:
+    """
+    Local research corpus accumulated from every live web search. Results are stored once
+    per URL (near-identical copies under other URLs are dropped by content hash) with the
+    time they were last fetched, and indexed with SQLite FTS5 so that later runs can answer
+    recurring research topics without calling Serper again.
+    """
+
+    def __init__(self, db_path: str = None, max_age_days: float = None):
+        """
+        Initialize the corpus.
+
+        Args:
+            db_path: The SQLite file (default: $CONTENT_CREW_CACHE_DIR/research_corpus.sqlite)
+            max_age_days: Age after which documents no longer cover a topic
+                (default: CONTENT_CREW_CORPUS_MAX_AGE_DAYS or 7)
+        """
+        self.db_path = db_path or os.path.join(
+            os.getenv("CONTENT_CREW_CACHE_DIR", os.path.join(os.getcwd(), ".cache")), "research_corpus.sqlite")
+        self.max_age_days = float(max_age_days if max_age_days is not None
+                                  else os.getenv("CONTENT_CREW_CORPUS_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS))
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                url_key TEXT NOT NULL UNIQUE,
+                content_hash TEXT NOT NULL,
+                title TEXT,
+                snippet TEXT,
+                published TEXT,
+                first_seen REAL NOT NULL,
+                fetched_at REAL NOT NULL)""")
+            conn.execute("CREATE INDEX IF NOT EXISTS documents_hash ON documents (content_hash)")
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5("
+                         "title, snippet, tokenize='porter unicode61')")
+            conn.execute("""CREATE TABLE IF NOT EXISTS queries (
+                query_key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                num_results INTEGER NOT NULL,
+                document_ids TEXT NOT NULL,
+                fetched_at REAL NOT NULL)""")
+
+    def _connect(self) -> closing:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return closing(conn)
+
+    @property
+    def fresh_after(self) -> float:
+        return time.time() - self.max_age_days * 86400
+
+    def add_search_results(self, query: str, search_results: Dict[str, Any], num_results: int = None) -> List[int]:
+        """
+        Store the organic results of a live search and record the query as covered.
+
+        Args:
+            query: The search query
+            search_results: The Serper response
+            num_results: The number of results requested
+
+        Returns:
+            The ids of the stored documents, in ranking order
+        """
+        organic = [result for result in search_results.get("organic", []) if result.get("link")]
+        if num_results:
+            organic = organic[:num_results]
+        if not organic:
+            return []
+
+        now = time.time()
+        document_ids = []
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for result in organic:
+                    document_id = self._upsert(conn, result, now)
+                    if document_id not in document_ids:
+                        document_ids.append(document_id)
+                conn.execute("REPLACE INTO queries (query_key, query, num_results, document_ids, fetched_at) "
+                             "VALUES (?, ?, ?, ?, ?)",
+                             (normalize_query(query), query, num_results or len(organic), json.dumps(document_ids), now))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        logger.log_data_access("ResearchCorpus", self.db_path, "write",
+                               f"{len(document_ids)} documents for '{query}'")
+        return document_ids
+
+    def _upsert(self, conn: sqlite3.Connection, result: Dict[str, Any], now: float) -> int:
+        url = result["link"]
+        title = (result.get("title") or "").strip()
+        snippet = (result.get("snippet") or "").strip()
+        published = result.get("date") or ""
+        content_hash = hashlib.sha256(f"{normalize_query(title)}\n{normalize_query(snippet)}".encode("utf-8")).hexdigest()
+
+        row = conn.execute("SELECT id FROM documents WHERE url_key = ?", (normalize_url(url),)).fetchone()
+        if row is None and snippet:
+            # The same result under another URL (mirrors, AMP pages, tracking redirects)
+            row = conn.execute("SELECT id FROM documents WHERE content_hash = ?", (content_hash,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE documents SET fetched_at = ? WHERE id = ?", (now, row[0]))
+                return row[0]
+        if row is None:
+            cursor = conn.execute(
+                "INSERT INTO documents (url, url_key, content_hash, title, snippet, published, first_seen, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, normalize_url(url), content_hash, title, snippet, published, now, now))
+            document_id = cursor.lastrowid
+        else:
+            document_id = row[0]
+            conn.execute("UPDATE documents SET url = ?, content_hash = ?, title = ?, snippet = ?, published = ?, "
+                         "fetched_at = ? WHERE id = ?",
+                         (url, content_hash, title, snippet, published, now, document_id))
+            conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (document_id,))
+        conn.execute("INSERT INTO documents_fts (rowid, title, snippet) VALUES (?, ?, ?)",
+                     (document_id, title, snippet))
+        return document_id
+
+    def lookup(self, query: str, num_results: int = 5) -> Optional[List[CorpusDocument]]:
+        """
+        Answer a search from the corpus if the topic is covered by fresh documents.
+
+        A topic is covered when the same query was searched live within the freshness window,
+        or when at least num_results fresh documents match every term of the query.
+
+        Args:
+            query: The search query
+            num_results: The number of results needed
+
+        Returns:
+            The matching documents in ranking order, or None if a live search is needed
+        """
+        fresh_after = self.fresh_after
+        with self._connect() as conn:
+            row = conn.execute("SELECT document_ids, num_results FROM queries WHERE query_key = ? AND fetched_at >= ?",
+                               (normalize_query(query), fresh_after)).fetchone()
+            if row is not None and row[1] >= num_results:
+                ids = json.loads(row[0])[:num_results]
+                documents = self._documents(conn, ids, fresh_after)
+                if documents and len(documents) == len(ids):
+                    return documents
+
+            match = self._match_expression(query)
+            if match is None:
+                return None
+            ids = [document_id for (document_id,) in conn.execute(
+                "SELECT documents_fts.rowid FROM documents_fts JOIN documents ON documents.id = documents_fts.rowid "
+                "WHERE documents_fts MATCH ? AND documents.fetched_at >= ? ORDER BY bm25(documents_fts) LIMIT ?",
+                (match, fresh_after, num_results))]
+            if len(ids) < num_results:
+                return None
+            return self._documents(conn, ids, fresh_after)
+
+    @staticmethod
+    def _match_expression(query: str) -> Optional[str]:
+        terms = [term for term in _TOKEN_RE.findall(query.lower()) if term not in _STOP_WORDS and len(term) > 1]
+        if not terms:
+            return None
+        return " AND ".join(f'"{term}"' for term in dict.fromkeys(terms))
+
+    @staticmethod
+    def _documents(conn: sqlite3.Connection, ids: List[int], fresh_after: float) -> List[CorpusDocument]:
+        documents = []
+        for document_id in ids:
+            row = conn.execute("SELECT id, url, title, snippet, published, fetched_at FROM documents "
+                               "WHERE id = ? AND fetched_at >= ?", (document_id, fresh_after)).fetchone()
+            if row is not None:
+                documents.append(CorpusDocument(id=row[0], url=row[1], title=row[2] or "", snippet=row[3] or "",
+                                                published=row[4] or "", fetched_at=row[5]))
+        return documents
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of documents, fresh documents and recorded queries."""
+        with self._connect() as conn:
+            documents = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            fresh = conn.execute("SELECT COUNT(*) FROM documents WHERE fetched_at >= ?", (self.fresh_after,)).fetchone()[0]
+            queries = conn.execute("SELECT COUNT(*) FROM queries").fetchone()[0]
+        return {"documents": documents, "fresh_documents": fresh, "queries": queries}
@@ -0,0 +1,265 @@
+import asyncio
+import bisect
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+from .logger import logger
+
+T = TypeVar("T")
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Shared pool for hedged attempts; a losing attempt finishes in the background
+_hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because its circuit breaker is open."""
+
+
+class LatencyHistogram:
+    """
+    Thread-safe latency histogram with fixed buckets for export and a rolling window
+    of recent samples for percentile estimates (used to pick the hedging delay).
+    """
+
+    def __init__(self, name: str, window: int = 200, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.total += seconds
+            self._recent.append(seconds)
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, p: float, min_samples: int = 1) -> Optional[float]:
+        """Return the p-th percentile (0-100) of the recent samples, or None with too few samples."""
+        with self._lock:
+            samples = sorted(self._recent)
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))]
+
+    def snapshot(self) -> Dict[str, object]:
+        """Return the histogram as a JSON-serializable dictionary."""
+        with self._lock:
+            counts = list(self.counts)
+            total = self.total
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        count = sum(counts)
+        return {
+            "name": self.name,
+            "count": count,
+            "mean": total / count if count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": dict(zip(bounds, counts)),
+        }
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker. Opens when the failure ratio over the recent calls
+    crosses the threshold, rejects calls while open, and lets a single trial call
+    through after the reset timeout (half-open) to decide whether to close again.
+    """
+
+    def __init__(self, name: str, failure_threshold: float = 0.5, min_calls: int = 5,
+                 window: int = 20, reset_timeout: float = 30.0):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            name: The name of the protected dependency
+            failure_threshold: Failure ratio (0-1) over the window that opens the circuit
+            min_calls: Minimum calls in the window before the ratio is evaluated
+            window: Number of recent calls considered
+            reset_timeout: Seconds the circuit stays open before a trial call
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._results: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == "open" and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        """Return True when a call may proceed."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def release(self):
+        """
+        Free the half-open trial slot when the trial call ended without recording a result
+        (e.g. it raised QuotaExceededError before reaching the dependency), so that the next
+        call can be the trial. Callers run this in a finally block after every allowed call.
+        """
+        with self._lock:
+            if self.state == "half_open":
+                self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self.state == "half_open":
+                logger.log_info(f"Circuit breaker '{self.name}' closed after a successful trial call")
+                self.state = "closed"
+                self._results.clear()
+            self._results.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            self._results.append(False)
+            if self.state == "half_open":
+                self._open()
+                return
+            failures = self._results.count(False)
+            if (self.state == "closed" and len(self._results) >= self.min_calls
+                    and failures / len(self._results) >= self.failure_threshold):
+                self._open()
+
+    def _open(self):
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+        logger.log_warning(f"Circuit breaker '{self.name}' opened; failing fast for {self.reset_timeout:.0f}s")
+
+
+def hedged_call(func: Callable[[], T], delay: Optional[float], max_attempts: int = 2) -> T:
+    """
+    Run func and, if it has not finished after delay seconds, start a duplicate attempt.
+    The first attempt to succeed wins; an attempt that raises is ignored while another
+    is still running. Failures are not retried here (callers keep their own retry policy).
+
+    Args:
+        func: The call to hedge (must be safe to run more than once)
+        delay: Seconds to wait before each additional attempt (None disables hedging)
+        max_attempts: Maximum number of concurrent attempts
+
+    Returns:
+        The result of the first successful attempt
+
+    Raises:
+        Exception: The error of the last attempt when every attempt failed
+    """
+    if delay is None or max_attempts < 2:
+        return func()
+
+    pending = {_hedge_executor.submit(func)}
+    attempts = 1
+    error: Optional[BaseException] = None
+    while pending:
+        timeout = delay if attempts < max_attempts else None
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if attempts > 1:
+                    logger.log_info(f"Hedged call finished after {attempts} attempts")
+                return future.result()
+            error = future.exception()
+        if not done and attempts < max_attempts:
+            # The delay elapsed without a response: start a duplicate attempt
+            pending.add(_hedge_executor.submit(func))
+            attempts += 1
+    raise error
+
+
+async def hedged_call_async(func: Callable[[], Awaitable[T]], delay: Optional[float], max_attempts: int = 2) -> T:
+    """
+    Async counterpart of hedged_call: attempts are tasks on the running event loop, and
+    the attempts still running when one succeeds are cancelled.
+
+    Args:
+        func: Returns a new awaitable for each attempt (must be safe to run more than once)
+        delay: Seconds to wait before each additional attempt (None disables hedging)
+        max_attempts: Maximum number of concurrent attempts
+
+    Returns:
+        The result of the first successful attempt
+
+    Raises:
+        Exception: The error of the last attempt when every attempt failed
+    """
+    if delay is None or max_attempts < 2:
+        return await func()
+
+    pending = {asyncio.ensure_future(func())}
+    attempts = 1
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            timeout = delay if attempts < max_attempts else None
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if attempts > 1:
+                        logger.log_info(f"Hedged call finished after {attempts} attempts")
+                    return task.result()
+                error = task.exception()
+            if not done and attempts < max_attempts:
+                # The delay elapsed without a response: start a duplicate attempt
+                pending.add(asyncio.ensure_future(func()))
+                attempts += 1
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class ResilienceRegistry:
+    """Process-wide registry of the latency histograms and circuit breakers of external calls."""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        with self._lock:
+            return self.histograms.setdefault(name, LatencyHistogram(name))
+
+    def breaker(self, name: str, **kwargs) -> CircuitBreaker:
+        with self._lock:
+            if name not in self.breakers:
+                self.breakers[name] = CircuitBreaker(name, **kwargs)
+            return self.breakers[name]
+
+    def export(self) -> Dict[str, List[Dict[str, object]]]:
+        """Return every histogram and breaker state as a JSON-serializable dictionary."""
+        return {
+            "latency": [histogram.snapshot() for histogram in self.histograms.values()],
+            "circuit_breakers": [{"name": name, "state": breaker.state} for name, breaker in self.breakers.items()],
+        }
+
+
+# Create a singleton instance
+resilience_registry = ResilienceRegistry()
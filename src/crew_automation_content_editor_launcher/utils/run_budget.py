@@ -0,0 +1,242 @@
+import re
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from pydantic import BaseModel, Field
+from .logger import logger
+
+_TOKEN_RE = re.compile(r"\w+")
+_STOP_WORDS = {"and", "the", "for", "with", "from", "about", "into", "info", "information", "data"}
+_SUFFIXES = (("ings", ""), ("ing", ""), ("ies", "y"), ("ed", ""), ("s", ""))
+
+
+class ToolCall(BaseModel):
+    """A completed tool call, kept to answer repeated calls from its result."""
+    tool: str
+    exact: Tuple[Tuple[str, str], ...]
+    tokens: FrozenSet[str]
+    result: Any = None
+
+
+class BudgetScope(BaseModel):
+    """Tool-call accounting for one agent working on one task during a run."""
+    agent_role: str
+    task_name: str
+    max_tool_calls: Optional[int] = None
+    # Per-task override of the agent's max_iter, if any
+    max_iter: Optional[int] = None
+    tool_calls: int = 0
+    repeated_calls: int = 0
+    budget_hits: int = 0
+    calls: List[ToolCall] = Field(default_factory=list)
+    # The executing agent, used to end its loop early once the budget is spent
+    agent: Any = Field(default=None, exclude=True)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.max_tool_calls is not None and self.tool_calls >= self.max_tool_calls
+
+
+_current_scope: ContextVar[Optional[BudgetScope]] = ContextVar("run_budget_scope", default=None)
+
+
+def _stem(word: str) -> str:
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)] + replacement
+            break
+    if len(word) > 3 and word[-1] == word[-2]:
+        word = word[:-1]
+    return word
+
+
+def call_signature(arguments: Dict[str, Any]) -> Tuple[Tuple[Tuple[str, str], ...], FrozenSet[str]]:
+    """
+    Normalize tool arguments for repeat detection.
+
+    Returns:
+        The arguments that must match exactly (short identifiers and non-text values) and
+        the stemmed word tokens of the free-text arguments
+    """
+    exact = []
+    tokens = set()
+    for name, value in sorted(arguments.items()):
+        if isinstance(value, str) and len(value.split()) > 1:
+            tokens.update(f"{name}:{_stem(word)}" for word in _TOKEN_RE.findall(value.lower())
+                          if word not in _STOP_WORDS)
+        elif isinstance(value, str):
+            exact.append((name, value.strip().lower()))
+        else:
+            exact.append((name, repr(value)))
+    return tuple(exact), frozenset(tokens)
+
+
+class RunBudget:
+    """
+    Run-level tool-call budget manager. Tracks every tool call per agent and task, answers
+    repeated or near-identical calls from the earlier result instead of running the tool
+    again, and ends an agent's loop early (with its best available answer) once its tool
+    budget is spent. Budgets come from max_tool_calls in agents.yaml and tasks.yaml; a
+    max_iter in tasks.yaml overrides the agent's LLM iteration limit for that task.
+    """
+
+    # Repeated calls answered from earlier results before the agent loop is ended
+    max_repeated_calls = 2
+
+    def __init__(self, similarity_threshold: float = 0.75):
+        """
+        Initialize the budget manager.
+
+        Args:
+            similarity_threshold: Minimum Jaccard similarity of the free-text arguments
+                for two calls of the same tool to count as a repeat
+        """
+        self.similarity_threshold = similarity_threshold
+        self.agent_limits: Dict[str, int] = {}
+        self.task_limits: Dict[str, int] = {}
+        self.task_max_iter: Dict[str, int] = {}
+        self.scopes: Dict[Tuple[str, str], BudgetScope] = {}
+        self._lock = threading.Lock()
+        self._installed = False
+
+    def install(self):
+        """Track which agent and task are executing through the CrewAI event bus (once per process)."""
+        if self._installed:
+            return
+        from crewai.events.event_bus import crewai_event_bus
+        from crewai.events.types.agent_events import (
+            AgentExecutionCompletedEvent,
+            AgentExecutionErrorEvent,
+            AgentExecutionStartedEvent,
+        )
+
+        def on_started(source, event):
+            self.enter(event.agent.role, getattr(event.task, "name", None) or "task", event.agent)
+
+        def on_finished(source, event):
+            self.leave()
+
+        crewai_event_bus.register_handler(AgentExecutionStartedEvent, on_started)
+        crewai_event_bus.register_handler(AgentExecutionCompletedEvent, on_finished)
+        crewai_event_bus.register_handler(AgentExecutionErrorEvent, on_finished)
+        self._installed = True
+
+    def reset(self, agent_limits: Dict[str, Optional[int]] = None, task_limits: Dict[str, Optional[int]] = None,
+              task_max_iter: Dict[str, Optional[int]] = None):
+        """
+        Start a new run with the given budgets.
+
+        Args:
+            agent_limits: Maximum tool calls per task for each agent role
+            task_limits: Maximum tool calls for each task name (takes precedence)
+            task_max_iter: Maximum LLM iterations for each task name (overrides the agent's max_iter)
+        """
+        with self._lock:
+            self.agent_limits = {role: int(limit) for role, limit in (agent_limits or {}).items() if limit}
+            self.task_limits = {name: int(limit) for name, limit in (task_limits or {}).items() if limit}
+            self.task_max_iter = {name: int(limit) for name, limit in (task_max_iter or {}).items() if limit}
+            self.scopes = {}
+
+    def enter(self, agent_role: str, task_name: str, agent: Any = None) -> BudgetScope:
+        """Make (agent_role, task_name) the scope of the tool calls in the current context."""
+        with self._lock:
+            scope = self.scopes.get((agent_role, task_name))
+            if scope is None:
+                scope = BudgetScope(agent_role=agent_role, task_name=task_name,
+                                    max_tool_calls=self.task_limits.get(task_name, self.agent_limits.get(agent_role)),
+                                    max_iter=self.task_max_iter.get(task_name))
+                self.scopes[(agent_role, task_name)] = scope
+            scope.agent = agent
+        # The agent builds a new executor with its own max_iter for every task, just before this event
+        executor = getattr(agent, "agent_executor", None)
+        if scope.max_iter is not None and executor is not None and hasattr(executor, "max_iter"):
+            executor.max_iter = scope.max_iter
+        _current_scope.set(scope)
+        return scope
+
+    def leave(self):
+        _current_scope.set(None)
+
+    def before_call(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """
+        Check a tool call against the budget of the current scope.
+
+        Args:
+            tool_name: The name of the tool
+            arguments: The call arguments by name
+
+        Returns:
+            The answer to hand back instead of running the tool, or None to run it
+        """
+        scope = _current_scope.get()
+        if scope is None:
+            return None
+
+        exact, tokens = call_signature(arguments)
+        previous = self._find_repeat(scope, tool_name, exact, tokens)
+        if previous is not None:
+            scope.repeated_calls += 1
+            logger.log_warning(f"BUDGET: {scope.agent_role} | TASK: {scope.task_name} | repeated {tool_name} call "
+                               f"{arguments} answered from the earlier result")
+            if scope.repeated_calls >= self.max_repeated_calls:
+                self._end_agent_loop(scope)
+            return (f"{previous.result}\n\nNote: this repeats an earlier {tool_name} call with near-identical "
+                    f"arguments, so the earlier result is shown again. Try a different approach or give your "
+                    f"Final Answer.")
+
+        if scope.exhausted:
+            scope.budget_hits += 1
+            logger.log_warning(f"BUDGET: {scope.agent_role} | TASK: {scope.task_name} | tool call budget of "
+                               f"{scope.max_tool_calls} reached, {tool_name} not run; ending the agent loop")
+            self._end_agent_loop(scope)
+            return (f"Tool call budget exhausted: {scope.tool_calls} of {scope.max_tool_calls} tool calls used for "
+                    f"this task. Do not call any more tools; give your best Final Answer now using the "
+                    f"information already gathered.")
+
+        scope.tool_calls += 1
+        return None
+
+    def after_call(self, tool_name: str, arguments: Dict[str, Any], result: Any):
+        """Remember a completed tool call so that repeats can be answered from it."""
+        scope = _current_scope.get()
+        if scope is None:
+            return
+        exact, tokens = call_signature(arguments)
+        scope.calls.append(ToolCall(tool=tool_name, exact=exact, tokens=tokens, result=result))
+
+    def _find_repeat(self, scope: BudgetScope, tool_name: str, exact, tokens) -> Optional[ToolCall]:
+        for call in reversed(scope.calls):
+            if call.tool != tool_name or call.exact != exact:
+                continue
+            if call.tokens == tokens:
+                return call
+            union = call.tokens | tokens
+            if union and len(call.tokens & tokens) / len(union) >= self.similarity_threshold:
+                return call
+        return None
+
+    def _end_agent_loop(self, scope: BudgetScope):
+        """Make the agent's executor ask for its best final answer on the next iteration."""
+        executor = getattr(scope.agent, "agent_executor", None)
+        if executor is not None and hasattr(executor, "iterations") and hasattr(executor, "max_iter"):
+            executor.iterations = max(executor.iterations, executor.max_iter - 1)
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Return the tool-call accounting of the run, one entry per agent and task."""
+        with self._lock:
+            scopes = list(self.scopes.values())
+        return [scope.model_dump(exclude={"calls", "agent"}) for scope in scopes]
+
+    def log_report(self):
+        """Log the budget accounting of the run."""
+        for entry in self.report():
+            status = "budget reached" if entry["budget_hits"] else "within budget"
+            limit = entry["max_tool_calls"] if entry["max_tool_calls"] is not None else "unlimited"
+            logger.log_workflow_step(f"run_budget:{entry['task_name']}", status,
+                                     f"Agent: {entry['agent_role']} | Tool calls: {entry['tool_calls']}/{limit} | "
+                                     f"Repeats answered: {entry['repeated_calls']} | "
+                                     f"Blocked calls: {entry['budget_hits']}")
+
+
+# Create a singleton instance
+run_budget = RunBudget()
@@ -0,0 +1,230 @@
+import os
+import re
+import sqlite3
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from .logger import logger
+from .rate_limiter import RateLimiter
+
+# Priority classes, most urgent first; a job's class is payload['priority']
+PRIORITY_CLASSES = ("urgent", "normal", "batch")
+DEFAULT_PRIORITY = "normal"
+# Writing tasks whose duration grows with the requested length
+LENGTH_SENSITIVE_TASKS = ("content_creation_task", "revision_task", "finalization_task")
+# Task timings kept per task for the duration estimates
+TIMING_HISTORY = 50
+_NUMBER_RE = re.compile(r"\d+")
+
+
+class JobEstimate(BaseModel):
+    """Expected duration and resource use of a queued job."""
+    seconds: float
+    llm_slots: int = 1
+    serper_calls: int = 0
+
+
+def requested_words(inputs: Dict[str, Any], default: int = 1000) -> int:
+    """The upper bound of inputs['ideal_length'] (e.g. '800-1200 words' -> 1200)."""
+    numbers = [int(number) for number in _NUMBER_RE.findall(str(inputs.get("ideal_length") or ""))]
+    return max(numbers) if numbers else default
+
+
+class JobScheduler:
+    """
+    Chooses which queued job a worker runs next, inside the lease transaction of
+    SQLiteJobQueue so that every worker process applies the same policy:
+
+    1. Jobs whose deadline (payload['deadline'], epoch seconds) is at risk given their
+       estimated duration go first, earliest deadline first.
+    2. Otherwise the most urgent priority class wins (payload['priority']: urgent, normal
+       or batch); waiting jobs move up one class every aging_seconds, so batch work is
+       never starved.
+    3. Within a class, tenants (payload['tenant'], default the brand) share the workers in
+       proportion to their weights: the tenant with the least weighted service so far goes
+       next (virtual time fair queuing), then earliest deadline, then oldest job.
+
+    A job is only admitted while the running jobs leave enough LLM concurrency and Serper
+    rate and daily quota for it. Durations are estimated from the task timings of earlier
+    jobs, scaled by the requested length for the writing tasks.
+    """
+
+    def __init__(self, llm_concurrency: int = None, serper_limiter: RateLimiter = None,
+                 serper_calls_per_job: int = None, tenant_weights: Dict[str, float] = None,
+                 aging_seconds: float = None, deadline_margin: float = 0.25, default_task_seconds: float = 60.0,
+                 default_tasks: int = 6):
+        """
+        Initialize the scheduler.
+
+        Args:
+            llm_concurrency: LLM calls allowed at once across workers (default: CONTENT_CREW_LLM_CONCURRENCY or 4)
+            serper_limiter: The Serper rate limiter whose rate and daily quota bound admission
+            serper_calls_per_job: Expected Serper requests per job (default: CONTENT_CREW_SERPER_CALLS_PER_JOB or 10)
+            tenant_weights: Share of each tenant (default: CONTENT_CREW_TENANT_WEIGHTS, e.g. "Siebert Financial=2,Other=1")
+            aging_seconds: Waiting time after which a job moves up one priority class
+                (default: CONTENT_CREW_PRIORITY_AGING or 900)
+            deadline_margin: A deadline is at risk when the slack is below this fraction of the estimate
+            default_task_seconds: Estimated task duration before any timing was recorded
+            default_tasks: Number of tasks assumed before any timing was recorded
+        """
+        self.llm_concurrency = int(llm_concurrency or os.getenv("CONTENT_CREW_LLM_CONCURRENCY", 4))
+        self.serper_limiter = serper_limiter
+        self.serper_calls_per_job = int(serper_calls_per_job if serper_calls_per_job is not None
+                                        else os.getenv("CONTENT_CREW_SERPER_CALLS_PER_JOB", 10))
+        self.tenant_weights = tenant_weights if tenant_weights is not None else self._parse_weights(
+            os.getenv("CONTENT_CREW_TENANT_WEIGHTS", ""))
+        self.aging_seconds = float(aging_seconds or os.getenv("CONTENT_CREW_PRIORITY_AGING", 900))
+        self.deadline_margin = deadline_margin
+        self.default_task_seconds = default_task_seconds
+        self.default_tasks = default_tasks
+
+    @staticmethod
+    def _parse_weights(value: str) -> Dict[str, float]:
+        weights = {}
+        for item in value.split(","):
+            tenant, _, weight = item.rpartition("=")
+            if tenant.strip() and weight.strip():
+                weights[tenant.strip()] = float(weight)
+        return weights
+
+    def ensure_schema(self, conn: sqlite3.Connection):
+        conn.execute("CREATE TABLE IF NOT EXISTS scheduler_tenants ("
+                     "queue TEXT NOT NULL, tenant TEXT NOT NULL, virtual_time REAL NOT NULL, "
+                     "PRIMARY KEY (queue, tenant))")
+        conn.execute("CREATE TABLE IF NOT EXISTS task_timings ("
+                     "id INTEGER PRIMARY KEY, task TEXT NOT NULL, seconds REAL NOT NULL, words INTEGER NOT NULL, "
+                     "recorded_at REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS task_timings_task ON task_timings (task, id)")
+
+    @staticmethod
+    def tenant(payload: Dict[str, Any]) -> str:
+        return str(payload.get("tenant") or payload.get("inputs", {}).get("brand_name") or "default")
+
+    def priority_rank(self, payload: Dict[str, Any]) -> int:
+        priority = payload.get("priority") or DEFAULT_PRIORITY
+        return PRIORITY_CLASSES.index(priority) if priority in PRIORITY_CLASSES else PRIORITY_CLASSES.index(DEFAULT_PRIORITY)
+
+    def timing_profile(self, conn: sqlite3.Connection) -> Dict[str, float]:
+        """
+        Median duration of every task over its recent runs: seconds per requested word for
+        the writing tasks, seconds otherwise.
+        """
+        profile = {}
+        for (task,) in conn.execute("SELECT DISTINCT task FROM task_timings").fetchall():
+            rows = conn.execute("SELECT seconds, words FROM task_timings WHERE task = ? ORDER BY id DESC LIMIT ?",
+                                (task, TIMING_HISTORY)).fetchall()
+            if task in LENGTH_SENSITIVE_TASKS:
+                profile[task] = statistics.median(seconds / max(words, 1) for seconds, words in rows)
+            else:
+                profile[task] = statistics.median(seconds for seconds, _ in rows)
+        return profile
+
+    def estimate(self, payload: Dict[str, Any], profile: Dict[str, float]) -> JobEstimate:
+        """Estimate a job's duration from the timing profile and its resource use from its inputs."""
+        from .format_fanout import parse_variants
+
+        inputs = payload.get("inputs", {})
+        words = requested_words(inputs)
+        if profile:
+            seconds = sum(value * words if task in LENGTH_SENSITIVE_TASKS else value for task, value in profile.items())
+        else:
+            seconds = self.default_task_seconds * self.default_tasks
+        return JobEstimate(seconds=seconds, llm_slots=max(1, len(parse_variants(inputs.get("output_variants")))),
+                           serper_calls=int(payload.get("serper_calls", self.serper_calls_per_job)))
+
+    def select(self, conn: sqlite3.Connection, queue: str, candidates: List[Any], running: List[Any],
+               now: float = None) -> Optional[Any]:
+        """
+        Pick the job to lease among the ready candidates, or None to keep the capacity free.
+
+        Args:
+            conn: The queue connection, inside the lease transaction
+            queue: The queue name
+            candidates: Jobs that could be leased now
+            running: Jobs currently leased by workers
+
+        Returns:
+            The chosen job, or None
+        """
+        if not candidates:
+            return None
+        now = now or time.time()
+        profile = self.timing_profile(conn)
+        estimates = {job.id: self.estimate(job.payload, profile) for job in candidates + running}
+        virtual_times = self._virtual_times(conn, queue, {self.tenant(job.payload) for job in candidates})
+
+        def order(job) -> Tuple:
+            deadline = job.payload.get("deadline")
+            estimate = estimates[job.id].seconds
+            at_risk = deadline is not None and deadline - now - estimate <= self.deadline_margin * estimate
+            waited = max(now - job.created_at, 0.0)
+            rank = max(self.priority_rank(job.payload) - int(waited // self.aging_seconds), 0)
+            return (0 if at_risk else 1, deadline if at_risk else 0, rank,
+                    virtual_times[self.tenant(job.payload)], deadline if deadline is not None else float("inf"),
+                    job.created_at)
+
+        keys = {job.id: order(job) for job in candidates}
+        ordered = sorted(candidates, key=lambda job: keys[job.id])
+        running_estimates = [estimates[job.id] for job in running]
+        for job in ordered:
+            if self._admits(estimates[job.id], running_estimates):
+                if job is not ordered[0]:
+                    logger.log_workflow_step(f"scheduler:{queue}", "backfilled",
+                                             f"Job {job.id} admitted while job {ordered[0].id} waits for capacity")
+                self._charge(conn, queue, job, estimates[job.id], virtual_times[self.tenant(job.payload)])
+                return job
+            # Capacity freed by running jobs goes to urgent work first instead of smaller jobs behind it
+            at_risk, _, rank = keys[job.id][:3]
+            if running and (at_risk == 0 or rank == 0):
+                logger.log_workflow_step(f"scheduler:{queue}", "holding",
+                                         f"Job {job.id} waits for LLM/Serper headroom ({len(running)} running)")
+                return None
+        return None
+
+    def _admits(self, estimate: JobEstimate, running: List[JobEstimate]) -> bool:
+        if running and sum(other.llm_slots for other in running) + estimate.llm_slots > self.llm_concurrency:
+            return False
+        if self.serper_limiter is None or not estimate.serper_calls:
+            return True
+        rate = sum(other.serper_calls / max(other.seconds, 1.0) for other in running + [estimate])
+        if running and rate > self.serper_limiter.rate:
+            return False
+        if self.serper_limiter.daily_quota:
+            remaining = self.serper_limiter.daily_quota - self.serper_limiter.usage()
+            if sum(other.serper_calls for other in running) + estimate.serper_calls > remaining:
+                return False
+        return True
+
+    def _virtual_times(self, conn: sqlite3.Connection, queue: str, tenants: set) -> Dict[str, float]:
+        stored = dict(conn.execute("SELECT tenant, virtual_time FROM scheduler_tenants WHERE queue = ?", (queue,)))
+        # Tenants that were idle start from the current minimum instead of claiming back idle time
+        floor = min((stored[tenant] for tenant in tenants if tenant in stored), default=0.0)
+        virtual_times = {tenant: max(stored.get(tenant, floor), floor) for tenant in tenants}
+        # Waiting tenants keep their place while others are served
+        conn.executemany("INSERT OR IGNORE INTO scheduler_tenants (queue, tenant, virtual_time) VALUES (?, ?, ?)",
+                         [(queue, tenant, virtual_times[tenant]) for tenant in tenants if tenant not in stored])
+        return virtual_times
+
+    def _charge(self, conn: sqlite3.Connection, queue: str, job: Any, estimate: JobEstimate, virtual_time: float):
+        # Charged with the estimate when admitted, so that concurrent leases already see the tenant's share
+        tenant = self.tenant(job.payload)
+        conn.execute("REPLACE INTO scheduler_tenants (queue, tenant, virtual_time) VALUES (?, ?, ?)",
+                     (queue, tenant, virtual_time + estimate.seconds / self.tenant_weights.get(tenant, 1.0)))
+        logger.log_workflow_step(f"scheduler:{queue}", "admitted",
+                                 f"Job {job.id} | tenant {tenant} | priority {job.payload.get('priority', DEFAULT_PRIORITY)} | "
+                                 f"estimate {estimate.seconds:.0f}s")
+
+    def record(self, conn: sqlite3.Connection, job: Any, result: Any):
+        """Record the task timings reported in a job result (result['task_seconds'])."""
+        task_seconds = (result or {}).get("task_seconds") if isinstance(result, dict) else None
+        if not task_seconds:
+            return
+        words = requested_words(job.payload.get("inputs", {}))
+        now = time.time()
+        conn.executemany("INSERT INTO task_timings (task, seconds, words, recorded_at) VALUES (?, ?, ?, ?)",
+                         [(task, float(seconds), words, now) for task, seconds in task_seconds.items() if seconds])
+        for task in task_seconds:
+            conn.execute("DELETE FROM task_timings WHERE task = ? AND id NOT IN "
+                         "(SELECT id FROM task_timings WHERE task = ? ORDER BY id DESC LIMIT ?)",
+                         (task, task, TIMING_HISTORY))
@@ -0,0 +1,261 @@
+import re
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
+from .logger import logger
+from .quality_gate import QualityGate, QualityReport, normalize_header, readability_scores, section_matches, _WORD_RE
+
+# Header detection shared with ContentFormatterTool._format_content
+HEADER_RE = re.compile(r'#\s+')
+_HEADER_LINE_RE = re.compile(r'^#{1,6}\s+.*$', re.MULTILINE)
+_SECTION_BLOCK_RE = re.compile(r'<<<SECTION (\d+)>>>\s*\n?(.*?)\s*<<<END SECTION \1>>>', re.DOTALL)
+_NEW_SECTION_BLOCK_RE = re.compile(r'<<<NEW SECTION (\d+)[^>]*>>>\s*\n?(.*?)\s*<<<END NEW SECTION \1>>>', re.DOTALL)
+
+# Maximum number of sections asked to absorb a length correction
+_LENGTH_FIX_SECTIONS = 2
+
+
+class DraftSection(BaseModel):
+    """A header-delimited section of a draft."""
+    index: int
+    header: Optional[str] = None
+    body: str = ""
+    start: int = 0
+    end: int = 0
+
+    @property
+    def text(self) -> str:
+        if self.header is None:
+            return self.body
+        return f"{self.header}\n\n{self.body}" if self.body else self.header
+
+    @property
+    def word_count(self) -> int:
+        return len(_WORD_RE.findall(self.body))
+
+
+class RevisionPlan(BaseModel):
+    """Per-section issues for a draft and the logic to stitch revised sections back in."""
+    sections: List[DraftSection] = Field(default_factory=list)
+    flagged: Dict[int, List[str]] = Field(default_factory=dict)
+    # Missing structure sections, mapped to the index of the section they follow (-1 = top)
+    additions: Dict[str, int] = Field(default_factory=dict)
+    full_rewrite: bool = False
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.flagged or self.additions or self.full_rewrite)
+
+    @property
+    def flagged_word_count(self) -> int:
+        return sum(self.sections[index].word_count for index in self.flagged)
+
+    def to_prompt(self) -> str:
+        """Render only the flagged sections and their issues for the revising agent."""
+        lines = [
+            "Revise ONLY the sections below; the rest of the document is already approved.",
+            "Return each revised section wrapped in its original markers, keep its header line unchanged, "
+            "and return nothing else.",
+        ]
+        for index in sorted(self.flagged):
+            lines.append("")
+            lines.append(f"Issues for section {index}:")
+            lines.extend(f"- {issue}" for issue in self.flagged[index])
+            lines.append(f"<<<SECTION {index}>>>")
+            lines.append(self.sections[index].text)
+            lines.append(f"<<<END SECTION {index}>>>")
+        for number, name in enumerate(self.additions, 1):
+            lines.append("")
+            lines.append(f"Write the missing '{name}' section, starting with the header '## {name}', and wrap it as:")
+            lines.append(f"<<<NEW SECTION {number}: {name}>>>")
+            lines.append(f"<<<END NEW SECTION {number}>>>")
+        return "\n".join(lines)
+
+    def stitch(self, revised_output: str) -> str:
+        """
+        Replace the flagged sections with their revisions and insert new sections.
+
+        Args:
+            revised_output: The LLM output containing marker-wrapped sections
+
+        Returns:
+            The full revised document
+        """
+        revised = {int(number): text.strip() for number, text in _SECTION_BLOCK_RE.findall(revised_output or "")}
+        new_sections = {int(number): text.strip() for number, text in _NEW_SECTION_BLOCK_RE.findall(revised_output or "")}
+
+        if not revised and not new_sections:
+            if revised_output and HEADER_RE.search(revised_output):
+                logger.log_warning("Section revision returned no markers; using the output as a full revision")
+                return revised_output
+            logger.log_warning("Section revision returned no usable sections; keeping the original draft")
+            return self.original
+
+        missing = [index for index in self.flagged if index not in revised]
+        if missing:
+            logger.log_warning(f"Section revision did not return sections {missing}; keeping their original text")
+
+        inserts: Dict[int, List[str]] = {}
+        for number, (name, after) in enumerate(self.additions.items(), 1):
+            if number in new_sections:
+                inserts.setdefault(after, []).append(new_sections[number])
+
+        parts = inserts.get(-1, [])[:]
+        for section in self.sections:
+            parts.append(revised.get(section.index, section.text))
+            parts.extend(inserts.get(section.index, []))
+        return "\n\n".join(part for part in parts if part)
+
+    @property
+    def original(self) -> str:
+        return "\n\n".join(section.text for section in self.sections if section.text)
+
+
+def has_headers(content: str) -> bool:
+    """Return True when the content already contains Markdown headers."""
+    return bool(HEADER_RE.search(content))
+
+
+def paragraph_group_bounds(num_paragraphs: int, num_sections: int) -> List[Tuple[int, int]]:
+    """Return (start, end) paragraph indexes splitting paragraphs into roughly equal groups."""
+    if num_paragraphs <= num_sections:
+        return [(i, min(i + 1, num_paragraphs)) for i in range(num_sections)]
+
+    # Calculate paragraphs per section
+    paras_per_section = num_paragraphs // num_sections
+    remainder = num_paragraphs % num_sections
+
+    bounds = []
+    start_idx = 0
+    for i in range(num_sections):
+        # Add one extra paragraph to early sections if there's a remainder
+        extra = 1 if i < remainder else 0
+        end_idx = start_idx + paras_per_section + extra
+        bounds.append((start_idx, end_idx))
+        start_idx = end_idx
+
+    return bounds
+
+
+def split_into_paragraph_groups(content: str, num_sections: int) -> List[str]:
+    """Split content into roughly equal groups of paragraphs."""
+    paragraphs = content.split("\n\n")
+    return ["\n\n".join(paragraphs[start:end]) for start, end in paragraph_group_bounds(len(paragraphs), num_sections)]
+
+
+def split_sections(content: str, fallback_sections: int = 0) -> List[DraftSection]:
+    """
+    Split a draft into header-delimited sections with character offsets.
+    Text before the first header becomes a header-less preamble section. Drafts without
+    headers are split into fallback_sections paragraph groups instead.
+    """
+    sections = []
+    headers = list(_HEADER_LINE_RE.finditer(content))
+    if not headers and fallback_sections > 1:
+        cursor = 0
+        for group in split_into_paragraph_groups(content.strip(), fallback_sections):
+            if not group.strip():
+                continue
+            start = content.find(group, cursor)
+            cursor = start + len(group)
+            sections.append(DraftSection(index=len(sections), body=group.strip(), start=start, end=cursor))
+        if sections:
+            sections[-1].end = len(content)
+        return sections
+
+    preamble_end = headers[0].start() if headers else len(content)
+    if content[:preamble_end].strip():
+        sections.append(DraftSection(index=0, body=content[:preamble_end].strip(), start=0, end=preamble_end))
+
+    for position, match in enumerate(headers):
+        end = headers[position + 1].start() if position + 1 < len(headers) else len(content)
+        sections.append(DraftSection(index=len(sections), header=match.group(0).strip(),
+                                     body=content[match.end():end].strip(), start=match.start(), end=end))
+    return sections
+
+
+def plan_revision(draft: str, report: QualityReport, gate: QualityGate) -> RevisionPlan:
+    """
+    Map the quality gate and compliance findings onto the sections of a draft.
+
+    Args:
+        draft: The draft that was evaluated
+        report: The QualityReport for the draft
+        gate: The QualityGate that produced the report
+
+    Returns:
+        A RevisionPlan; full_rewrite is set when the draft cannot be split into sections
+    """
+    sections = split_sections(draft, len(gate.sections))
+    plan = RevisionPlan(sections=sections)
+    if report.passed:
+        return plan
+    if len(sections) < 2:
+        plan.full_rewrite = True
+        return plan
+
+    def flag(index: int, issue: str):
+        plan.flagged.setdefault(index, []).append(issue)
+
+    def section_at(offset: int) -> int:
+        for section in sections:
+            if section.start <= offset < section.end:
+                return section.index
+        return sections[-1].index
+
+    body_sections = [section for section in sections if section.body] or sections
+    closing = next((section.index for section in sections
+                    if section.header and re.search(r'disclaim|disclos|legal', section.header, re.IGNORECASE)),
+                   sections[-1].index)
+
+    compliance = report.compliance
+    if compliance is not None:
+        for violation in compliance.violations:
+            flag(section_at(violation.start), f"Remove {violation.kind.replace('_', ' ')} '{violation.match}' "
+                                              f"(rule: {violation.rule})")
+        for element in compliance.missing_elements:
+            flag(closing, f"Add the missing mandatory element: {element}")
+        for disclaimer in compliance.missing_disclaimers:
+            flag(closing, f"Add the disclaimer text verbatim: \"{disclaimer}\"")
+
+    for keyword, density in report.keyword_density.items():
+        if density == 0:
+            flag(body_sections[0].index, f"Naturally include the keyword '{keyword}'")
+        elif density > gate.max_keyword_density:
+            pattern = gate._keyword_patterns[keyword]
+            densest = max(body_sections, key=lambda section: len(pattern.findall(section.body)))
+            flag(densest.index, f"Reduce repetitions of the keyword '{keyword}'")
+
+    if report.length_range:
+        low, high = report.length_range
+        if report.word_count < low:
+            targets = sorted(body_sections, key=lambda section: section.word_count)[:_LENGTH_FIX_SECTIONS]
+            extra = -(-(low - report.word_count) // len(targets))
+            for section in targets:
+                flag(section.index, f"Expand this section by about {extra} words")
+        elif report.word_count > high:
+            targets = sorted(body_sections, key=lambda section: -section.word_count)[:_LENGTH_FIX_SECTIONS]
+            cut = -(-(report.word_count - high) // len(targets))
+            for section in targets:
+                flag(section.index, f"Trim this section by about {cut} words")
+
+    if report.word_count and report.flesch_reading_ease < gate.min_reading_ease:
+        for section in body_sections:
+            words = _WORD_RE.findall(section.body)
+            reading_ease, _ = readability_scores(words, section.body)
+            if words and reading_ease < gate.min_reading_ease:
+                flag(section.index, f"Simplify sentences and wording (reading ease {reading_ease:.0f})")
+
+    headers = {section.index: normalize_header(section.header) for section in sections if section.header}
+    for position, name in enumerate(gate.sections):
+        if name not in report.missing_sections:
+            continue
+        after = -1
+        for previous in gate.sections[:position]:
+            matches = [index for index, header in headers.items() if section_matches(previous, header)]
+            if matches:
+                after = max(after, max(matches))
+        plan.additions[name] = after
+
+    logger.log_info(f"Revision plan: {len(plan.flagged)} of {len(sections)} sections flagged, "
+                    f"{len(plan.additions)} sections to add")
+    return plan
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from .logger import logger
+
+
+class _Call:
+    """An in-flight execution shared by every caller with the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+def call_key(tool_name: str, arguments: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build the coalescing key for a tool call from its name, the tool instance's configuration
+    and the normalized arguments. The configuration is hashed, so credentials such as API keys
+    never appear in the key.
+    """
+    normalized = {name: " ".join(value.lower().split()) if isinstance(value, str) else value
+                  for name, value in arguments.items()}
+    key = f"{tool_name}|{json.dumps(normalized, sort_keys=True, default=repr)}"
+    if config is None:
+        return key
+    fingerprint = hashlib.sha256(json.dumps(config, sort_keys=True, default=repr).encode("utf-8")).hexdigest()[:16]
+    return f"{fingerprint}|{key}"
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call with a given key is in flight,
+    further callers with the same key wait for it and receive its result (or error)
+    instead of executing it again. Keeps per-group counts of executed and coalesced calls.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._async_calls: Dict[Tuple[int, str], asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], Any], group: str = "default") -> Any:
+        """
+        Execute func once for all concurrent callers with the same key.
+
+        Args:
+            key: The coalescing key (see call_key)
+            func: The call to execute
+            group: The name metrics are counted under (e.g. the tool name)
+
+        Returns:
+            The result of the shared execution
+        """
+        with self._lock:
+            stats = self._stats.setdefault(group, {"executed": 0, "coalesced": 0})
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                stats["executed"] += 1
+                leader = True
+            else:
+                stats["coalesced"] += 1
+                leader = False
+
+        if not leader:
+            logger.log_info(f"SINGLE-FLIGHT: {group} call coalesced with an identical call in flight")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: str, func: Callable[[], Awaitable[Any]], group: str = "default") -> Any:
+        """
+        Await func once for all concurrent callers with the same key on this event loop.
+        Counts under the same group metrics as do(); callers waiting in do() and do_async()
+        do not share an execution.
+        """
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        with self._lock:
+            stats = self._stats.setdefault(group, {"executed": 0, "coalesced": 0})
+            call = self._async_calls.get(loop_key)
+            if call is None:
+                call = self._async_calls[loop_key] = loop.create_future()
+                stats["executed"] += 1
+                leader = True
+            else:
+                stats["coalesced"] += 1
+                leader = False
+
+        if not leader:
+            logger.log_info(f"SINGLE-FLIGHT: {group} call coalesced with an identical call in flight")
+            # Shielded so that a cancelled follower does not cancel the shared result
+            return await asyncio.shield(call)
+
+        try:
+            result = await func()
+            call.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except BaseException as e:
+            call.set_exception(e)
+            # Retrieved here so that an error without followers is not reported as unhandled
+            call.exception()
+            raise
+        finally:
+            with self._lock:
+                del self._async_calls[loop_key]
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Return the executed and coalesced call counts per group."""
+        with self._lock:
+            return {group: dict(stats) for group, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+
+# Create a singleton instance
+single_flight = SingleFlight()
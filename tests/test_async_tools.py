@@ -0,0 +1,106 @@
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from crew_automation_content_editor_launcher.tools.csv_search_tool import CSVSearchTool
+from crew_automation_content_editor_launcher.tools.web_search_tool import WebSearchTool
+from crew_automation_content_editor_launcher.utils.csv_manager import CSVManager
+from crew_automation_content_editor_launcher.utils.rate_limiter import RateLimiter
+from crew_automation_content_editor_launcher.utils.resilience import CircuitBreaker, LatencyHistogram
+
+class SerperHandler(BaseHTTPRequestHandler):
+    delay = 0.2
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.delay)
+        if self.headers.get("X-API-KEY") != "test_serper_key":
+            return self._send(403, {"message": "Unauthorized"})
+        self._send(200, {
+            "organic": [{"title": f"{request['q']} result {i}", "link": f"https://example.com/{i}",
+                         "snippet": f"About {request['q']}", "date": "2024-05-01"} for i in range(1, 8)],
+            "knowledgeGraph": {"title": "Siebert Financial", "type": "Brokerage", "attributes": {"founded": "1967"}},
+        })
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+class SerperServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+class TestAsyncTools(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = SerperServer(("127.0.0.1", 0), SerperHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def web_search_tool(self, name, api_key="test_serper_key", base_url=None):
+        return WebSearchTool(api_key=api_key, base_url=base_url or self.base_url, hedge_delay=0, use_corpus=False,
+                             cache_dir=os.path.join(self.tmp_dir.name, name),
+                             rate_limiter=RateLimiter(name, rate=1000, db_path=os.path.join(self.tmp_dir.name, "limits.sqlite")),
+                             circuit_breaker=CircuitBreaker(name), latency=LatencyHistogram(name))
+
+    def test_web_search_async_matches_sync(self):
+        results = {}
+        for api_key in ("test_serper_key", "wrong_key"):
+            sync_result = self.web_search_tool("sync", api_key)._run("retirement planning", 3)
+            results[api_key] = asyncio.run(self.web_search_tool("async", api_key).arun("retirement planning", 3))
+            self.assertEqual(results[api_key], sync_result)
+        self.assertIn("**3. retirement planning result 3**", results["test_serper_key"])
+        self.assertNotIn("result 4", results["test_serper_key"])
+        self.assertTrue(results["wrong_key"].startswith("ERROR: Invalid or missing API credentials"))
+
+    def test_web_search_async_falls_back_to_cached_results(self):
+        asyncio.run(self.web_search_tool("cached").arun("mutual funds", 5))
+        offline = self.web_search_tool("cached", base_url="http://127.0.0.1:9")
+
+        result = asyncio.run(offline.arun("mutual funds", 5))
+        self.assertIn("**1. mutual funds result 1**", result)
+        self.assertEqual(result, offline._run("mutual funds", 5))
+
+    def test_concurrent_web_searches_share_one_event_loop(self):
+        tool = self.web_search_tool("concurrent")
+
+        async def search_all():
+            return await asyncio.gather(*(tool.arun(f"query {i}", 2) for i in range(20)))
+
+        started = time.perf_counter()
+        results = asyncio.run(search_all())
+        self.assertLess(time.perf_counter() - started, 20 * SerperHandler.delay / 2)
+        self.assertEqual([result.count("**1. query") for result in results], [1] * 20)
+
+    def test_csv_search_async_matches_sync(self):
+        manager = CSVManager(self.tmp_dir.name)
+        with open(manager.rag3_path, "w", encoding="utf-8") as f:
+            f.write("sector,FINANCE\nregulation,MiFID II\nprohibited_content,Tax optimization schemes\n")
+        tool = CSVSearchTool()
+        tool.csv_manager = manager
+
+        for csv_file, query in (("compliance_info", "regulation"), ("compliance_info", "crypto"), ("glossary", "fund")):
+            self.assertEqual(asyncio.run(tool.arun(csv_file, query)), tool._run(csv_file, query))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+import litellm
+from crewai import LLM
+from crew_automation_content_editor_launcher.tools.web_search_tool import WebSearchTool
+from crew_automation_content_editor_launcher.utils.cassette import Cassette, CassetteMissError, RecordedError
+from crew_automation_content_editor_launcher.utils.rate_limiter import RateLimiter
+from crew_automation_content_editor_launcher.utils.resilience import CircuitBreaker, LatencyHistogram
+
+class SerperHandler(BaseHTTPRequestHandler):
+    requests = 0
+
+    def do_POST(self):
+        type(self).requests += 1
+        query = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["q"]
+        body = json.dumps({"organic": [{"title": f"{query} result {i}", "link": f"https://example.com/{i}",
+                                        "snippet": f"About {query}"} for i in range(1, 4)]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def completion(model, messages, **kwargs):
+    time.sleep(0.2)
+    return litellm.ModelResponse(model=model, choices=[{"index": 0, "finish_reason": "stop", "message": {
+        "role": "assistant", "content": f"Answer to: {messages[-1]['content']}"}}],
+        usage={"prompt_tokens": 12, "completion_tokens": 4, "total_tokens": 16})
+
+def offline(*args, **kwargs):
+    raise AssertionError("replay must not call the LLM")
+
+class TestCassette(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), SerperHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        # Keep the research corpus out of the working directory
+        patcher = patch.dict(os.environ, {"CONTENT_CREW_CACHE_DIR": self.tmp_dir.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.path = os.path.join(self.tmp_dir.name, "cassettes", "run.json.gz")
+
+    def web_search_tool(self, base_url):
+        return WebSearchTool(api_key="test_serper_key", base_url=base_url, hedge_delay=0,
+                             cache_dir=os.path.join(self.tmp_dir.name, "search"),
+                             rate_limiter=RateLimiter("cassette", rate=1000, db_path=os.path.join(self.tmp_dir.name, "limits.sqlite")),
+                             circuit_breaker=CircuitBreaker("cassette"), latency=LatencyHistogram("cassette"))
+
+    def llm(self):
+        return LLM(model="gpt-4o-mini", api_key="sk-secret-test-key")
+
+    def test_serper_searches_replay_offline(self):
+        with Cassette(self.path, "record").activate():
+            tool = self.web_search_tool(self.base_url)
+            recorded = [tool._run("retirement planning", 3), asyncio.run(tool.arun("mutual funds", 2))]
+
+        requests_before = SerperHandler.requests
+        with Cassette(self.path).activate():
+            tool = self.web_search_tool("http://127.0.0.1:9")
+            replayed = [tool._run("retirement planning", 3), asyncio.run(tool.arun("mutual funds", 2))]
+        self.assertEqual(replayed, recorded)
+        self.assertIn("**2. mutual funds result 2**", replayed[1])
+        self.assertEqual(SerperHandler.requests, requests_before)
+
+    def test_llm_calls_replay_without_the_provider(self):
+        with patch("litellm.completion", completion), Cassette(self.path, "record").activate() as cassette:
+            cassette.inputs = {"content_request": "Retirement planning post"}
+            recorded = [self.llm().call("Outline a retirement post"), self.llm().call("Write the introduction")]
+
+        with patch("litellm.completion", offline):
+            with Cassette(self.path).activate() as cassette:
+                started = time.perf_counter()
+                replayed = [self.llm().call("Outline a retirement post"), self.llm().call("Write the introduction")]
+                self.assertLess(time.perf_counter() - started, 0.2)
+            self.assertIs(litellm.completion, offline)
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(cassette.inputs, {"content_request": "Retirement planning post"})
+
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            stored = f.read()
+        self.assertNotIn("sk-secret-test-key", stored)
+        self.assertIn("Outline a retirement post", stored)
+
+    def test_replay_can_simulate_recorded_latency(self):
+        with patch("litellm.completion", completion), Cassette(self.path, "record").activate():
+            self.llm().call("Outline a retirement post")
+
+        with patch("litellm.completion", offline), Cassette(self.path, latency_scale=1.0).activate():
+            started = time.perf_counter()
+            self.llm().call("Outline a retirement post")
+            self.assertGreaterEqual(time.perf_counter() - started, 0.19)
+
+    def test_matching_of_changed_repeated_and_failed_calls(self):
+        cassette = Cassette(self.path, "record")
+        for query in ("first", "first", "second"):
+            cassette.http("serper", {"q": query}, lambda: self.web_search_tool(self.base_url)._request_search(query, 1))
+        with self.assertRaises(ValueError):
+            cassette.call("llm", {"messages": "boom"}, lambda: int("boom"), None, None)
+        cassette.save()
+
+        replay = Cassette(self.path)
+        self.assertIn("second result 1", replay.http("serper", {"q": "second"}, offline).text)
+        self.assertIn("first result 1", replay.http("serper", {"q": "first"}, offline).text)
+        # A changed request gets the next unused call of its kind
+        self.assertIn("first result 1", replay.http("serper", {"q": "first, edited"}, offline).text)
+        with self.assertRaises(CassetteMissError):
+            replay.http("serper", {"q": "first"}, offline)
+        with self.assertRaisesRegex(RecordedError, "invalid literal"):
+            replay.call("llm", {"messages": "boom"}, offline, None, None)
+
+        with self.assertRaises(CassetteMissError):
+            Cassette(self.path, strict=True).http("serper", {"q": "third"}, offline)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from crew_automation_content_editor_launcher.utils.compliance_checker import ComplianceChecker
+
+class TestComplianceChecker(unittest.TestCase):
+    def setUp(self):
+        self.checker = ComplianceChecker.from_inputs(
+            {
+                'avoid_terms': 'guaranteed returns, risk-free, get rich quick',
+                'forbidden_elements': 'Specific return promises, competitor criticism',
+                'mandatory_elements': 'Regulatory disclosures, fee transparency',
+                'disclaimers': 'Investment advisory services involve risk. Past performance is not indicative of future results.'
+            },
+            {'prohibited_content': '4. References to tax optimization schemes 5. Unapproved cross-border service claims'}
+        )
+
+    def test_violations_are_reported_with_spans(self):
+        draft = "A risk-free plan with 12% annual returns and tax-optimized cross-border accounts."
+        report = self.checker.scan(draft)
+
+        matches = {violation.match for violation in report.violations}
+        self.assertEqual(matches, {'risk-free', '12% annual returns', 'tax-optimized', 'cross-border'})
+        for violation in report.violations:
+            self.assertEqual(draft[violation.start:violation.end], violation.match)
+
+    def test_listed_avoid_terms_win_over_concept_patterns(self):
+        report = self.checker.scan("We offer guaranteed returns. We promise solid returns.")
+
+        self.assertEqual([(violation.kind, violation.rule, violation.match) for violation in report.violations], [
+            ('avoid_term', 'guaranteed returns', 'guaranteed returns'),
+            ('forbidden_element', 'Specific return promises', 'promise solid returns'),
+        ])
+        self.assertIn("Remove avoid term 'guaranteed returns' (rule: guaranteed returns", report.to_prompt())
+
+    def test_missing_elements_and_disclaimers(self):
+        report = self.checker.scan("We explain our fees in full transparency. Investment advisory services involve risk.")
+
+        self.assertEqual(report.violations, [])
+        self.assertEqual(report.missing_elements, ['Regulatory disclosures'])
+        self.assertEqual(report.missing_disclaimers, ['Past performance is not indicative of future results.'])
+        self.assertFalse(report.passed)
+
+    def test_compliant_draft_passes(self):
+        draft = ("Regulatory disclosures and fee transparency matter.\n\n"
+                 "Investment advisory services involve risk.\nPast performance is not indicative of future results.")
+        report = self.checker.scan(draft)
+
+        self.assertTrue(report.passed)
+
+    def test_required_rules_matching_at_the_same_offset(self):
+        checker = ComplianceChecker(avoid_terms=['Performance may'], mandatory_elements=['performance'],
+                                    disclaimers=['Performance may vary.'])
+        report = checker.scan("Performance may vary.")
+
+        self.assertEqual([violation.match for violation in report.violations], ['Performance may'])
+        self.assertEqual(report.missing_elements, [])
+        self.assertEqual(report.missing_disclaimers, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import json
+import os
+import tempfile
+import yaml
+from unittest.mock import patch
+from crewai.utilities.string_utils import interpolate_only
+from crew_automation_content_editor_launcher.utils.content_archive import (_PERMUTATIONS, ContentArchive, minhash, shingles,
+                                                                          signature_similarity)
+from crew_automation_content_editor_launcher.utils.prompt_layout import PromptLayout
+
+TASKS_CONFIG = os.path.join(os.path.dirname(__file__), '..', 'src', 'crew_automation_content_editor_launcher',
+                            'config', 'tasks.yaml')
+
+RETIREMENT_POST = """# Planning for Retirement with Confidence
+
+Retirement planning starts with a clear picture of your goals, your time horizon and the income
+you will need. Siebert Financial has helped individual investors for over 50 years to build
+diversified portfolios, choose between IRA and 401(k) accounts and review their plans as markets
+and personal circumstances change. Start early, contribute regularly and rebalance once a year."""
+
+def inputs(content_request, brand_name='Siebert Financial', **extra):
+    return dict({'brand_name': brand_name, 'content_request': content_request, 'structure': 'Introduction, Benefits',
+                 'output_formats': 'markdown'}, **extra)
+
+class TestContentArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.archive = ContentArchive(os.path.join(self.tmp_dir.name, "archive.sqlite"))
+
+    def test_near_duplicate_requests_are_found(self):
+        retirement = self.archive.add(inputs("Create a blog post about retirement planning"), RETIREMENT_POST, "/out/1")
+        self.archive.add(inputs("A guide to mutual funds and how to choose them"), "Mutual funds pool money.", "/out/2")
+
+        matches = self.archive.find_similar_requests(inputs("Write a blog post about retirement planning"))
+        self.assertEqual([match.piece.id for match in matches], [retirement])
+        self.assertGreater(matches[0].similarity, 0.8)
+        self.assertEqual(matches[0].matched_on, "request")
+        self.assertEqual(matches[0].piece.content, RETIREMENT_POST)
+        self.assertEqual(matches[0].piece.output_dir, "/out/1")
+        self.assertEqual(self.archive.find_similar_requests(inputs("Explain exchange traded funds to beginners")), [])
+        self.assertEqual(self.archive.find_similar_requests(
+            inputs("Write a blog post about retirement planning", brand_name='Other Brand')), [])
+
+    def test_near_duplicate_content_is_found(self):
+        first = self.archive.add(inputs("Retirement planning post"), RETIREMENT_POST)
+        second = self.archive.add(inputs("Retirement post, second take"),
+                                  RETIREMENT_POST.replace("once a year", "at least once a year"))
+
+        matches = self.archive.find_similar_content(self.archive.get(second).content, exclude=second)
+        self.assertEqual([match.piece.id for match in matches], [first])
+        self.assertEqual(matches[0].matched_on, "content")
+        self.assertEqual(self.archive.find_similar_content("Mutual funds pool money from many investors."), [])
+
+    def test_signatures_estimate_similarity(self):
+        text = "Create a blog post about retirement planning"
+        self.assertEqual(minhash(text, "request"), minhash(text.upper(), "request"))
+        self.assertEqual(signature_similarity(minhash(text), minhash(text)), 1.0)
+        self.assertIsNone(minhash("  ...  "))
+
+    def test_estimates_follow_the_exact_jaccard_similarity(self):
+        self.assertGreater(len({b - a for a, b in _PERMUTATIONS}), 1)
+        revised = RETIREMENT_POST.replace("Start early, contribute regularly and rebalance once a year.",
+                                          "Review your beneficiaries and consolidate old workplace accounts.")
+        halved = " ".join(RETIREMENT_POST.split()[:45]) + " Mutual funds pool money from many investors into one portfolio."
+        for other in (RETIREMENT_POST, revised, halved, "Mutual funds pool money from many investors."):
+            first, second = shingles(RETIREMENT_POST), shingles(other)
+            exact = len(first & second) / len(first | second)
+            self.assertAlmostEqual(signature_similarity(minhash(RETIREMENT_POST), minhash(other)), exact, delta=0.12)
+
+    def test_kickoff_inputs_are_archived_without_derived_fields(self):
+        run_inputs = inputs("Retirement planning post", request_details="REQUEST DETAILS: ...",
+                            starting_draft=RETIREMENT_POST, output_dir="/out/3", word_limit=900)
+        piece = self.archive.get(self.archive.add(run_inputs, RETIREMENT_POST, "/out/3"))
+        self.assertEqual(piece.inputs, inputs("Retirement planning post", word_limit=900))
+
+    def test_starting_draft_is_handed_to_the_content_task_only(self):
+        with open(TASKS_CONFIG, encoding='utf-8') as f:
+            tasks = yaml.safe_load(f)
+        layout = PromptLayout(inputs("Write a blog post about retirement planning", starting_draft=RETIREMENT_POST))
+        with patch.object(PromptLayout, 'prompt_file', return_value='prompts.json'):
+            run_inputs = layout.apply(dict(layout.inputs))
+
+        for name, config in tasks.items():
+            description = interpolate_only(config['description'], run_inputs)
+            if name == 'content_creation_task':
+                self.assertTrue(description.endswith(f"{layout.request_block}{layout.draft_block}"))
+                self.assertIn("STARTING DRAFT", description)
+            else:
+                self.assertNotIn(RETIREMENT_POST, description)
+
+    def test_reused_piece_is_formatted_without_running_the_crew(self):
+        from crew_automation_content_editor_launcher.crew import CrewAutomationContentEditorLauncherCrew
+        piece = self.archive.get(self.archive.add(inputs("Retirement planning post"), RETIREMENT_POST))
+        output_dir = os.path.join(self.tmp_dir.name, "reused")
+
+        result = CrewAutomationContentEditorLauncherCrew().reuse_archived(
+            piece, inputs("Write a blog post about retirement planning", output_dir=output_dir,
+                          disclaimers="Investing involves risk."))
+        self.assertEqual(os.listdir(output_dir), ["content.md"])
+        self.assertIn("Retirement planning starts with a clear picture", result.raw)
+        self.assertIn("Investing involves risk.", result.raw)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import patch
+from crew_automation_content_editor_launcher.tools.content_formatter import ContentFormatterTool, DEFAULT_DISCLAIMER
+from crew_automation_content_editor_launcher.utils.csv_manager import CSVManager
+
+CONTENT = """## Saving for Retirement
+
+Start **early** and *stay* invested. Read [our guide](https://example.com/guide?a=1&b=2).
+
+- Open an IRA
+- Review <your> plan yearly
+
+---
+
+Investing involves risk."""
+
+class TestContentFormatter(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(CSVManager, "load_compliance_info",
+                               return_value={"sector": "FINANCE", "disclaimer_text": "Fees apply. Investing involves risk."})
+        self.load_compliance_info = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.formatter = ContentFormatterTool(disclaimers="Investing involves risk. Consult an advisor.")
+
+    def test_headers_follow_the_structure(self):
+        content = "First paragraph.\n\nSecond paragraph.\n\nThird paragraph."
+        formatted = self.formatter.format_document(content, structure="introduction:next_steps",
+                                                   include_disclaimers=False)
+
+        self.assertEqual(formatted, "## Introduction\n\nFirst paragraph.\n\nSecond paragraph.\n\n"
+                                    "## Next Steps\n\nThird paragraph.")
+        self.assertEqual(self.formatter.format_document(CONTENT, include_disclaimers=False), CONTENT)
+        self.assertEqual(self.formatter.format_document(content, add_headers=False, include_disclaimers=False), content)
+
+    def test_disclaimers_from_csv_and_inputs(self):
+        formatted = self.formatter.format_document(CONTENT)
+
+        self.assertTrue(formatted.startswith(CONTENT))
+        self.assertTrue(formatted.endswith("\n\n---\n\n*Disclaimer: Fees apply. Consult an advisor.*"))
+        self.assertEqual(formatted.count("Investing involves risk."), 1)
+
+    def test_default_disclaimer_is_the_fallback(self):
+        self.load_compliance_info.side_effect = FileNotFoundError("compliance_info.csv")
+        formatted = ContentFormatterTool().format_document("## Note\n\nPlain text.")
+
+        self.assertEqual(formatted, f"## Note\n\nPlain text.\n\n---\n\n*Disclaimer: {DEFAULT_DISCLAIMER}*")
+
+    def test_html_rendering(self):
+        rendered = self.formatter.format_document(CONTENT, output_format="html", include_disclaimers=False)
+
+        self.assertEqual(rendered.splitlines(), [
+            "<h2>Saving for Retirement</h2>",
+            '<p>Start <strong>early</strong> and <em>stay</em> invested. Read '
+            '<a href="https://example.com/guide?a=1&amp;b=2">our guide</a>.</p>',
+            "<ul>",
+            "<li>Open an IRA</li>",
+            "<li>Review &lt;your&gt; plan yearly</li>",
+            "</ul>",
+            "<hr>",
+            "<p>Investing involves risk.</p>",
+        ])
+        self.assertIn('href="https://example.com/x?q=&quot;a&quot;"',
+                      self.formatter._render_html('[x](https://example.com/x?q="a")'))
+
+    def test_text_rendering(self):
+        rendered = self.formatter.format_document(CONTENT, output_format="TEXT", include_disclaimers=False)
+
+        self.assertEqual(rendered, "SAVING FOR RETIREMENT\n\nStart early and stay invested. Read our guide "
+                                   "(https://example.com/guide?a=1&b=2).\n\n- Open an IRA\n- Review <your> plan yearly"
+                                   "\n\nInvesting involves risk.")
+
+    def test_unsupported_output_format(self):
+        with self.assertRaises(ValueError):
+            self.formatter.format_document(CONTENT, output_format="pdf")
+        self.assertTrue(self.formatter._run(CONTENT, output_format="pdf").startswith("Error formatting content"))
+
+if __name__ == '__main__':
+    unittest.main()
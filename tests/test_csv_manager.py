@@ -0,0 +1,89 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+from crew_automation_content_editor_launcher.utils.csv_manager import CSVManager, IndexedSheet
+
+class TestCSVManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.manager = CSVManager(self.tmp_dir.name)
+        self.write(self.manager.rag3_path, "sector,FINANCE\nregulation,MiFID II\n")
+
+    def write(self, path, text, mode='w'):
+        with open(path, mode, encoding='utf-8', newline='') as f:
+            f.write(text)
+
+    def append(self, text):
+        self.write(self.manager.rag3_path, text, 'a')
+
+    def sheet(self):
+        return CSVManager._cache[self.manager.rag3_path]
+
+    def test_malformed_rows_keep_extra_fields_in_the_value(self):
+        self.write(self.manager.rag1_path, "Area,Key Info\r\nBrand Name,Siebert Financial\r\n"
+                                           "Mutual Fund Types,Equity Funds, Bond Funds, Index Funds\r\n"
+                                           "Minimum Investment,$1,000 initial investment\r\n"
+                                           "Long Description,\"Founded in 1967,\nby Muriel Siebert\"\r\n")
+        self.assertEqual(self.manager.load_brand_info(), {
+            'Brand Name': 'Siebert Financial',
+            'Mutual Fund Types': 'Equity Funds, Bond Funds, Index Funds',
+            'Minimum Investment': '$1,000 initial investment',
+            'Long Description': 'Founded in 1967,\nby Muriel Siebert',
+        })
+
+    def test_appended_rows_are_parsed_incrementally(self):
+        self.assertEqual(self.manager.load_compliance_info(), {'regulation': 'MiFID II'})
+        self.assertEqual(self.sheet().rows, 1)
+
+        self.append("prohibited_content,Tax optimization schemes\nregulation,\"MiFID II, GDPR\"\n")
+        with patch.object(IndexedSheet, '_add', autospec=True, side_effect=IndexedSheet._add) as add:
+            data = self.manager.load_compliance_info()
+        self.assertEqual(add.call_count, 2)
+        self.assertEqual(data, {'regulation': 'MiFID II, GDPR', 'prohibited_content': 'Tax optimization schemes'})
+        self.assertEqual(self.sheet().rows, 3)
+        self.assertEqual(self.sheet().offset, os.path.getsize(self.manager.rag3_path))
+        self.assertEqual(self.sheet().refresh(), "cached")
+
+    def test_last_row_without_newline_is_read_again_when_completed(self):
+        self.write(self.manager.rag3_path, "sector,FINANCE\ncontact,compliance@siebert")
+        self.assertEqual(self.manager.load_compliance_info(), {'contact': 'compliance@siebert'})
+
+        self.append(".com\ndisclaimer_necessari,Past performance is not indicative of future results.")
+        self.assertEqual(self.sheet().refresh(), "appended")
+        self.assertEqual(self.manager.load_compliance_info(), {
+            'contact': 'compliance@siebert.com',
+            'disclaimer_necessari': 'Past performance is not indicative of future results.',
+        })
+        self.assertEqual(self.sheet().rows, 1)
+
+    def test_parsed_sheets_are_shared_until_mtime_or_size_change(self):
+        data = self.manager.load_compliance_info()
+        data['regulation'] = 'changed by the caller'
+
+        with patch.object(IndexedSheet, '_parse', autospec=True) as parse:
+            self.assertEqual(CSVManager(self.tmp_dir.name).load_compliance_info(), {'regulation': 'MiFID II'})
+        parse.assert_not_called()
+
+        # Same size, new modification time
+        self.write(self.manager.rag3_path, "sector,FINANCE\nregulation,MiFID IX\n")
+        os.utime(self.manager.rag3_path, ns=(1, 1))
+        self.assertEqual(CSVManager(self.tmp_dir.name).load_compliance_info(), {'regulation': 'MiFID IX'})
+        self.assertEqual(self.sheet().refresh(), "cached")
+
+    def test_in_place_edits_rebuild_the_sheet(self):
+        self.manager.load_compliance_info()
+        self.write(self.manager.rag3_path, "sector,FINANCE\nregulation,CRD IV!!\n")
+        os.utime(self.manager.rag3_path, ns=(1, 1))
+        self.assertEqual(self.sheet().refresh(), "rebuilt")
+        self.assertEqual(self.sheet().data, {'regulation': 'CRD IV!!'})
+
+        self.write(self.manager.rag3_path, "sector,FINANCE\nregulation,CRD IV\nrule,Plain language\n")
+        self.assertEqual(self.sheet().refresh(), "rebuilt")
+        self.write(self.manager.rag3_path, "sector,FINANCE\nregulation,CRD IV\n")
+        self.assertEqual(self.sheet().refresh(), "rebuilt")
+        self.assertEqual(self.manager.load_compliance_info(), {'regulation': 'CRD IV'})
+
+if __name__ == '__main__':
+    unittest.main()
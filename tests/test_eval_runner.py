@@ -0,0 +1,125 @@
+import unittest
+import json
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+from crew_automation_content_editor_launcher.crew import CrewAutomationContentEditorLauncherCrew
+from crew_automation_content_editor_launcher.utils.eval_runner import EvaluationRunner, _crew_reference, _earlier_feedback
+from crew_automation_content_editor_launcher.utils.logger import logger
+
+class StubCrew:
+    def crew(self):
+        return SimpleNamespace(name="stub")
+
+def scored_iteration(crew, inputs, iteration, iteration_dir):
+    time.sleep(0.3)
+    with open(os.path.join(inputs['output_dir'], 'content.md'), 'w') as f:
+        f.write(f"{inputs['content_request']} #{iteration}")
+    logger.log_info(f"Writing iteration {iteration}")
+    if iteration == inputs.get('failing_iteration'):
+        raise ValueError("evaluation LLM unavailable")
+    return {'scores': [float(iteration), 8.0], 'task_durations': [1.5, 2.5],
+            'task_agents': [["Writer"], ["Editor"]]}
+
+def feedback_iteration(crew, inputs, iteration, iteration_dir, feedback=None):
+    with open(os.path.join(inputs['output_dir'], 'feedback.json'), 'w') as f:
+        json.dump(feedback, f)
+    return {'training_data': {'Writer': {'human_feedback': f"note {iteration}"}}}
+
+def crew_iteration(crew, inputs, iteration, iteration_dir):
+    return {'task_agents': [[task.name, task.agent.role] for task in crew.tasks]}
+
+def deterministic(report):
+    return {key: value for key, value in report.items()
+            if key not in ('concurrency', 'wall_seconds', 'iteration_seconds', 'iterations')}
+
+class TestEvaluationRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.inputs = {'content_request': 'A guide to mutual funds'}
+
+    def runner(self, concurrency, name, inputs=None, n_iterations=4):
+        return EvaluationRunner(StubCrew, inputs or self.inputs, n_iterations, concurrency,
+                                output_dir=os.path.join(self.tmp_dir.name, name))
+
+    def run_scored(self, runner):
+        started = time.perf_counter()
+        results = runner.run(scored_iteration, [1, 2, 3, 4], 'test')
+        elapsed = time.perf_counter() - started
+        return runner._write_report('test', results, elapsed), elapsed
+
+    def test_parallel_report_matches_sequential(self):
+        sequential, sequential_seconds = self.run_scored(self.runner(1, "sequential"))
+        parallel, parallel_seconds = self.run_scored(self.runner(4, "parallel"))
+
+        self.assertEqual(deterministic(parallel), deterministic(sequential))
+        self.assertEqual([iteration['iteration'] for iteration in parallel['iterations']], [1, 2, 3, 4])
+        self.assertEqual(parallel['tasks'][0], {'task': 1, 'scores': [1.0, 2.0, 3.0, 4.0], 'average': 2.5})
+        self.assertEqual(parallel['crew']['scores'], [4.5, 5.0, 5.5, 6.0])
+        self.assertEqual(parallel['execution_seconds'], {'runs': [4.0] * 4, 'average': 4.0})
+        self.assertLess(parallel_seconds, sequential_seconds)
+        with open(os.path.join(self.tmp_dir.name, "parallel", "report.json")) as f:
+            self.assertEqual(json.load(f)['concurrency'], 4)
+
+    def test_iterations_have_isolated_output_and_logs(self):
+        report, _ = self.run_scored(self.runner(2, "isolated"))
+
+        for iteration in report['iterations']:
+            number = iteration['iteration']
+            self.assertEqual(iteration['output_dir'],
+                             os.path.join(self.tmp_dir.name, "isolated", f"iteration-{number}", "output"))
+            with open(os.path.join(iteration['output_dir'], 'content.md')) as f:
+                self.assertEqual(f.read(), f"A guide to mutual funds #{number}")
+            with open(iteration['log_file']) as f:
+                log = f.read()
+            self.assertIn(f"Writing iteration {number}", log)
+            self.assertEqual(log.count("Writing iteration"), 1)
+            self.assertGreater(iteration['seconds'], 0.25)
+        self.assertNotIn("isolated", logger.log_file)
+
+    def test_failed_iterations_are_reported(self):
+        runner = self.runner(2, "failing", dict(self.inputs, failing_iteration=2))
+        report, _ = self.run_scored(runner)
+
+        self.assertEqual(report['failed'], [2])
+        self.assertEqual(report['iterations'][1]['error'], "ValueError: evaluation LLM unavailable")
+        self.assertEqual(report['tasks'][0]['scores'], [1.0, 3.0, 4.0])
+        with self.assertRaisesRegex(RuntimeError, "1 of 4 test iterations failed"):
+            runner._raise_on_failure(report)
+
+    def test_sequential_training_passes_earlier_feedback_on(self):
+        runner = self.runner(1, "train", n_iterations=3)
+        results = runner.run(feedback_iteration, [0, 1, 2], 'train', prepare=_earlier_feedback)
+
+        seen = []
+        for result in results:
+            with open(os.path.join(result.output_dir, 'feedback.json')) as f:
+                seen.append(json.load(f))
+        self.assertEqual(seen, [{}, {'Writer': {'0': {'human_feedback': "note 0"}}},
+                                {'Writer': {'0': {'human_feedback': "note 0"}, '1': {'human_feedback': "note 1"}}}])
+
+    def test_real_crew_runs_in_worker_processes(self):
+        self.assertEqual(_crew_reference(CrewAutomationContentEditorLauncherCrew),
+                         "crew_automation_content_editor_launcher.crew:CrewAutomationContentEditorLauncherCrew")
+        runner = EvaluationRunner(CrewAutomationContentEditorLauncherCrew, {}, 2, 2,
+                                  output_dir=os.path.join(self.tmp_dir.name, "crew"))
+        environment = {"OPENAI_API_KEY": "sk-test", "CREWAI_DISABLE_TELEMETRY": "true", "OTEL_SDK_DISABLED": "true"}
+        with patch.dict(os.environ, environment):
+            results = runner.run(crew_iteration, [1, 2], 'test')
+
+        self.assertEqual([result.error for result in results], [None, None])
+        self.assertEqual(results[0].task_agents, results[1].task_agents)
+        self.assertIn(["initialization_task", "Process Coordinator"], results[0].task_agents)
+
+    def test_crew_classes_must_be_importable(self):
+        class LocalCrew(StubCrew):
+            pass
+
+        with self.assertRaises(ValueError):
+            EvaluationRunner(LocalCrew, self.inputs, 2, 2)
+
+if __name__ == '__main__':
+    unittest.main()
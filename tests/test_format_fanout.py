@@ -0,0 +1,84 @@
+import unittest
+import os
+from unittest.mock import patch
+import litellm
+from crewai import LLM, Agent
+from crew_automation_content_editor_launcher.utils.compliance_checker import ComplianceChecker
+from crew_automation_content_editor_launcher.utils.format_fanout import FormatFanout, parse_variants
+
+INPUTS = {
+    'brand_name': 'Siebert Financial',
+    'tone_of_voice': 'professional',
+    'avoid_terms': 'guaranteed returns, risk-free',
+    'disclaimers': 'Investing involves risk.',
+}
+
+DRAFT = "## Retirement Planning\n\nStart early and review your plan once a year. Investing involves risk."
+
+# The key/value sheet shipped in RAG/Rag 2, filled in for social media posts
+SHEET = {'tipocontenuto': 'Social Media Post, Newsletter', 'struttura': 'Hook, value, call to action',
+         'lunghezzaideale': 'Under 280 characters', 'elementinecessari': '', 'tonoconsigliato': 'Friendly'}
+
+ANSWERS = {
+    "Social Media Post": ["Plan early with Siebert Financial! Investing involves risk."],
+    "Video Script": ["Enjoy guaranteed returns with our plans.", "Plan early and review yearly. Investing involves risk."],
+    "Newsletter": ["A risk-free way to retire.", "Still risk-free, and guaranteed returns too."],
+}
+
+class TestFormatFanout(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(os.environ, {"CREWAI_DISABLE_TELEMETRY": "true", "OTEL_SDK_DISABLED": "true"})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.agent = Agent(role="Content Creation Specialist", goal="Write content", backstory="A copywriter",
+                           llm=LLM(model="gpt-4o-mini", api_key="sk-test"))
+        self.prompts = {variant: [] for variant in ANSWERS}
+
+    def completion(self, model, messages, **kwargs):
+        prompt = messages[-1]['content']
+        variant = next(variant for variant in ANSWERS if f"into a {variant} for" in prompt)
+        self.prompts[variant].append(prompt)
+        answer = ANSWERS[variant][len(self.prompts[variant]) - 1]
+        return litellm.ModelResponse(model=model, choices=[{"index": 0, "finish_reason": "stop", "message": {
+            "role": "assistant", "content": f"Thought: I now know the final answer\nFinal Answer: {answer}"}}],
+            usage={"prompt_tokens": 12, "completion_tokens": 4, "total_tokens": 16})
+
+    def test_guidelines_from_either_sheet_layout(self):
+        template = FormatFanout(self.agent, {'Social Media Post': 'Use emojis and hashtags strategically',
+                                             'Newsletter': float('nan')})
+        self.assertEqual(template.get_guidelines("social media post"), "Use emojis and hashtags strategically")
+        self.assertIsNone(template.get_guidelines("Newsletter"))
+
+        sheet = FormatFanout(self.agent, SHEET)
+        self.assertEqual(sheet.get_guidelines("Social Media Post"), "Structure: Hook, value, call to action; "
+                                                                   "Ideal length: Under 280 characters; Recommended tone: Friendly")
+        self.assertIsNone(sheet.get_guidelines("Video Script"))
+        shipped = {'tipocontenuto': '', 'struttura': '', 'lunghezzaideale': '', 'elementinecessari': '', 'tonoconsigliato': ''}
+        self.assertIsNone(FormatFanout(self.agent, shipped).get_guidelines("Social Media Post"))
+
+        task = sheet.build_task("Social Media Post", INPUTS)
+        self.assertEqual(task.name, "variant_social_media_post")
+        self.assertIn("Follow these Social Media Post best practices: Structure: Hook", task.description)
+        self.assertIn("Never use: guaranteed returns, risk-free.", task.description)
+        self.assertNotIn("best practices", sheet.build_task("Video Script", INPUTS).description)
+
+    def test_non_compliant_variants_are_regenerated_or_dropped(self):
+        fanout = FormatFanout(self.agent, SHEET, ComplianceChecker.from_inputs(INPUTS))
+        with patch("litellm.completion", self.completion):
+            results = fanout.generate(DRAFT, ["Social Media Post", "Video Script", "Newsletter"], INPUTS)
+
+        self.assertEqual(results, {"Social Media Post": ANSWERS["Social Media Post"][0],
+                                   "Video Script": ANSWERS["Video Script"][1]})
+        self.assertEqual(fanout.rejected, {"Newsletter": ["risk-free", "guaranteed returns"]})
+        self.assertEqual(len(self.prompts["Social Media Post"]), 1)
+        self.assertIn("Remove avoid term 'guaranteed returns'", self.prompts["Video Script"][1])
+        self.assertIn(DRAFT, self.prompts["Video Script"][0])
+
+    def test_parse_variants(self):
+        self.assertEqual(parse_variants("newsletter, Social Media Post, Podcast, NEWSLETTER"),
+                         ["Newsletter", "Social Media Post"])
+        self.assertEqual(parse_variants(""), [])
+        self.assertEqual(parse_variants(None), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import multiprocessing
+import os
+import tempfile
+import time
+from crew_automation_content_editor_launcher.utils.job_queue import JobWorker, SQLiteJobQueue
+
+def square(job):
+    time.sleep(0.01)
+    return {"value": job.payload["n"] ** 2, "pid": os.getpid()}
+
+def drain(db_path):
+    JobWorker(SQLiteJobQueue(db_path), square, poll_interval=0.05).run(exit_when_empty=True)
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "jobs.sqlite")
+        self.queue = SQLiteJobQueue(self.db_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_lease_and_ack(self):
+        job_id = self.queue.enqueue({"n": 3})
+        job = self.queue.lease("worker-1")
+
+        self.assertEqual(job.id, job_id)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNone(self.queue.lease("worker-2"))
+        self.assertTrue(self.queue.ack(job, {"value": 9}))
+        self.assertEqual(self.queue.get(job_id).result, {"value": 9})
+        self.assertEqual(self.queue.stats()["done"], 1)
+
+    def test_expired_lease_is_released_and_stale_ack_rejected(self):
+        job_id = self.queue.enqueue({"n": 2})
+        stale = self.queue.lease("worker-1", visibility_timeout=0.05)
+        time.sleep(0.1)
+        fresh = self.queue.lease("worker-2", visibility_timeout=60)
+
+        self.assertEqual(fresh.id, job_id)
+        self.assertEqual(fresh.attempts, 2)
+        self.assertFalse(self.queue.ack(stale, {"value": "stale"}))
+        self.assertTrue(self.queue.ack(fresh, {"value": 4}))
+        self.assertEqual(self.queue.get(job_id).result, {"value": 4})
+
+    def test_retries_then_dead_letter(self):
+        job_id = self.queue.enqueue({"n": 1}, max_attempts=2)
+
+        job = self.queue.lease("worker-1")
+        self.assertEqual(self.queue.nack(job, "boom", retry_delay=0), "queued")
+        job = self.queue.lease("worker-1")
+        self.assertEqual(self.queue.nack(job, "boom again", retry_delay=0), "dead")
+
+        self.assertIsNone(self.queue.lease("worker-1"))
+        self.assertEqual([job.id for job in self.queue.dead_letters()], [job_id])
+        self.assertTrue(self.queue.requeue(job_id))
+        self.assertEqual(self.queue.lease("worker-1").attempts, 1)
+
+    def test_worker_nacks_failures_and_keeps_lease_alive(self):
+        self.queue.retry_base_delay = 0
+        failing = self.queue.enqueue({"n": 1}, max_attempts=1)
+        slow = self.queue.enqueue({"n": 5})
+
+        def handler(job):
+            if job.id == failing:
+                raise ValueError("bad payload")
+            time.sleep(0.3)
+            return job.payload["n"]
+
+        JobWorker(self.queue, handler, visibility_timeout=0.15).run(exit_when_empty=True)
+
+        self.assertEqual(self.queue.get(failing).status, "dead")
+        self.assertIn("bad payload", self.queue.get(failing).error)
+        self.assertEqual(self.queue.get(slow).status, "done")
+        self.assertEqual(self.queue.get(slow).attempts, 1)
+
+    def test_processes_drain_queue_exactly_once(self):
+        job_ids = [self.queue.enqueue({"n": n}) for n in range(40)]
+        workers = [multiprocessing.Process(target=drain, args=(self.db_path,)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+
+        jobs = [self.queue.get(job_id) for job_id in job_ids]
+        self.assertEqual(self.queue.stats(), {"queued": 0, "leased": 0, "done": 40, "dead": 0})
+        self.assertEqual([job.result["value"] for job in jobs], [n ** 2 for n in range(40)])
+        self.assertTrue(all(job.attempts == 1 for job in jobs))
+        self.assertGreater(len({job.result["pid"] for job in jobs}), 1)
+
+if __name__ == '__main__':
+    unittest.main()
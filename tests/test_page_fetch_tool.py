@@ -0,0 +1,129 @@
+import unittest
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from crew_automation_content_editor_launcher.tools.page_fetch_tool import PageFetchTool
+
+ARTICLE_HTML = b"""<html><head><title>Retirement Planning Basics</title><script>var x = 1;</script></head>
+<body><nav><a href="/">Home</a> <a href="/about">About us and more links</a></nav>
+<article><h1>Retirement Planning Basics</h1>
+<p>Start saving early so that compound growth has decades to work for you.</p>
+<p>Diversify across asset classes to manage risk over the long term.</p></article>
+<footer>Copyright 2026 Example Media Group, all rights reserved.</footer></body></html>"""
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    in_flight = 0
+    max_in_flight = 0
+    etag_hits = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = FixtureHandler
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.2)
+                self._send(200, ARTICLE_HTML)
+            elif self.path == "/article":
+                self._send(200, ARTICLE_HTML)
+            elif self.path == "/etag":
+                cls.etag_hits += 1
+                if self.headers.get("If-None-Match") == '"v1"':
+                    self._send(304, b"", {"ETag": '"v1"'})
+                else:
+                    self._send(200, ARTICLE_HTML, {"ETag": '"v1"'})
+            elif self.path == "/big":
+                body = b"<html><body><article>" + b"<p>Filler sentence about mutual funds.</p>" * 50000 + b"</article></body></html>"
+                self._send(200, body)
+            else:
+                self._send(404, b"missing")
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestPageFetchTool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.tool = PageFetchTool(cache_dir=self.cache_dir.name)
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_extracts_main_text(self):
+        page = self.tool.fetch_pages([f"{self.base_url}/article"])[0]
+
+        self.assertEqual(page["title"], "Retirement Planning Basics")
+        self.assertIn("compound growth", page["text"])
+        self.assertNotIn("var x", page["text"])
+        self.assertNotIn("Copyright", page["text"])
+        self.assertNotIn("About us", page["text"])
+
+    def test_per_domain_limit(self):
+        FixtureHandler.max_in_flight = 0
+        self.tool.per_domain_limit = 1
+        pages = self.tool.fetch_pages([f"{self.base_url}/slow?{i}" for i in range(4)])
+
+        self.assertEqual(len(pages), 4)
+        self.assertEqual(FixtureHandler.max_in_flight, 1)
+
+    def test_byte_cap_and_token_budget(self):
+        self.tool.max_bytes = 10_000
+        page = self.tool.fetch_pages([f"{self.base_url}/big"])[0]
+        self.assertLess(len(page["text"]), 12_000)
+
+        result = self.tool._run(urls=[f"{self.base_url}/big"], max_tokens=50)
+        self.assertIn("[...]", result)
+        self.assertLess(len(result), 600)
+
+    def test_etag_cache_revalidation(self):
+        url = f"{self.base_url}/etag"
+        first = self.tool.fetch_pages([url])[0]
+        second = self.tool.fetch_pages([url])[0]
+
+        self.assertEqual(first["text"], second["text"])
+        self.assertEqual(second["fetched_at"], first["fetched_at"])
+
+    def test_errors_are_reported_per_page(self):
+        result = self.tool._run(urls=[f"{self.base_url}/article", f"{self.base_url}/missing"])
+
+        self.assertIn("Retirement Planning Basics", result)
+        self.assertIn("Could not read page: HTTP 404", result)
+
+    def test_malformed_urls_fail_only_their_own_page(self):
+        urls = [f"{self.base_url}/article", "http://[::1", "http://exa\x00mple.com/", f"{self.base_url}/slow"]
+        pages = self.tool.fetch_pages(urls)
+
+        self.assertEqual([page["url"] for page in pages], urls)
+        self.assertEqual([bool(page.get("error")) for page in pages], [False, True, True, False])
+        self.assertIn("Invalid IPv6 URL", pages[1]["error"])
+        self.assertIn("Could not read page", self.tool._run(urls=["http://[::1"]))
+
+if __name__ == '__main__':
+    unittest.main()
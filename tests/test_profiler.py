@@ -0,0 +1,89 @@
+import unittest
+import os
+import pstats
+import tempfile
+import tracemalloc
+from types import SimpleNamespace
+from unittest.mock import patch
+from crew_automation_content_editor_launcher.tools.base_tool import ContentCrewTool
+from crew_automation_content_editor_launcher.utils.compliance_checker import split_sentences
+from crew_automation_content_editor_launcher.utils.profiler import RunProfiler, code_origin
+
+class WordCountTool(ContentCrewTool):
+    name: str = "Word Count Tool"
+    description: str = "Counts words."
+
+    def _run(self, text: str) -> str:
+        words = [word.lower() for word in text.split() * 200]
+        return str(len(words))
+
+def task_event(name):
+    return SimpleNamespace(task=SimpleNamespace(name=name, description=name))
+
+class TestRunProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.profiler = RunProfiler(top_n=10)
+        self.profiler._installed = True
+        patcher = patch("crew_automation_content_editor_launcher.tools.base_tool.profiler", self.profiler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_task(self, name):
+        self.profiler._on_task_started(None, task_event(name))
+        text = "Siebert offers advisory services. Investing involves risk. " * 50
+        sentences = [split_sentences(text) for _ in range(20)]
+        WordCountTool()._run(text)
+        self.profiler._on_task_finished(None, task_event(name))
+        return sentences
+
+    def test_writes_task_and_tool_profiles_and_summary(self):
+        with self.profiler.session(self.tmp_dir.name):
+            self.run_task("content_creation_task")
+
+        files = set(os.listdir(self.tmp_dir.name))
+        self.assertTrue({"content_creation_task.prof", "tool-Word_Count_Tool.prof", "run.prof",
+                         "content_creation_task.alloc.txt", "run.alloc.txt", "summary.txt"} <= files)
+
+        task_functions = {key[2] for key in pstats.Stats(os.path.join(self.tmp_dir.name, "content_creation_task.prof")).stats}
+        tool_functions = {key[2] for key in pstats.Stats(os.path.join(self.tmp_dir.name, "tool-Word_Count_Tool.prof")).stats}
+        self.assertIn("split_sentences", task_functions)
+        self.assertIn("_run", tool_functions)
+        self.assertNotIn("_run", task_functions)
+
+        with open(os.path.join(self.tmp_dir.name, "summary.txt"), encoding="utf-8") as f:
+            summary = f.read()
+        self.assertIn("Hottest local functions by self time", summary)
+        self.assertIn("compliance_checker.py", summary)
+        self.assertIn("local", summary)
+        self.assertEqual(self.profiler.segments["tool-Word_Count_Tool"].calls, 1)
+        self.assertGreater(self.profiler.segments["content_creation_task"].peak_bytes, 0)
+
+    def test_cpu_and_memory_toggle_separately(self):
+        cpu_dir = os.path.join(self.tmp_dir.name, "cpu")
+        with self.profiler.session(cpu_dir, cpu=True, memory=False):
+            self.run_task("revision_task")
+        self.assertIn("revision_task.prof", os.listdir(cpu_dir))
+        self.assertFalse(any(name.endswith(".alloc.txt") for name in os.listdir(cpu_dir)))
+
+        memory_dir = os.path.join(self.tmp_dir.name, "memory")
+        with self.profiler.session(memory_dir, cpu=False, memory=True):
+            self.run_task("revision_task")
+        self.assertIn("revision_task.alloc.txt", os.listdir(memory_dir))
+        self.assertFalse(any(name.endswith(".prof") for name in os.listdir(memory_dir)))
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_no_op_outside_a_session(self):
+        self.assertEqual(WordCountTool()._run("one two"), "400")
+        self.assertEqual(self.profiler.segments, {})
+        self.assertIsNone(self.profiler.stop())
+
+    def test_code_origin(self):
+        self.assertEqual(code_origin(split_sentences.__code__.co_filename), "local")
+        self.assertEqual(code_origin(pstats.__file__), "stdlib")
+        self.assertEqual(code_origin("/venv/lib/python3.11/site-packages/crewai/task.py"), "crewai")
+        self.assertEqual(code_origin("~"), "builtins")
+
+if __name__ == '__main__':
+    unittest.main()
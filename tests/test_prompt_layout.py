@@ -0,0 +1,102 @@
+import unittest
+import os
+import tempfile
+import yaml
+from types import SimpleNamespace
+from unittest.mock import patch
+from crewai.utilities.i18n import I18N
+from crewai.utilities.prompts import Prompts
+from crewai.utilities.string_utils import interpolate_only
+from crewai.types.usage_metrics import UsageMetrics
+from crew_automation_content_editor_launcher.utils.prompt_layout import (
+    PromptLayout, prompt_cache_llm, prompt_cache_report,
+)
+
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', 'src', 'crew_automation_content_editor_launcher', 'config')
+
+def brand_inputs(content_request, structure="Introduction, Benefits, Call to Action"):
+    return {
+        'brand_name': 'Siebert Financial',
+        'tone_of_voice': 'Professional,  trustworthy\nand approachable',
+        'primary_target': 'Individual investors',
+        'unique_selling_points': 'Over 50 years of experience',
+        'avoid_terms': 'guaranteed returns, risk-free',
+        'disclaimers': 'Investment advisory services involve risk.',
+        'content_request': content_request,
+        'structure': structure,
+        'ideal_length': '800-1200 words',
+        'required_elements': 'Company history',
+        'brand_info_csv': '/data/RAG/Rag 1/brand_info.csv',
+    }
+
+BRAND_INFO = {'Brand Name': 'Siebert Financial', 'Tone of Voice': 'Clear {and} direct', 'Website Link': float('nan')}
+
+class TestPromptLayout(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        # apply() writes its prompt file to the default cache directory
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        patcher = patch.dict(os.environ, {'CONTENT_CREW_CACHE_DIR': cache_dir.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.first = PromptLayout(brand_inputs("A blog post about retirement planning"), BRAND_INFO)
+        self.second = PromptLayout(brand_inputs("A guide to mutual funds", "Introduction, Types, Conclusion"), BRAND_INFO)
+
+    def test_static_block_is_identical_across_requests(self):
+        self.assertEqual(self.first.static_block, self.second.static_block)
+        self.assertEqual(self.first.fingerprint, self.second.fingerprint)
+        self.assertIn("- Tone of voice: Professional, trustworthy and approachable", self.first.static_block)
+        self.assertIn("- Tone of Voice: Clear (and) direct", self.first.static_block)
+        self.assertNotIn("Website Link", self.first.static_block)
+        self.assertNotIn("retirement", self.first.static_block)
+        self.assertIn("- Content request: A blog post about retirement planning", self.first.request_block)
+        self.assertNotEqual(self.first.request_block, self.second.request_block)
+
+    def test_agent_system_prompts_share_the_brand_prefix(self):
+        with open(os.path.join(CONFIG_DIR, 'agents.yaml'), encoding='utf-8') as f:
+            agents = yaml.safe_load(f)
+
+        def system_prompt(layout, name):
+            inputs = layout.apply(dict(layout.inputs))
+            agent = SimpleNamespace(**{key: interpolate_only(agents[name][key], inputs)
+                                       for key in ('role', 'goal', 'backstory')})
+            i18n = I18N(prompt_file=layout.prompt_file(self.tmp_dir.name))
+            return Prompts(i18n=i18n, has_tools=True, use_system_prompt=True, agent=agent).task_execution()['system']
+
+        for name in agents:
+            with self.subTest(agent=name):
+                prompt = system_prompt(self.first, name)
+                self.assertTrue(prompt.startswith(self.first.static_block + "\n\nYou are "))
+                self.assertEqual(prompt, system_prompt(self.second, name))
+        self.assertEqual(os.listdir(self.tmp_dir.name), [f"{self.first.fingerprint}.json"])
+
+    def test_task_descriptions_end_with_request_details(self):
+        with open(os.path.join(CONFIG_DIR, 'tasks.yaml'), encoding='utf-8') as f:
+            tasks = yaml.safe_load(f)
+        first_inputs = self.first.apply(dict(self.first.inputs))
+        second_inputs = self.second.apply(dict(self.second.inputs))
+
+        for name, config in tasks.items():
+            with self.subTest(task=name):
+                first = interpolate_only(config['description'], first_inputs)
+                second = interpolate_only(config['description'], second_inputs)
+                self.assertTrue(first.endswith(self.first.request_block))
+                self.assertEqual(first[:-len(self.first.request_block)], second[:-len(self.second.request_block)])
+
+    def test_prompt_cache_report(self):
+        usage = UsageMetrics(prompt_tokens=4000, cached_prompt_tokens=3000)
+        self.assertEqual(prompt_cache_report(usage),
+                         {'prompt_tokens': 4000, 'cached_prompt_tokens': 3000, 'cached_ratio': 0.75})
+        self.assertEqual(prompt_cache_report(None)['cached_ratio'], 0.0)
+
+    def test_cache_marks_only_for_explicit_cache_providers(self):
+        with patch.dict(os.environ, {'MODEL': 'gpt-4o-mini'}):
+            self.assertIsNone(prompt_cache_llm())
+        llm = prompt_cache_llm('anthropic/claude-3-5-sonnet-latest')
+        self.assertEqual(llm.additional_params['cache_control_injection_points'],
+                         [{"location": "message", "role": "system"}])
+
+if __name__ == '__main__':
+    unittest.main()
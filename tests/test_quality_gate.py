@@ -0,0 +1,141 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+import litellm
+from crew_automation_content_editor_launcher.utils.compliance_checker import ComplianceChecker
+from crew_automation_content_editor_launcher.utils.content_archive import ContentArchive
+from crew_automation_content_editor_launcher.utils.csv_manager import CSVManager
+from crew_automation_content_editor_launcher.utils.quality_gate import QualityGate
+
+INPUTS = {
+    'brand_name': 'Siebert Financial',
+    'content_request': 'A blog post about retirement planning',
+    'structure': 'Introduction, Benefits',
+    'ideal_length': '60-200 words',
+    'keywords': 'retirement planning',
+    'avoid_terms': 'guaranteed returns',
+    'disclaimers': 'Investing involves risk.',
+    'output_formats': 'markdown',
+}
+
+# Further brand and request fields the task prompts reference, left blank for the crew runs
+CREW_INPUTS = dict(INPUTS, **{key: '' for key in (
+    'primary_target', 'secondary_target', 'tone_of_voice', 'unique_selling_points', 'brand_colors', 'required_elements',
+    'mandatory_elements', 'forbidden_elements', 'brand_info_csv', 'best_practices_csv', 'compliance_info_csv')})
+
+PASSING_DRAFT = """## Introduction
+
+Retirement planning starts with a clear goal. You decide when you want to stop work and how much
+you will need each year. Then you look at what you have saved so far and what you can add.
+
+## Benefits
+
+A plan gives you calm. You know what to save each month, and you can check your progress once a
+year. Small steps made early grow over time, and you can change the plan when your life changes.
+Investing involves risk."""
+
+def completion_returning(answer, calls):
+    def completion(model, messages, **kwargs):
+        calls.append(messages)
+        return litellm.ModelResponse(model=model, choices=[{"index": 0, "finish_reason": "stop", "message": {
+            "role": "assistant", "content": f"Thought: I now know the final answer\nFinal Answer: {answer}"}}],
+            usage={"prompt_tokens": 12, "completion_tokens": 4, "total_tokens": 16})
+    return completion
+
+class TestQualityGate(unittest.TestCase):
+    def setUp(self):
+        self.gate = QualityGate.from_inputs(INPUTS, ComplianceChecker.from_inputs(INPUTS))
+
+    def test_compliant_draft_passes(self):
+        report = self.gate.evaluate(PASSING_DRAFT)
+
+        self.assertEqual(report.failures, [])
+        self.assertTrue(report.compliance.passed)
+        self.assertTrue(report.passed)
+        self.assertTrue(60 <= report.word_count <= 200)
+
+    def test_word_count(self):
+        report = self.gate.evaluate(PASSING_DRAFT.replace("A plan gives you calm.", "A plan gives you calm. " * 40))
+
+        self.assertEqual(report.failures, [f"Length is {report.word_count} words, expected 60-200"])
+        self.assertGreater(report.word_count, 200)
+        self.assertFalse(report.passed)
+
+    def test_missing_sections(self):
+        report = self.gate.evaluate(PASSING_DRAFT.replace("## Benefits", "**Why it helps**"))
+
+        self.assertEqual(report.missing_sections, ['Benefits'])
+        self.assertEqual(report.failures, ["Missing sections: Benefits"])
+
+    def test_keyword_density(self):
+        stuffed = PASSING_DRAFT.replace("A plan gives you calm.", "Retirement planning, retirement planning!")
+        report = self.gate.evaluate(stuffed)
+
+        self.assertGreater(report.keyword_density['retirement planning'], 0.03)
+        self.assertEqual(len(report.failures), 1)
+        self.assertIn("Keyword 'retirement planning' density", report.failures[0])
+        self.assertLess(self.gate.evaluate(PASSING_DRAFT).keyword_density['retirement planning'], 0.03)
+
+    def test_reading_ease(self):
+        dense = PASSING_DRAFT.replace(
+            "A plan gives you calm.",
+            "Comprehensive institutional diversification methodologies necessitate considerable "
+            "administrative documentation, professional consultation, regulatory verification, "
+            "organizational accountability and individualized actuarial evaluation of accumulated "
+            "retirement liabilities")
+        report = self.gate.evaluate(dense.replace(".", ",").replace("risk,", "risk."))
+
+        self.assertLess(report.flesch_reading_ease, 30)
+        self.assertEqual(len(report.failures), 1)
+        self.assertIn("Flesch reading ease", report.failures[0])
+
+    def test_compliance(self):
+        report = self.gate.evaluate(PASSING_DRAFT.replace("A plan gives you calm.", "A plan offers guaranteed returns.")
+                                    .replace("Investing involves risk.", ""))
+
+        self.assertEqual(report.failures, [])
+        self.assertEqual([violation.match for violation in report.compliance.violations], ['guaranteed returns'])
+        self.assertEqual(report.compliance.missing_disclaimers, ['Investing involves risk.'])
+        self.assertFalse(report.passed)
+        self.assertIn("Add missing disclaimer text", report.to_prompt())
+
+class TestQualityGateInCrew(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        archive = ContentArchive(os.path.join(self.tmp_dir.name, "archive.sqlite"))
+        for patcher in (patch.dict(os.environ, {
+                            "CONTENT_CREW_CACHE_DIR": self.tmp_dir.name, "OPENAI_API_KEY": "sk-test",
+                            "CREWAI_DISABLE_TELEMETRY": "true", "OTEL_SDK_DISABLED": "true"}),
+                        patch("crew_automation_content_editor_launcher.crew.content_archive", return_value=archive),
+                        patch.object(CSVManager, "load_compliance_info", return_value={}),
+                        patch.object(CSVManager, "load_brand_info", return_value={})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def kickoff(self, answer):
+        from crew_automation_content_editor_launcher.crew import CrewAutomationContentEditorLauncherCrew
+        calls = []
+        inputs = dict(CREW_INPUTS, output_dir=os.path.join(self.tmp_dir.name, "output"))
+        with patch("litellm.completion", completion_returning(answer, calls)):
+            result = CrewAutomationContentEditorLauncherCrew().crew().kickoff(inputs=inputs)
+        return result, calls
+
+    def test_passing_draft_skips_revision_and_finalization(self):
+        result, calls = self.kickoff(PASSING_DRAFT)
+
+        self.assertEqual(len(calls), 4)
+        self.assertEqual([output.raw for output in result.tasks_output[-2:]], ["", ""])
+        self.assertEqual(result.tasks_output[3].raw, PASSING_DRAFT)
+        self.assertIn(PASSING_DRAFT, result.raw)
+
+    def test_failing_draft_is_revised_and_finalized(self):
+        short_draft = "## Introduction\n\nRetirement planning is simple.\n\n## Benefits\n\nInvesting involves risk."
+        result, calls = self.kickoff(short_draft)
+
+        self.assertEqual(len(calls), 6)
+        self.assertEqual(result.tasks_output[-1].raw, short_draft)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import multiprocessing
+import os
+import tempfile
+import time
+from unittest.mock import patch, Mock
+from crew_automation_content_editor_launcher.utils.rate_limiter import RateLimiter, QuotaExceededError
+from crew_automation_content_editor_launcher.tools.web_search_tool import WebSearchTool
+
+def acquire_tokens(db_path, count, queue):
+    limiter = RateLimiter("shared", rate=20, burst=1, db_path=db_path)
+    for _ in range(count):
+        limiter.acquire()
+        queue.put(time.time())
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "limits.sqlite")
+        # Keep the search cache out of the working directory
+        patcher = patch.dict(os.environ, {"CONTENT_CREW_CACHE_DIR": self.tmp_dir.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_rate_is_shared_across_processes(self):
+        RateLimiter("shared", rate=20, burst=1, db_path=self.db_path)
+        queue = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=acquire_tokens, args=(self.db_path, 5, queue)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+        stamps = sorted(queue.get(timeout=5) for _ in range(15))
+
+        # 15 requests at 20/s with a burst of 1 cannot complete in less than 14 intervals
+        self.assertGreaterEqual(stamps[-1] - stamps[0], 14 / 20 * 0.9)
+        self.assertEqual(RateLimiter("shared", rate=20, db_path=self.db_path).usage(), 15)
+
+    def test_waits_instead_of_failing(self):
+        limiter = RateLimiter("serper", rate=10, burst=2, db_path=self.db_path)
+        self.assertEqual(limiter.acquire(), 0)
+        self.assertEqual(limiter.acquire(), 0)
+        self.assertGreater(limiter.acquire(), 0.05)
+        with self.assertRaises(TimeoutError):
+            limiter.acquire(timeout=0.01)
+
+    def test_daily_quota(self):
+        limiter = RateLimiter("serper", rate=100, burst=10, daily_quota=2, db_path=self.db_path)
+        limiter.acquire()
+        limiter.acquire()
+        with self.assertRaises(QuotaExceededError):
+            limiter.acquire()
+        self.assertEqual(limiter.usage(), 2)
+
+    def test_pause_holds_back_other_limiters(self):
+        RateLimiter("serper", rate=100, db_path=self.db_path).pause(0.2)
+        started = time.monotonic()
+        RateLimiter("serper", rate=100, db_path=self.db_path).acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+
+    @patch('requests.request')
+    def test_search_requeues_rate_limited_requests(self, mock_request):
+        limited = Mock(status_code=429, headers={"Retry-After": "0"})
+        ok = Mock(status_code=200, headers={})
+        ok.json.return_value = {'organic': [{'title': 'Result', 'link': 'https://example.com'}]}
+        mock_request.side_effect = [limited, ok]
+
+        limiter = RateLimiter("serper", rate=100, db_path=self.db_path)
+        with patch.object(limiter, "pause", wraps=limiter.pause) as pause:
+            result = WebSearchTool(api_key="test", rate_limiter=limiter, use_corpus=False)._run("test query", 1)
+
+        pause.assert_called_once_with(1.0)
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertIn("Result", result)
+        self.assertEqual(limiter.usage(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import os
+import sqlite3
+import tempfile
+import time
+from unittest.mock import Mock, patch
+from crew_automation_content_editor_launcher.tools.web_search_tool import WebSearchTool
+from crew_automation_content_editor_launcher.utils.rate_limiter import RateLimiter
+from crew_automation_content_editor_launcher.utils.research_corpus import ResearchCorpus, normalize_url
+
+def serper_results(*results):
+    return {"organic": [{"title": title, "link": link, "snippet": snippet} for title, link, snippet in results]}
+
+RETIREMENT = serper_results(
+    ("Retirement planning basics", "https://example.com/retirement", "How to start planning for retirement early."),
+    ("IRA or 401(k)?", "https://example.org/ira-vs-401k", "Comparing retirement accounts for individual investors."),
+    ("Retirement income strategies", "https://example.net/income", "Turning retirement savings into steady income."),
+)
+
+class TestResearchCorpus(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.db_path = os.path.join(self.tmp_dir.name, "corpus.sqlite")
+        self.corpus = ResearchCorpus(self.db_path)
+
+    def age_documents(self, days):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("UPDATE documents SET fetched_at = fetched_at - ?", (days * 86400,))
+            conn.execute("UPDATE queries SET fetched_at = fetched_at - ?", (days * 86400,))
+
+    def test_repeated_query_is_covered(self):
+        self.corpus.add_search_results("Retirement planning", RETIREMENT, 3)
+
+        documents = self.corpus.lookup("  retirement PLANNING ", 3)
+        self.assertEqual([document.url for document in documents],
+                         ["https://example.com/retirement", "https://example.org/ira-vs-401k", "https://example.net/income"])
+        self.assertEqual(len(self.corpus.lookup("retirement planning", 2)), 2)
+
+    def test_full_text_coverage_needs_enough_matching_documents(self):
+        self.corpus.add_search_results("Retirement planning", RETIREMENT, 3)
+
+        documents = self.corpus.lookup("retirement accounts", 1)
+        self.assertEqual([document.url for document in documents], ["https://example.org/ira-vs-401k"])
+        self.assertEqual(len(self.corpus.lookup("planning for retirement", 1)), 1)
+        self.assertIsNone(self.corpus.lookup("retirement", 5))
+        self.assertIsNone(self.corpus.lookup("mutual funds", 1))
+
+    def test_documents_are_deduplicated(self):
+        self.corpus.add_search_results("retirement", RETIREMENT, 3)
+        self.corpus.add_search_results("retirement savings", serper_results(
+            ("Retirement planning basics (updated)", "https://www.example.com/retirement/?utm_source=news#top",
+             "How to start planning for retirement early."),
+            ("IRA or 401(k)?", "https://amp.example.org/ira-vs-401k", "Comparing retirement accounts for individual investors."),
+        ), 2)
+
+        self.assertEqual(self.corpus.stats(), {"documents": 3, "fresh_documents": 3, "queries": 2})
+        documents = self.corpus.lookup("retirement savings", 2)
+        self.assertEqual(documents[0].title, "Retirement planning basics (updated)")
+        self.assertEqual(documents[1].url, "https://example.org/ira-vs-401k")
+        self.assertEqual(normalize_url("HTTPS://WWW.Example.com/a/?b=1&utm_medium=x"), "https://example.com/a?b=1")
+
+    def test_stale_documents_do_not_cover_a_topic(self):
+        self.corpus.add_search_results("Retirement planning", RETIREMENT, 3)
+        self.age_documents(30)
+
+        self.assertIsNone(self.corpus.lookup("retirement planning", 3))
+        self.assertIsNone(self.corpus.lookup("retirement accounts", 1))
+        self.assertEqual(self.corpus.stats()["fresh_documents"], 0)
+
+    @patch('requests.request')
+    def test_web_search_queries_corpus_before_serper(self, mock_request):
+        ok = Mock(status_code=200, headers={})
+        ok.json.return_value = RETIREMENT
+        mock_request.return_value = ok
+        limiter = RateLimiter("serper", rate=100, db_path=os.path.join(self.tmp_dir.name, "limits.sqlite"))
+        tool = WebSearchTool(api_key="test", rate_limiter=limiter, hedge_delay=0, corpus=self.corpus,
+                             cache_dir=os.path.join(self.tmp_dir.name, "search"))
+
+        live = tool._run("retirement planning", 3)
+        cached = tool._run("Retirement planning", 3)
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertIn("From the local research corpus", cached)
+        self.assertNotIn("From the local research corpus", live)
+        self.assertIn("IRA or 401(k)?", cached)
+        self.assertEqual(tool.search_links("retirement income", 1), ["https://example.net/income"])
+        self.assertEqual(mock_request.call_count, 1)
+
+        self.age_documents(30)
+        tool._run("retirement planning", 3)
+        self.assertEqual(mock_request.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
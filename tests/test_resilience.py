@@ -0,0 +1,175 @@
+import unittest
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from crew_automation_content_editor_launcher.tools.web_search_tool import WebSearchTool
+from crew_automation_content_editor_launcher.utils.rate_limiter import RateLimiter
+from crew_automation_content_editor_launcher.utils.resilience import CircuitBreaker, LatencyHistogram, hedged_call
+
+class StubSerperHandler(BaseHTTPRequestHandler):
+    """Serper stand-in; the query selects the injected behaviour."""
+    requests_seen = []
+    failing = True
+    lock = threading.Lock()
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        query = payload["q"]
+        with self.lock:
+            self.requests_seen.append(query)
+            attempt = self.requests_seen.count(query)
+
+        if query.startswith("slow-first") and attempt == 1:
+            time.sleep(1.0)
+        elif query.startswith("hang"):
+            time.sleep(1.0)
+        elif query.startswith("error") and StubSerperHandler.failing:
+            self._send(500, {"message": "upstream error"})
+            return
+        elif query.startswith("empty"):
+            self._send(200, {"organic": []})
+            return
+
+        self._send(200, {"organic": [{"title": f"Result for {query} (attempt {attempt})", "link": "https://example.com"}]})
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except OSError:
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+class TestResilience(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubSerperHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubSerperHandler.requests_seen = []
+        StubSerperHandler.failing = True
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.breaker = CircuitBreaker("serper-test", min_calls=2, window=4, reset_timeout=60)
+        self.latency = LatencyHistogram("serper-test")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_tool(self, **kwargs):
+        limiter = RateLimiter("serper", rate=1000, db_path=os.path.join(self.tmp_dir.name, "limits.sqlite"))
+        options = dict(api_key="test", base_url=self.base_url, timeout=5, hedge_delay=0.1,
+                       cache_dir=os.path.join(self.tmp_dir.name, "search"), rate_limiter=limiter,
+                       circuit_breaker=self.breaker, latency=self.latency, use_corpus=False)
+        options.update(kwargs)
+        return WebSearchTool(**options)
+
+    def test_hedged_request_takes_first_response(self):
+        started = time.monotonic()
+        result = self.make_tool()._run("slow-first query", 1)
+
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertIn("(attempt 2)", result)
+        self.assertEqual(StubSerperHandler.requests_seen.count("slow-first query"), 2)
+
+    def test_timeout_returns_error(self):
+        started = time.monotonic()
+        result = self.make_tool(timeout=0.2, hedge_delay=0)._run("hang query", 1)
+
+        self.assertIn("Error searching the web", result)
+        # Three timed-out attempts plus backoff jitter, far below the 1s the server would hang per attempt
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_circuit_breaker_falls_back_to_cache(self):
+        StubSerperHandler.failing = False
+        tool = self.make_tool()
+        self.assertIn("Result for error query", tool._run("error query", 1))
+
+        StubSerperHandler.failing = True
+        # Failing calls are answered from the cache and trip the breaker
+        self.assertIn("Result for error query", tool._run("error query", 1))
+        self.assertEqual(self.breaker.state, "open")
+
+        seen = len(StubSerperHandler.requests_seen)
+        self.assertIn("Result for error query", tool._run("error query", 1))
+        self.assertEqual(len(StubSerperHandler.requests_seen), seen)
+
+        # Without cached results the open breaker fails fast
+        result = tool._run("uncached query", 1)
+        self.assertIn("circuit breaker is open", result)
+        self.assertEqual(len(StubSerperHandler.requests_seen), seen)
+
+    def test_empty_results_are_not_cached(self):
+        tool = self.make_tool()
+        tool._run("empty query", 1)
+        self.assertIsNone(tool._read_cached_search("empty query", 1))
+
+    def test_half_open_trial_closes_breaker(self):
+        breaker = CircuitBreaker("trial", min_calls=1, reset_timeout=0.05)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_trial_ending_without_a_result_frees_the_half_open_slot(self):
+        self.breaker = CircuitBreaker("trial", min_calls=1, reset_timeout=0.05)
+        limiter = RateLimiter("quota", rate=1000, daily_quota=1, db_path=os.path.join(self.tmp_dir.name, "quota.sqlite"))
+        limiter.acquire()
+        tool = self.make_tool(rate_limiter=limiter)
+        self.breaker.record_failure()
+        time.sleep(0.06)
+
+        # The trial call fails on the exhausted quota before it reaches Serper
+        self.assertIn("Daily quota", tool._run("quota query", 1))
+        self.assertEqual(StubSerperHandler.requests_seen, [])
+        self.assertEqual(self.breaker.state, "half_open")
+        self.assertTrue(self.breaker.allow())
+
+    def test_hedged_call_ignores_failed_attempt(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.1)
+                raise RuntimeError("first attempt failed")
+            time.sleep(0.3)
+            return "ok"
+
+        self.assertEqual(hedged_call(flaky, 0.05), "ok")
+        with self.assertRaises(RuntimeError):
+            hedged_call(lambda: (_ for _ in ()).throw(RuntimeError("boom")), 0.05)
+
+    def test_histogram_snapshot(self):
+        histogram = LatencyHistogram("test")
+        for value in (0.01, 0.2, 0.3, 4.0):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+
+        self.assertEqual(snapshot["count"], 4)
+        self.assertEqual(snapshot["buckets"]["0.05"], 1)
+        self.assertEqual(snapshot["buckets"]["0.25"], 1)
+        self.assertEqual(snapshot["buckets"]["5.0"], 1)
+        self.assertEqual(snapshot["p99"], 4.0)
+        self.assertIsNone(histogram.percentile(95, min_samples=20))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from crewai import Agent, Task
+from crewai.events.event_bus import crewai_event_bus
+from crewai.events.types.agent_events import AgentExecutionCompletedEvent, AgentExecutionStartedEvent
+from crew_automation_content_editor_launcher.tools.base_tool import ContentCrewTool
+from crew_automation_content_editor_launcher.utils.run_budget import RunBudget
+
+class CountingTool(ContentCrewTool):
+    name: str = "Counting Tool"
+    description: str = "Counts its calls."
+    calls: int = 0
+
+    def _run(self, csv_file: str, query: str) -> str:
+        self.calls += 1
+        return f"result {self.calls} for {query} in {csv_file}"
+
+class TestRunBudget(unittest.TestCase):
+    def setUp(self):
+        self.budget = RunBudget()
+        patcher = patch("crew_automation_content_editor_launcher.tools.base_tool.run_budget", self.budget)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.budget.leave)
+        self.tool = CountingTool()
+
+    def test_calls_outside_an_agent_run_unchanged(self):
+        self.tool._run("brand_info", "retirement planning")
+        self.tool._run("brand_info", "retirement planning")
+        self.assertEqual(self.tool.calls, 2)
+
+    def test_near_identical_calls_answered_from_previous_result(self):
+        self.budget.reset()
+        self.budget.enter("Content Creation Specialist", "content_creation_task")
+
+        first = self.tool._run("brand_info", "retirement planning services")
+        repeat = self.tool._run("brand_info", "Retirement planning service")
+        other_file = self.tool._run("best_practices", "retirement planning services")
+
+        self.assertEqual(self.tool.calls, 2)
+        self.assertTrue(repeat.startswith(first))
+        self.assertIn("repeats an earlier Counting Tool call", repeat)
+        self.assertIn("best_practices", other_file)
+        self.assertEqual(self.budget.report()[0]["repeated_calls"], 1)
+
+    def test_budget_exhaustion_ends_agent_loop(self):
+        executor = SimpleNamespace(iterations=2, max_iter=8)
+        self.budget.reset(agent_limits={"Content Quality Analyzer": 2})
+        self.budget.enter("Content Quality Analyzer", "revision_task", SimpleNamespace(agent_executor=executor))
+
+        self.tool._run("compliance_info", "disclaimer")
+        self.tool._run("compliance_info", "gdpr")
+        result = self.tool._run("compliance_info", "risk warnings")
+
+        self.assertEqual(self.tool.calls, 2)
+        self.assertIn("Tool call budget exhausted", result)
+        self.assertEqual(executor.iterations, 7)
+        entry = self.budget.report()[0]
+        self.assertEqual((entry["tool_calls"], entry["max_tool_calls"], entry["budget_hits"]), (2, 2, 1))
+
+    def test_task_limit_overrides_agent_limit(self):
+        self.budget.reset(agent_limits={"Research Specialist": 10}, task_limits={"web_research_task": 1})
+        self.assertEqual(self.budget.enter("Research Specialist", "web_research_task").max_tool_calls, 1)
+        self.assertEqual(self.budget.enter("Research Specialist", "other_task").max_tool_calls, 10)
+
+    def test_task_max_iter_overrides_agent_max_iter(self):
+        agent = Agent(role="Process Coordinator", goal="Coordinate", backstory="Coordinator", max_iter=8)
+        brief = Task(name="brief_dispatch_task", description="Brief", expected_output="Brief", agent=agent)
+        other = Task(name="initialization_task", description="Init", expected_output="Report", agent=agent)
+        self.budget.reset(task_max_iter={"brief_dispatch_task": 3, "initialization_task": None})
+
+        with crewai_event_bus.scoped_handlers():
+            self.budget.install()
+            for task, max_iter in ((brief, 3), (other, 8)):
+                agent.create_agent_executor(tools=[], task=task)
+                crewai_event_bus.emit(agent, AgentExecutionStartedEvent(agent=agent, tools=[], task_prompt="", task=task))
+                self.assertEqual(agent.agent_executor.max_iter, max_iter)
+                crewai_event_bus.emit(agent, AgentExecutionCompletedEvent(agent=agent, task=task, output="done"))
+
+        self.assertEqual(agent.max_iter, 8)
+        self.assertEqual([entry["max_iter"] for entry in self.budget.report()], [3, None])
+
+    def test_scope_follows_agent_execution_events(self):
+        agent = Agent(role="Research Specialist", goal="Research", backstory="Researcher")
+        task = Task(name="web_research_task", description="Research", expected_output="Report", agent=agent)
+        self.budget.reset(agent_limits={"Research Specialist": 1})
+
+        with crewai_event_bus.scoped_handlers():
+            self.budget.install()
+            crewai_event_bus.emit(agent, AgentExecutionStartedEvent(agent=agent, tools=[], task_prompt="", task=task))
+            self.tool._run("brand_info", "market trends")
+            self.assertIn("budget exhausted", self.tool._run("brand_info", "competitor analysis"))
+            crewai_event_bus.emit(agent, AgentExecutionCompletedEvent(agent=agent, task=task, output="done"))
+
+        self.tool._run("brand_info", "competitor analysis")
+        self.assertEqual(self.tool.calls, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import os
+import tempfile
+import time
+from crew_automation_content_editor_launcher.utils.job_queue import Job, SQLiteJobQueue
+from crew_automation_content_editor_launcher.utils.rate_limiter import RateLimiter
+from crew_automation_content_editor_launcher.utils.scheduler import JobScheduler
+
+def payload(tenant="Siebert Financial", priority=None, **extra):
+    job = {"inputs": {"brand_name": tenant, "ideal_length": "800-1200 words"}}
+    if priority:
+        job["priority"] = priority
+    job.update(extra)
+    return job
+
+class TestJobScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.db_path = os.path.join(self.tmp_dir.name, "jobs.sqlite")
+
+    def queue(self, **options):
+        options.setdefault("llm_concurrency", 10)
+        self.scheduler = JobScheduler(**options)
+        return SQLiteJobQueue(self.db_path, scheduler=self.scheduler)
+
+    def lease_all(self, queue):
+        leased = []
+        while (job := queue.lease("worker")) is not None:
+            leased.append(job)
+            queue.ack(job)
+        return leased
+
+    def test_urgent_jobs_go_before_normal_and_batch(self):
+        queue = self.queue()
+        batch = queue.enqueue(payload(priority="batch"))
+        normal = queue.enqueue(payload())
+        urgent = queue.enqueue(payload(priority="urgent"))
+
+        self.assertEqual([job.id for job in self.lease_all(queue)], [urgent, normal, batch])
+
+    def test_deadlines_at_risk_go_first(self):
+        queue = self.queue()
+        relaxed = queue.enqueue(payload(priority="batch", deadline=time.time() + 86400))
+        urgent = queue.enqueue(payload(priority="urgent"))
+        # The default estimate is 6 tasks of 60 seconds, so these deadlines cannot wait
+        later = queue.enqueue(payload(priority="batch", deadline=time.time() + 400))
+        sooner = queue.enqueue(payload(priority="batch", deadline=time.time() + 300))
+
+        self.assertEqual([job.id for job in self.lease_all(queue)], [sooner, later, urgent, relaxed])
+
+    def test_waiting_batch_jobs_move_up(self):
+        scheduler = JobScheduler(aging_seconds=900)
+        queue = SQLiteJobQueue(self.db_path, scheduler=scheduler)
+        now = time.time()
+        normal = Job(id="normal", queue="content", payload=payload(), created_at=now - 60)
+        batch = Job(id="batch", queue="content", payload=payload(priority="batch"), created_at=now - 1000)
+
+        recent = Job(id="recent", queue="content", payload=payload(priority="batch"), created_at=now - 300)
+
+        with queue._connect() as conn:
+            self.assertEqual(scheduler.select(conn, "content", [normal, batch], [], now).id, "batch")
+            self.assertEqual(scheduler.select(conn, "content", [normal, recent], [], now).id, "normal")
+
+    def test_tenants_share_workers_by_weight(self):
+        queue = self.queue(tenant_weights={"Siebert Financial": 2, "Other Brand": 1})
+        for _ in range(6):
+            queue.enqueue(payload("Other Brand"))
+            queue.enqueue(payload("Siebert Financial"))
+
+        tenants = [self.scheduler.tenant(job.payload) for job in self.lease_all(queue)[:6]]
+        self.assertEqual(tenants.count("Siebert Financial"), 4)
+        self.assertEqual(tenants.count("Other Brand"), 2)
+
+    def test_admission_keeps_llm_headroom_for_urgent_work(self):
+        queue = self.queue(llm_concurrency=3)
+        queue.enqueue(payload())
+        running = queue.lease("worker-1")
+        urgent = queue.enqueue(payload(priority="urgent", inputs={
+            "brand_name": "Siebert Financial", "output_variants": "Blog Article, Newsletter, Video Script"}))
+        queue.enqueue(payload(priority="batch"))
+
+        # The urgent job needs 3 LLM slots: the batch job is not started in the meantime
+        self.assertIsNone(queue.lease("worker-2"))
+        self.assertTrue(queue.ack(running))
+        self.assertEqual(queue.lease("worker-2").id, urgent)
+
+    def test_smaller_jobs_are_backfilled_behind_normal_work(self):
+        queue = self.queue(llm_concurrency=3)
+        queue.enqueue(payload())
+        running = queue.lease("worker-1")
+        queue.enqueue(payload(inputs={
+            "brand_name": "Siebert Financial", "output_variants": "Blog Article, Newsletter, Video Script"}))
+        batch = queue.enqueue(payload(priority="batch"))
+
+        self.assertEqual(queue.lease("worker-2").id, batch)
+        self.assertIsNone(queue.lease("worker-3"))
+        self.assertTrue(queue.ack(running))
+
+    def test_serper_quota_limits_admission(self):
+        limiter = RateLimiter("serper", rate=5, daily_quota=15, db_path=os.path.join(self.tmp_dir.name, "limits.sqlite"))
+        queue = self.queue(serper_limiter=limiter, serper_calls_per_job=10)
+        queue.enqueue(payload())
+        queue.enqueue(payload())
+
+        self.assertIsNotNone(queue.lease("worker-1"))
+        self.assertIsNone(queue.lease("worker-2"))
+
+    def test_estimates_come_from_recorded_task_timings(self):
+        queue = self.queue()
+        queue.enqueue(payload())
+        job = queue.lease("worker")
+        queue.ack(job, {"task_seconds": {"research_task": 30.0, "content_creation_task": 120.0}})
+
+        with queue._connect() as conn:
+            profile = self.scheduler.timing_profile(conn)
+        self.assertEqual(profile, {"research_task": 30.0, "content_creation_task": 0.1})
+        estimate = self.scheduler.estimate({"inputs": {"ideal_length": "500-600 words"}}, profile)
+        self.assertAlmostEqual(estimate.seconds, 90.0)
+        self.assertEqual(estimate.llm_slots, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+import litellm
+from crew_automation_content_editor_launcher.utils.compliance_checker import ComplianceChecker
+from crew_automation_content_editor_launcher.utils.content_archive import ContentArchive
+from crew_automation_content_editor_launcher.utils.csv_manager import CSVManager
+from crew_automation_content_editor_launcher.utils.quality_gate import QualityGate
+from crew_automation_content_editor_launcher.utils.section_revision import plan_revision, split_sections
+
+INPUTS = {
+    'brand_name': 'Siebert Financial',
+    'content_request': 'A blog post about retirement planning',
+    'structure': 'Introduction, Benefits, Next Steps',
+    'avoid_terms': 'guaranteed returns',
+    'disclaimers': 'Investing involves risk.',
+    'output_formats': 'markdown',
+}
+
+# Further brand and request fields the task prompts reference, left blank for the crew run
+CREW_INPUTS = dict(INPUTS, **{key: '' for key in (
+    'primary_target', 'secondary_target', 'tone_of_voice', 'unique_selling_points', 'brand_colors', 'keywords',
+    'ideal_length', 'required_elements', 'mandatory_elements', 'forbidden_elements', 'brand_info_csv',
+    'best_practices_csv', 'compliance_info_csv')})
+
+INTRODUCTION = """## Introduction
+
+Retirement planning starts with a clear goal. You decide when you want to stop work."""
+
+BENEFITS = """## Benefits
+
+A plan offers guaranteed returns. You know what to save each month."""
+
+NEXT_STEPS = """## Next Steps
+
+Book a call with an advisor. Investing involves risk."""
+
+DRAFT = f"Plan early, plan calmly.\n\n{INTRODUCTION}\n\n{BENEFITS}\n\n{NEXT_STEPS}"
+
+FIXED_BENEFITS = """## Benefits
+
+A plan gives you calm. You know what to save each month."""
+
+def section(index, text):
+    return f"<<<SECTION {index}>>>\n{text}\n<<<END SECTION {index}>>>"
+
+class TestSectionRevision(unittest.TestCase):
+    def setUp(self):
+        self.gate = QualityGate.from_inputs(INPUTS, ComplianceChecker.from_inputs(INPUTS))
+
+    def plan(self, draft=DRAFT):
+        return plan_revision(draft, self.gate.evaluate(draft), self.gate)
+
+    def test_split_draft_with_headers(self):
+        sections = split_sections(DRAFT)
+
+        self.assertEqual([s.header for s in sections], [None, "## Introduction", "## Benefits", "## Next Steps"])
+        self.assertEqual(sections[0].body, "Plan early, plan calmly.")
+        self.assertEqual(sections[2].text, BENEFITS)
+        for draft_section in sections:
+            self.assertEqual(DRAFT[draft_section.start:draft_section.end].strip(), draft_section.text)
+        self.assertEqual(sections[-1].end, len(DRAFT))
+
+    def test_split_draft_without_headers(self):
+        draft = "\n\n".join(f"Paragraph {i} about saving." for i in range(1, 6))
+        sections = split_sections(draft, fallback_sections=3)
+
+        self.assertEqual([s.body for s in sections], [
+            "Paragraph 1 about saving.\n\nParagraph 2 about saving.",
+            "Paragraph 3 about saving.\n\nParagraph 4 about saving.",
+            "Paragraph 5 about saving."])
+        self.assertTrue(all(s.header is None for s in sections))
+        self.assertEqual(len(split_sections(draft)), 1)
+
+    def test_only_flagged_sections_are_sent(self):
+        plan = self.plan()
+
+        self.assertFalse(plan.full_rewrite)
+        self.assertEqual(list(plan.flagged), [2])
+        self.assertIn("guaranteed returns", plan.flagged[2][0])
+        prompt = plan.to_prompt()
+        self.assertIn(section(2, BENEFITS), prompt)
+        self.assertNotIn("Retirement planning starts", prompt)
+
+    def test_markers_round_trip(self):
+        plan = self.plan()
+
+        self.assertEqual(plan.stitch(plan.to_prompt()), DRAFT)
+        self.assertEqual(plan.stitch(section(2, FIXED_BENEFITS)), DRAFT.replace(BENEFITS, FIXED_BENEFITS))
+
+    def test_missing_sections_are_inserted_in_structure_order(self):
+        draft = DRAFT.replace(f"\n\n{NEXT_STEPS}", "")
+        plan = self.plan(draft)
+        self.assertEqual(plan.additions, {"Next Steps": 2})
+        self.assertIn("<<<NEW SECTION 1: Next Steps>>>", plan.to_prompt())
+
+        output = section(2, FIXED_BENEFITS) + f"\n<<<NEW SECTION 1: Next Steps>>>\n{NEXT_STEPS}\n<<<END NEW SECTION 1>>>"
+        self.assertEqual(plan.stitch(output), DRAFT.replace(BENEFITS, FIXED_BENEFITS))
+
+    def test_stitch_tolerates_dropped_reordered_and_duplicated_markers(self):
+        draft = DRAFT.replace("Retirement planning starts", "Guaranteed returns start")
+        plan = self.plan(draft)
+        self.assertEqual(sorted(plan.flagged), [1, 2])
+        fixed_introduction = INTRODUCTION.replace("Retirement planning starts", "Saving starts")
+
+        # Dropped: the section the model left out keeps its original text
+        self.assertEqual(plan.stitch(section(2, FIXED_BENEFITS)),
+                         draft.replace(BENEFITS, FIXED_BENEFITS))
+        # Reordered: sections go back to their place in the document
+        expected = DRAFT.replace(INTRODUCTION, fixed_introduction).replace(BENEFITS, FIXED_BENEFITS)
+        self.assertEqual(plan.stitch(section(2, FIXED_BENEFITS) + "\n" + section(1, fixed_introduction)), expected)
+        # Duplicated: a repeated section is used once, in its latest version
+        self.assertEqual(plan.stitch("\n".join([section(1, INTRODUCTION), section(2, FIXED_BENEFITS),
+                                                section(1, fixed_introduction)])), expected)
+        # An END marker without its opening marker is ignored
+        self.assertEqual(plan.stitch(f"{fixed_introduction}\n<<<END SECTION 1>>>\n" + section(2, FIXED_BENEFITS)),
+                         draft.replace(BENEFITS, FIXED_BENEFITS))
+
+    def test_stitch_without_markers(self):
+        plan = self.plan()
+        full_revision = DRAFT.replace(BENEFITS, FIXED_BENEFITS)
+
+        self.assertEqual(plan.stitch(full_revision), full_revision)
+        self.assertEqual(plan.stitch("I could not revise the section."), DRAFT)
+
+    def test_draft_without_sections_is_rewritten_in_full(self):
+        plan = plan_revision("A plan offers guaranteed returns.", self.gate.evaluate("A plan offers guaranteed returns."),
+                             QualityGate.from_inputs({}, self.gate.compliance_checker))
+        self.assertTrue(plan.full_rewrite)
+
+class TestSectionRevisionInCrew(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        archive = ContentArchive(os.path.join(self.tmp_dir.name, "archive.sqlite"))
+        for patcher in (patch.dict(os.environ, {
+                            "CONTENT_CREW_CACHE_DIR": self.tmp_dir.name, "OPENAI_API_KEY": "sk-test",
+                            "CREWAI_DISABLE_TELEMETRY": "true", "OTEL_SDK_DISABLED": "true"}),
+                        patch("crew_automation_content_editor_launcher.crew.content_archive", return_value=archive),
+                        patch.object(CSVManager, "load_compliance_info", return_value={}),
+                        patch.object(CSVManager, "load_brand_info", return_value={})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.prompts = []
+
+    def completion(self, draft):
+        def completion(model, messages, **kwargs):
+            prompt = messages[-1]['content']
+            self.prompts.append(prompt)
+            # The revision prompt carries the flagged section: answer with its fixed version
+            answer = section(2, FIXED_BENEFITS) if "<<<SECTION 2>>>" in prompt else draft
+            return litellm.ModelResponse(model=model, choices=[{"index": 0, "finish_reason": "stop", "message": {
+                "role": "assistant", "content": f"Thought: I now know the final answer\nFinal Answer: {answer}"}}],
+                usage={"prompt_tokens": 12, "completion_tokens": 4, "total_tokens": 16})
+        return completion
+
+    def test_revision_is_scoped_and_restored_on_the_next_kickoff(self):
+        from crew_automation_content_editor_launcher.crew import CrewAutomationContentEditorLauncherCrew
+        launcher = CrewAutomationContentEditorLauncherCrew()
+        crew = launcher.crew()
+        inputs = dict(CREW_INPUTS, output_dir=os.path.join(self.tmp_dir.name, "output"))
+        revision_task = launcher.revision_task()
+
+        with patch("litellm.completion", self.completion(DRAFT)):
+            result = crew.kickoff(inputs=dict(inputs))
+        self.assertEqual(len(self.prompts), 5)
+        self.assertIn("<<<SECTION 2>>>", self.prompts[4])
+        self.assertNotIn("Retirement planning starts", self.prompts[4])
+        self.assertEqual(result.tasks_output[4].raw, DRAFT.replace(BENEFITS, FIXED_BENEFITS))
+        self.assertEqual(revision_task.context, [])
+        self.assertIn("<<<SECTION n>>>", revision_task.expected_output)
+
+        self.prompts.clear()
+        with patch("litellm.completion", self.completion(DRAFT.replace(BENEFITS, FIXED_BENEFITS))):
+            crew.kickoff(inputs=dict(inputs))
+        self.assertEqual(len(self.prompts), 4)
+        self.assertEqual([task.name for task in revision_task.context], ["content_creation_task"])
+        self.assertEqual(revision_task.expected_output, launcher.tasks_config['revision_task']['expected_output'])
+
+if __name__ == '__main__':
+    unittest.main()
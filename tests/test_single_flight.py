@@ -0,0 +1,125 @@
+import unittest
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import ClassVar, Tuple
+from unittest.mock import patch
+from crew_automation_content_editor_launcher.tools.base_tool import ContentCrewTool
+from crew_automation_content_editor_launcher.tools.content_formatter import ContentFormatterTool
+from crew_automation_content_editor_launcher.tools.web_search_tool import WebSearchTool
+from crew_automation_content_editor_launcher.utils.single_flight import SingleFlight, call_key
+
+class SlowLookupTool(ContentCrewTool):
+    name: str = "Slow Lookup Tool"
+    description: str = "Looks something up slowly."
+    executions: int = 0
+
+    def _run(self, csv_file: str, query: str) -> str:
+        self.executions += 1
+        time.sleep(0.2)
+        return f"{query} in {csv_file} (execution {self.executions})"
+
+    async def _arun(self, csv_file: str, query: str) -> str:
+        self.executions += 1
+        await asyncio.sleep(0.2)
+        return f"{query} in {csv_file} (execution {self.executions})"
+
+class LocalizedLookupTool(SlowLookupTool):
+    name: str = "Localized Lookup Tool"
+    language: str = "en"
+    flight_fields: ClassVar[Tuple[str, ...]] = ("language",)
+
+    def _run(self, csv_file: str, query: str) -> str:
+        self.executions += 1
+        time.sleep(0.2)
+        return f"{query} in {csv_file} ({self.language})"
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.single_flight = SingleFlight()
+        patcher = patch("crew_automation_content_editor_launcher.tools.base_tool.single_flight", self.single_flight)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_concurrent_identical_calls_share_one_execution(self):
+        tool = SlowLookupTool()
+        queries = ["retirement planning", "Retirement  Planning", "retirement planning", "mutual funds"]
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            results = list(executor.map(lambda query: tool._run("brand_info", query), queries))
+
+        self.assertEqual(tool.executions, 2)
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+        self.assertNotEqual(results[0], results[3])
+        self.assertEqual(self.single_flight.snapshot(), {"Slow Lookup Tool": {"executed": 2, "coalesced": 2}})
+
+    def test_sequential_calls_are_not_coalesced(self):
+        tool = SlowLookupTool()
+        tool._run("brand_info", "retirement planning")
+        tool._run("brand_info", "retirement planning")
+        self.assertEqual(tool.executions, 2)
+
+    def test_errors_reach_every_waiter(self):
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError("upstream failure")
+
+        def waiter():
+            started.wait()
+            return self.single_flight.do("key", lambda: "not run")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(self.single_flight.do, "key", failing)
+            follower = executor.submit(waiter)
+            for future in (leader, follower):
+                with self.assertRaises(RuntimeError):
+                    future.result()
+
+    def test_concurrent_identical_async_calls_share_one_execution(self):
+        tool = SlowLookupTool()
+        queries = ["retirement planning", "Retirement  Planning", "mutual funds"]
+
+        async def search():
+            return await asyncio.gather(*(tool.arun("brand_info", query) for query in queries))
+
+        results = asyncio.run(search())
+        self.assertEqual(tool.executions, 2)
+        self.assertEqual(results[0], results[1])
+        self.assertNotEqual(results[0], results[2])
+        self.assertEqual(tool.current_usage_count, 3)
+        self.assertEqual(self.single_flight.snapshot(), {"Slow Lookup Tool": {"executed": 2, "coalesced": 1}})
+
+    def test_call_key_normalizes_text(self):
+        self.assertEqual(call_key("Web Search Tool", {"query": " Mutual  Funds", "num_results": 5}),
+                         call_key("Web Search Tool", {"num_results": 5, "query": "mutual funds"}))
+        self.assertNotEqual(call_key("Web Search Tool", {"query": "funds", "num_results": 5}),
+                            call_key("Web Search Tool", {"query": "funds", "num_results": 3}))
+
+    def test_calls_coalesce_only_across_identically_configured_tools(self):
+        tools = [LocalizedLookupTool(language="en"), LocalizedLookupTool(language="en"), LocalizedLookupTool(language="it"),
+                 SlowLookupTool(), SlowLookupTool()]
+        with ThreadPoolExecutor(max_workers=len(tools)) as executor:
+            results = list(executor.map(lambda tool: tool._run("brand_info", "retirement planning"), tools))
+
+        self.assertEqual(results[:3], ["retirement planning in brand_info (en)"] * 2 + ["retirement planning in brand_info (it)"])
+        self.assertEqual(sum(tool.executions for tool in tools[:2]), 1)
+        self.assertEqual([tool.executions for tool in tools[2:]], [1, 1, 1])
+
+    def test_call_key_includes_tool_configuration(self):
+        arguments = {"content": "Plan early.", "include_disclaimers": True}
+        self.assertNotEqual(call_key("Content Formatter Tool", arguments, ContentFormatterTool(disclaimers="A").flight_config()),
+                            call_key("Content Formatter Tool", arguments, ContentFormatterTool(disclaimers="B").flight_config()))
+
+        search = {"query": "funds", "num_results": 5}
+        keys = [call_key("Web Search Tool", search, WebSearchTool(api_key=api_key, use_corpus=False).flight_config())
+                for api_key in ("serper-key-1", "serper-key-1", "serper-key-2")]
+        self.assertEqual(keys[0], keys[1])
+        self.assertNotEqual(keys[0], keys[2])
+        self.assertNotIn("serper-key-1", keys[0])
+
+if __name__ == '__main__':
+    unittest.main()
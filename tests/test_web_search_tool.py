@@ -1,10 +1,20 @@
 import unittest
 import json
+import os
+import tempfile
 from unittest.mock import patch, Mock
 from crew_automation_content_editor_launcher.tools.web_search_tool import WebSearchTool
 from crew_automation_content_editor_launcher.utils.config_manager import ConfigManager
 
 class TestWebSearchTool(unittest.TestCase):
+    def setUp(self):
+        # Keep the rate limiter, search cache and research corpus out of the working directory
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        patcher = patch.dict(os.environ, {"CONTENT_CREW_CACHE_DIR": self.tmp_dir.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     @patch.object(ConfigManager, 'get_api_key')
     @patch('requests.request')
     def test_search_request_structure(self, mock_request, mock_get_api_key):